@@ -1,12 +1,12 @@
 from .models import Property, Contact, Task
-from .dao import PropertyDAO, ContactDAO, TaskDAO
+from .dao import PropertyDAO, ContactDAO, TaskDAO, DataVersionDAO
 from .services import ReportingService, RecurringService
-from .database import init_db, get_connection
+from .database import init_db, get_connection, close_connection, connection
 from .config import DB_PATH
 
 __all__ = [
     'Property', 'Contact', 'Task',
-    'PropertyDAO', 'ContactDAO', 'TaskDAO',
+    'PropertyDAO', 'ContactDAO', 'TaskDAO', 'DataVersionDAO',
     'ReportingService', 'RecurringService',
-    'init_db', 'get_connection', 'DB_PATH'
+    'init_db', 'get_connection', 'close_connection', 'connection', 'DB_PATH'
 ]
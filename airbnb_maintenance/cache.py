@@ -0,0 +1,180 @@
+"""Per-user read-through cache for rarely changing Supabase reads.
+
+cloud_db and cloud_async serve property and contact lists through
+read_cache, so both share one set of entries and invalidations. Entries are
+kept in a size-bounded LRU with a TTL and are keyed by (namespace, user_id,
+key), e.g. ("properties", user_id, "all").
+
+Writes call invalidate(namespace, user_id), which bumps that pair's
+generation in the invalidation backend; an entry is only served while the
+generation it was filled under is still current. With CACHE_BACKEND=file the
+generations live in small files under CACHE_DIR, so an invalidation in one
+gunicorn worker reaches every worker on the host. The default "local"
+backend only covers the current process, and the TTL bounds staleness either
+way.
+"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+CACHE_MAXSIZE = int(os.environ.get("CACHE_MAXSIZE", 1024))
+CACHE_TTL = float(os.environ.get("CACHE_TTL", 60))
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "local")
+CACHE_DIR = os.environ.get(
+    "CACHE_DIR", os.path.join(tempfile.gettempdir(), "airbnb_maintenance_cache")
+)
+
+
+class LocalInvalidation:
+    """Generations held in this process only."""
+
+    def __init__(self):
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, namespace: str, user_id: str) -> Hashable:
+        return self._generations.get((namespace, user_id), 0)
+
+    def bump(self, namespace: str, user_id: str) -> None:
+        with self._lock:
+            key = (namespace, user_id)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+
+class FileInvalidation:
+    """Generations stored as one small file per (namespace, user) in a directory.
+
+    Every process on the host that points at the same directory sees the
+    others' invalidations. Each bump writes a fresh random token with an
+    atomic rename, so readers never see a partial write.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, namespace: str, user_id: str) -> str:
+        return os.path.join(self.directory, f"{namespace}-{user_id}")
+
+    def generation(self, namespace: str, user_id: str) -> Hashable:
+        try:
+            with open(self._path(namespace, user_id)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def bump(self, namespace: str, user_id: str) -> None:
+        path = self._path(namespace, user_id)
+        temp = f"{path}.{uuid.uuid4().hex}"
+        with open(temp, "w") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(temp, path)
+
+
+BACKENDS = {"local": LocalInvalidation, "file": FileInvalidation}
+
+
+class ReadCache:
+    """Thread-safe LRU + TTL cache with generation-checked invalidation."""
+
+    def __init__(
+        self,
+        maxsize: int = CACHE_MAXSIZE,
+        ttl: float = CACHE_TTL,
+        backend=None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend or LocalInvalidation()
+        # key -> (expires_at, generation, value)
+        self._entries: "OrderedDict[tuple, Tuple[float, Hashable, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(
+        self, namespace: str, user_id: str, key: Hashable, loader: Callable[[], Any]
+    ) -> Any:
+        """Return the cached value, or call loader() and cache its result."""
+        cache_key = (namespace, user_id, key)
+        generation = self.backend.generation(namespace, user_id)
+        hit, value = self._lookup(cache_key, generation)
+        if hit:
+            return value
+        # Loaded outside the lock; the generation read above is stored with
+        # the value, so a write that lands meanwhile makes it stale at once.
+        value = loader()
+        self._store(cache_key, generation, value)
+        return value
+
+    async def aget_or_load(
+        self,
+        namespace: str,
+        user_id: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """get_or_load for the async DAOs: loader() returns an awaitable."""
+        cache_key = (namespace, user_id, key)
+        generation = self.backend.generation(namespace, user_id)
+        hit, value = self._lookup(cache_key, generation)
+        if hit:
+            return value
+        value = await loader()
+        self._store(cache_key, generation, value)
+        return value
+
+    def _lookup(self, cache_key: tuple, generation: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry and entry[0] > time.monotonic() and entry[1] == generation:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return True, entry[2]
+            self.misses += 1
+            return False, None
+
+    def _store(self, cache_key: tuple, generation: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[cache_key] = (time.monotonic() + self.ttl, generation, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str, user_id: str) -> None:
+        """Drop namespace's entries for user_id in every process on the backend."""
+        self.backend.bump(namespace, user_id)
+        with self._lock:
+            prefix = (namespace, user_id)
+            for cache_key in [k for k in self._entries if k[:2] == prefix]:
+                del self._entries[cache_key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+read_cache = ReadCache(backend=BACKENDS[CACHE_BACKEND]())
@@ -1,8 +1,13 @@
+import sys
 from datetime import datetime, timedelta
-from models import Property, Contact, Task
-from dao import PropertyDAO, ContactDAO, TaskDAO
-from services import ReportingService, RecurringService
-from database import init_db
+from .models import Property, Contact, Task
+from .dao import PropertyDAO, ContactDAO, TaskDAO
+from .services import ReportingService, RecurringService
+from .database import init_db
+from .exporter import export_rows
+from .importer import (ImportFileError, detect_format, import_records, iter_records,
+                       name_lookup, text_stream)
+from .querylog import load_stats, reset_stats
 
 def seed_data():
     """Add sample data to the database."""
@@ -61,9 +66,8 @@ def seed_data():
              completion_status="complete", recurring="no"),
     ]
     
-    for t in tasks:
-        TaskDAO.create(t)
-    print("Created 8 tasks")
+    TaskDAO.create_many(tasks)
+    print(f"Created {len(tasks)} tasks")
     print("Seeding complete!")
 
 
@@ -103,12 +107,60 @@ def show_data():
         print(f"  {t.id}: {t.description} - ${t.cost} ({t.payment_status}, {t.completion_status})")
 
 
+def import_file(path, fmt=None):
+    """Stream a CSV or NDJSON file of tasks into the database."""
+    fmt = fmt or detect_format(path)
+    properties = name_lookup(PropertyDAO.get_names())
+    contacts = name_lookup(ContactDAO.get_names())
+    print(f"Importing {path} as {fmt}...")
+    with open(path, 'rb') as f:
+        try:
+            result = import_records(iter_records(text_stream(f), fmt), TaskDAO.insert_imported,
+                                    properties, contacts)
+        except ImportFileError as e:
+            print(f"Import stopped at {e}")
+            sys.exit(1)
+    print(f"Read {result.read} rows: {result.inserted} inserted, "
+          f"{result.duplicates} duplicates skipped, {result.failed} failed")
+    for error in result.errors:
+        print(f"  {error}")
+
+
+def export_file(path, fmt=None):
+    """Stream every task to a CSV or NDJSON file ('-' for stdout)."""
+    fmt = fmt or detect_format(path)
+    if path == '-':
+        for chunk in export_rows(TaskDAO.iter_all(), fmt):
+            sys.stdout.write(chunk)
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in export_rows(TaskDAO.iter_all(), fmt):
+            f.write(chunk)
+    print(f"Exported tasks to {path} as {fmt}")
+
+
+def show_query_stats(limit=20):
+    """Print the statements with the most total time, slowest plans included."""
+    stats = load_stats(limit)
+    if not stats:
+        print("No query stats recorded yet")
+        return
+    print(f"{'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'slow':>5}  statement")
+    for s in stats:
+        print(f"{s['calls']:>8} {s['total_s'] * 1000:>10.1f} "
+              f"{s['total_s'] * 1000 / s['calls']:>9.2f} {s['max_s'] * 1000:>9.1f} "
+              f"{s['slow']:>5}  {s['statement'][:120]}")
+        if s['plan']:
+            print(s['plan'])
+
+
 def main():
-    import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python cli.py <command>")
-        print("Commands: init, seed, report, show, all")
+        print("Usage: python -m airbnb_maintenance.cli <command>")
+        print("Commands: init, seed, report, show, all, import <file> [csv|ndjson], "
+              "export <file|-> [csv|ndjson], rebuild-rollup, schedule [lead_days], "
+              "query-stats [limit|reset]")
         return
     
     cmd = sys.argv[1]
@@ -121,6 +173,29 @@ def main():
         show_report()
     elif cmd == "show":
         show_data()
+    elif cmd == "import":
+        if len(sys.argv) < 3:
+            print("Usage: python -m airbnb_maintenance.cli import <file> [csv|ndjson]")
+            return
+        import_file(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    elif cmd == "export":
+        if len(sys.argv) < 3:
+            print("Usage: python -m airbnb_maintenance.cli export <file|-> [csv|ndjson]")
+            return
+        export_file(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    elif cmd == "rebuild-rollup":
+        ReportingService.rebuild_rollup()
+        print("Monthly cost rollup rebuilt")
+    elif cmd == "schedule":
+        lead_days = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+        created = RecurringService.schedule(lead_days=lead_days)
+        print(f"Created {created} recurring tasks")
+    elif cmd == "query-stats":
+        if len(sys.argv) > 2 and sys.argv[2] == "reset":
+            reset_stats()
+            print("Query stats cleared")
+        else:
+            show_query_stats(int(sys.argv[2]) if len(sys.argv) > 2 else 20)
     elif cmd == "all":
         init_db()
         seed_data()
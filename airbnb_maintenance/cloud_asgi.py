@@ -0,0 +1,182 @@
+"""ASGI entry point: async report and dashboard reads in front of the Flask app.
+
+Run with an ASGI server, e.g.
+
+    uvicorn airbnb_maintenance.cloud_asgi:app --workers 2
+
+GET requests for the endpoints in ROUTES, which each need one or more
+Supabase queries, are answered here on cloud_async. One worker's event loop
+keeps many of them in flight at once instead of parking a thread on each
+PostgREST call. Every other request goes to cloud_web_app's Flask app through
+asgiref's WSGI adapter, so sessions, auth, writes and responses behave as
+under gunicorn.
+"""
+import asyncio
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_cookie, parse_etags, quote_etag
+
+from airbnb_maintenance import cloud_async, cloud_web_app, metrics, tracing
+from airbnb_maintenance.cloud_async import (
+    DataVersionDAO,
+    PropertyDAO,
+    RecurringService,
+    ReportingService,
+    TaskDAO,
+)
+
+flask_app = cloud_web_app.create_app()
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def dashboard(user_id, args):
+    limit = min(args.get("limit", 10, type=int), 50)
+    summary, projection, names, due_soon = await asyncio.gather(
+        ReportingService.cost_summary(user_id),
+        ReportingService.yearly_projection(user_id),
+        PropertyDAO.get_names(user_id),
+        TaskDAO.get_due_soon(user_id, limit),
+    )
+    return {
+        "summary": summary,
+        "yearly_projection": projection,
+        "properties": names,
+        "due_soon": due_soon,
+    }
+
+
+async def summary(user_id, args):
+    return await ReportingService.cost_summary(user_id)
+
+
+async def projection(user_id, args):
+    forecast = await ReportingService.forecast(
+        user_id, args.get("from"), args.get("months", 12, type=int)
+    )
+    if len(forecast["totals"]) >= 12:
+        forecast["yearly_projection"] = round(sum(forecast["totals"][:12]), 2)
+    return forecast
+
+
+async def monthly(user_id, args):
+    year = args.get("year", type=int)
+    month = args.get("month", type=int)
+    if not year or not month:
+        now = datetime.now()
+        year, month = now.year, now.month
+    if not 1 <= month <= 12:
+        raise ValueError("month must be between 1 and 12")
+    return await ReportingService.monthly_breakdown(year, month, user_id)
+
+
+async def trend(user_id, args):
+    return await ReportingService.trend(
+        args.get("from", ""),
+        args.get("to", ""),
+        args.get("group_by", "property"),
+        user_id,
+    )
+
+
+async def calendar(user_id, args):
+    items = await RecurringService.calendar(
+        user_id,
+        args.get("from", ""),
+        args.get("to", ""),
+        args.get("property_id", type=int),
+    )
+    return {"items": items}
+
+
+# GET paths served natively; each handler takes (user_id, query args) and
+# returns the JSON payload, raising ValueError for a 400.
+ROUTES = {
+    "/api/dashboard": dashboard,
+    "/api/reports/summary": summary,
+    "/api/reports/projection": projection,
+    "/api/reports/monthly": monthly,
+    "/api/reports/trend": trend,
+    "/api/calendar": calendar,
+}
+
+
+def session_user_id(headers: dict):
+    """user_id from the Flask session cookie, verified like Flask does."""
+    cookies = parse_cookie(headers.get("cookie", ""))
+    value = cookies.get(flask_app.config["SESSION_COOKIE_NAME"])
+    if not value:
+        return None
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+    try:
+        return serializer.loads(value, max_age=max_age).get("user_id")
+    except Exception:
+        return None
+
+
+async def respond(send, status: int, payload=None, headers=()) -> int:
+    body = b"" if payload is None else flask_app.json.dumps(payload).encode()
+    head = [(b"content-length", str(len(body)).encode())]
+    if payload is not None:
+        head.append((b"content-type", b"application/json"))
+    head.extend((name.encode(), value.encode()) for name, value in headers)
+    trace = tracing.current()
+    if trace is not None and tracing.DB_TRACE:
+        head.append((tracing.TRACE_HEADER.encode(), trace.header().encode()))
+    await send({"type": "http.response.start", "status": status, "headers": head})
+    await send({"type": "http.response.body", "body": body})
+    return status
+
+
+async def serve(scope, send, handler) -> int:
+    """Answer one ROUTES request; returns the status code sent."""
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+    user_id = session_user_id(headers)
+    if not user_id:
+        return await respond(send, 401, {"error": "Not authenticated"})
+    try:
+        version = await DataVersionDAO.get(user_id)
+        etag = cloud_web_app.data_etag(user_id, version)
+        etag_headers = [("ETag", quote_etag(etag)), ("Cache-Control", "no-cache")]
+        if parse_etags(headers.get("if-none-match")).contains(etag):
+            return await respond(send, 304, headers=etag_headers[:1])
+        args = MultiDict(parse_qsl(scope["query_string"].decode(), True))
+        payload = await handler(user_id, args)
+    except ValueError as e:
+        return await respond(send, 400, {"error": str(e)})
+    except Exception as e:
+        return await respond(send, 500, {"error": str(e)})
+    return await respond(send, 200, payload, etag_headers)
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await cloud_async.AsyncClientRegistry.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    handler = ROUTES.get(scope.get("path"))
+    if scope["type"] == "http" and scope["method"] == "GET" and handler:
+        started = time.perf_counter()
+        tracing.begin(f"GET {scope['path']}")
+        try:
+            status = await serve(scope, send, handler)
+        finally:
+            tracing.finish()
+        elapsed = time.perf_counter() - started
+        metrics.record_request(scope["path"], "GET", status, elapsed)
+        return
+    await wsgi_app(scope, receive, send)
@@ -0,0 +1,251 @@
+"""Async Supabase reads for the endpoints served natively by cloud_asgi.
+
+Mirrors the read side of cloud_db on supabase's AsyncClient. Queries are
+built by the same cloud_db helpers and awaited instead of executed, so the
+independent queries behind one response (the dashboard's reads, the two
+due-soon halves, the calendar's stored tasks and series heads) run
+concurrently with asyncio.gather, and the event loop serves other requests
+while they are in flight. Writes stay on cloud_db.
+"""
+import asyncio
+import weakref
+from typing import AsyncIterator, List, Optional
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+from . import cloud_db, services
+from .cache import read_cache
+from .metrics import instrumented
+from .tracing import on_async_response
+from .cloud_db import (
+    FORECAST_COLUMNS,
+    POOL_KEEPALIVE,
+    POOL_SIZE,
+    POOL_TIMEOUT,
+    due_soon_queries,
+    forecast_rows,
+    merge_due_soon,
+    task_id_page,
+    task_query,
+)
+from .reports import calendar_window, forecast_months, trend_matrix, trend_months
+
+
+class AsyncClientRegistry:
+    """One AsyncClient, with its own connection pool, per event loop.
+
+    httpx.AsyncClient connections belong to the loop that opened them, so a
+    client is built on first use in each loop: the ASGI server's single loop
+    in production, or the loop of each asyncio.run() in scripts.
+    """
+
+    _clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    async def build() -> AsyncClient:
+        supabase_url, supabase_key = cloud_db.ClientRegistry.credentials()
+        http = httpx.AsyncClient(
+            timeout=httpx.Timeout(POOL_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE,
+                max_keepalive_connections=POOL_SIZE,
+                keepalive_expiry=POOL_KEEPALIVE,
+            ),
+            event_hooks={"response": [on_async_response]},
+        )
+        options = AsyncClientOptions(
+            httpx_client=http,
+            postgrest_client_timeout=POOL_TIMEOUT,
+            persist_session=False,
+            auto_refresh_token=False,
+        )
+        return await acreate_client(supabase_url, supabase_key, options=options)
+
+    @classmethod
+    async def get(cls) -> AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = cls._clients.get(loop)
+        if client is None:
+            async with cls._locks.setdefault(loop, asyncio.Lock()):
+                client = cls._clients.get(loop)
+                if client is None:
+                    client = cls._clients[loop] = await cls.build()
+        return client
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the running loop's client (ASGI lifespan shutdown)."""
+        client = cls._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.options.httpx_client.aclose()
+
+
+async def get_client() -> AsyncClient:
+    return await AsyncClientRegistry.get()
+
+
+@instrumented("supabase-async", "properties")
+class PropertyDAO:
+    @staticmethod
+    async def get_names(user_id: str) -> dict:
+        """Map property id to name; shares read_cache with cloud_db."""
+
+        async def load():
+            client = await get_client()
+            result = (
+                await client.table("properties")
+                .select("id,name")
+                .eq("user_id", user_id)
+                .execute()
+            )
+            return {row["id"]: row["name"] for row in result.data}
+
+        return await read_cache.aget_or_load("properties", user_id, "names", load)
+
+
+@instrumented("supabase-async", "tasks")
+class TaskDAO:
+    @staticmethod
+    async def query(user_id: str, **filters) -> List[dict]:
+        """Filter and sort tasks in the database; see cloud_db.TaskDAO.query."""
+        client = await get_client()
+        result = await task_query(client, user_id, **filters).execute()
+        return result.data
+
+    @staticmethod
+    async def iter_all(
+        user_id: str,
+        page_size: int = 1000,
+        columns: str = "*",
+        recurring: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        """Yield every task in id order, page_size rows per request."""
+        client = await get_client()
+        last_id = 0
+        while True:
+            query = task_id_page(
+                client, user_id, last_id, page_size, columns, recurring
+            )
+            result = await query.execute()
+            for row in result.data:
+                yield row
+            if len(result.data) < page_size:
+                break
+            last_id = result.data[-1]["id"]
+
+    @staticmethod
+    async def get_due_soon(user_id: str, limit: int = 10) -> List[dict]:
+        """Unpaid tasks by due date; both halves are fetched concurrently."""
+        with_end, without_end = due_soon_queries(await get_client(), user_id, limit)
+        first, second = await asyncio.gather(with_end.execute(), without_end.execute())
+        return merge_due_soon(first.data + second.data, limit)
+
+
+@instrumented("supabase-async", "data_versions")
+class DataVersionDAO:
+    @staticmethod
+    async def get(user_id: str) -> int:
+        """The user's change counter, bumped by triggers on every write."""
+        client = await get_client()
+        result = (
+            await client.table("data_versions")
+            .select("version")
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0]["version"] if result.data else 0
+
+
+@instrumented("supabase-async", "tasks")
+class RecurringService:
+    @staticmethod
+    async def calendar(
+        user_id: str, start: str, end: str, property_id: Optional[int] = None
+    ) -> List[dict]:
+        """Stored and virtual recurring tasks starting within [start, end]."""
+        first, last = calendar_window(start, end)
+        client = await get_client()
+        stored, heads = await asyncio.gather(
+            TaskDAO.query(
+                user_id,
+                property_id=property_id,
+                start_from=first.isoformat(),
+                start_to=last.isoformat(),
+                sort="start_date",
+            ),
+            client.rpc(
+                "recurring_series_heads",
+                {
+                    "p_user_id": user_id,
+                    "p_until": last.isoformat(),
+                    "p_property_id": property_id,
+                },
+            ).execute(),
+        )
+        expand = services.RecurringService.expand
+        return list(expand(stored, heads.data or [], first, last))
+
+
+@instrumented("supabase-async", "reports")
+class ReportingService:
+    @staticmethod
+    async def monthly_breakdown(year: int, month: int, user_id: str) -> dict:
+        client = await get_client()
+        result = await client.rpc(
+            "report_monthly_breakdown",
+            {"p_user_id": user_id, "p_year": year, "p_month": month},
+        ).execute()
+        return {name: float(total) for name, total in (result.data or {}).items()}
+
+    @staticmethod
+    async def trend(start: str, end: str, group_by: str, user_id: str) -> dict:
+        """Monthly cost per property, contact or service type over a month range."""
+        months = trend_months(start, end, group_by)
+        client = await get_client()
+        result = await client.rpc(
+            "report_trend",
+            {
+                "p_user_id": user_id,
+                "p_from": months[0],
+                "p_to": months[-1],
+                "p_group_by": group_by,
+            },
+        ).execute()
+        rows = [(r["month"], r["name"], r["total"]) for r in result.data or []]
+        return trend_matrix(months, group_by, rows)
+
+    @staticmethod
+    async def forecast(
+        user_id: str, start: Optional[str] = None, months: int = 12
+    ) -> dict:
+        """Projected recurring spend per property; see cloud_db.ReportingService.
+
+        Property names and the recurring tasks are fetched concurrently.
+        """
+        keys = forecast_months(start, months)
+
+        async def recurring_tasks():
+            pages = TaskDAO.iter_all(user_id, columns=FORECAST_COLUMNS, recurring="yes")
+            return [task async for task in pages]
+
+        names, tasks = await asyncio.gather(
+            PropertyDAO.get_names(user_id), recurring_tasks()
+        )
+        return services.ForecastService.project(forecast_rows(tasks, names), keys)
+
+    @staticmethod
+    async def yearly_projection(user_id: str) -> float:
+        """Projected recurring spend over the next twelve months."""
+        return (await ReportingService.forecast(user_id))["total"]
+
+    @staticmethod
+    async def cost_summary(user_id: str) -> dict:
+        client = await get_client()
+        result = await client.rpc(
+            "report_cost_summary", {"p_user_id": user_id}
+        ).execute()
+        data = result.data or {}
+        return {key: float(data.get(key) or 0) for key in ("paid", "unpaid", "total")}
@@ -1,34 +1,300 @@
 import os
-from supabase import create_client, Client
-from typing import Optional, List
+import threading
+from datetime import date
+from typing import TYPE_CHECKING, Optional, List, Tuple, Iterator
+from .dates import normalize_date, day_after
+from .pagination import clamp_limit, encode_cursor, decode_cursor, parse_task_sort
+from .reports import calendar_window, forecast_months, trend_matrix, trend_months
+from . import services
+from .cache import read_cache
+from .metrics import instrumented
+from .tracing import on_response
+
+# The Supabase SDK and httpx are imported on first use, not at import time,
+# so a cold worker reaches its first request sooner; warmup() imports them
+# ahead of time where that is cheaper (e.g. a preloading gunicorn master).
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
+
+
+# Connection pool settings for the shared HTTP client. Defaults suit a
+# single gunicorn worker; raise SUPABASE_POOL_SIZE for threaded workers.
+POOL_SIZE = int(os.environ.get("SUPABASE_POOL_SIZE", "10"))
+POOL_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", "10"))
+POOL_KEEPALIVE = float(os.environ.get("SUPABASE_KEEPALIVE", "60"))
+
+
+class ClientRegistry:
+    """Process-wide Supabase client shared by every DAO call.
+
+    Holds one httpx connection pool and one data client per process so
+    requests reuse warm TLS connections. The registry remembers the pid it
+    was built in and rebuilds itself in a forked child, since sockets
+    inherited from a preloading gunicorn master must not be shared.
+    """
+
+    _lock = threading.RLock()
+    _pid: Optional[int] = None
+    _http: Optional["httpx.Client"] = None
+    _client: Optional["Client"] = None
 
+    @staticmethod
+    def credentials():
+        supabase_url = os.environ.get("SUPABASE_URL", "")
+        supabase_key = os.environ.get("SUPABASE_KEY", "")
+
+        if not supabase_url or not supabase_key:
+            raise ValueError(
+                "SUPABASE_URL and SUPABASE_KEY environment variables must be set"
+            )
+        return supabase_url, supabase_key
+
+    @classmethod
+    def http_client(cls) -> "httpx.Client":
+        import httpx
+
+        if cls._http is None or cls._pid != os.getpid():
+            with cls._lock:
+                if cls._http is None or cls._pid != os.getpid():
+                    cls._reset_locked()
+                    cls._http = httpx.Client(
+                        timeout=httpx.Timeout(POOL_TIMEOUT),
+                        limits=httpx.Limits(
+                            max_connections=POOL_SIZE,
+                            max_keepalive_connections=POOL_SIZE,
+                            keepalive_expiry=POOL_KEEPALIVE,
+                        ),
+                        event_hooks={"response": [on_response]},
+                    )
+                    cls._pid = os.getpid()
+        return cls._http
+
+    @classmethod
+    def build(cls) -> "Client":
+        """Create a new Supabase client on top of the shared connection pool."""
+        from supabase import ClientOptions, create_client
+
+        supabase_url, supabase_key = cls.credentials()
+        options = ClientOptions(
+            httpx_client=cls.http_client(),
+            postgrest_client_timeout=POOL_TIMEOUT,
+            persist_session=False,
+            auto_refresh_token=False,
+        )
+        return create_client(supabase_url, supabase_key, options=options)
+
+    @classmethod
+    def get(cls) -> "Client":
+        if cls._client is None or cls._pid != os.getpid():
+            with cls._lock:
+                cls.http_client()
+                if cls._client is None:
+                    cls._client = cls.build()
+        return cls._client
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the cached clients; the next call builds fresh ones."""
+        with cls._lock:
+            cls._reset_locked()
+
+    @classmethod
+    def _reset_locked(cls) -> None:
+        if cls._http is not None and cls._pid == os.getpid():
+            cls._http.close()
+        cls._http = None
+        cls._client = None
+        cls._pid = None
+
+
+def _reset_after_fork() -> None:
+    # The lock may have been held by another thread at fork time.
+    ClientRegistry._lock = threading.RLock()
+    ClientRegistry._http = None
+    ClientRegistry._client = None
+    ClientRegistry._pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client() -> "Client":
+    return ClientRegistry.get()
+
+
+def warmup() -> None:
+    """Import the lazily loaded client libraries now instead of on first use."""
+    import httpx  # noqa: F401
+    import supabase  # noqa: F401
+    from postgrest import types  # noqa: F401
+
+
+def _normalize_task_dates(data: dict) -> dict:
+    """Store task dates as ISO strings or NULL. Raises ValueError if invalid."""
+    for key in ("start_date", "end_date"):
+        if key in data:
+            data[key] = normalize_date(data[key])
+    return data
+
+
+def _quote(value) -> str:
+    """Quote a value for use inside a PostgREST or=(...) filter."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _page_by_name(
+    table: str, user_id: str, limit: Optional[int], cursor: Optional[str]
+) -> Tuple[List[dict], Optional[str]]:
+    """Keyset page of a table ordered by (name, id)."""
+    limit = clamp_limit(limit)
+    client = get_client()
+    query = client.table(table).select("*").eq("user_id", user_id)
+    if cursor:
+        name, last_id = decode_cursor(cursor)
+        query = query.or_(
+            f"name.gt.{_quote(name)},"
+            f"and(name.eq.{_quote(name)},id.gt.{int(last_id)})"
+        )
+    result = query.order("name").order("id").limit(limit + 1).execute()
+    items = result.data[:limit]
+    next_cursor = None
+    if len(result.data) > limit:
+        next_cursor = encode_cursor([items[-1]["name"], items[-1]["id"]])
+    return items, next_cursor
+
+
+def task_query(
+    client,
+    user_id: str,
+    property_id: int = None,
+    contact_id: int = None,
+    payment_status: str = None,
+    completion_status: str = None,
+    recurring: str = None,
+    start_from: str = None,
+    start_to: str = None,
+    sort: str = "-start_date",
+    limit: int = None,
+):
+    """Unexecuted TaskDAO.query request.
+
+    Query builders are shared with cloud_async, whose client has the same
+    filter API but an awaitable execute().
+    """
+    column, direction = parse_task_sort(sort)
+    query = client.table("tasks").select("*").eq("user_id", user_id)
+    filters = {
+        "property_id": property_id,
+        "contact_id": contact_id,
+        "payment_status": payment_status,
+        "completion_status": completion_status,
+        "recurring": recurring,
+    }
+    for name, value in filters.items():
+        if value is not None:
+            query = query.eq(name, value)
+    if start_from:
+        query = query.gte("start_date", normalize_date(start_from))
+    if start_to:
+        query = query.lt("start_date", day_after(start_to))
+    desc = direction == "DESC"
+    query = query.order(column, desc=desc, nullsfirst=False).order("id", desc=desc)
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def task_id_page(
+    client,
+    user_id: str,
+    last_id: int,
+    page_size: int,
+    columns: str,
+    recurring: Optional[str],
+):
+    """Unexecuted request for the page of tasks after last_id (iter_all)."""
+    query = client.table("tasks").select(columns).eq("user_id", user_id)
+    if recurring:
+        query = query.eq("recurring", recurring)
+    return query.gt("id", last_id).order("id").limit(page_size)
+
+
+def due_soon_queries(client, user_id: str, limit: int):
+    """The two unexecuted get_due_soon requests: with and without an end date."""
+    columns = "id,description,property_id,cost,start_date,end_date"
+
+    def unpaid():
+        return (
+            client.table("tasks")
+            .select(columns)
+            .eq("payment_status", "unpaid")
+            .eq("user_id", user_id)
+        )
 
-def get_client() -> Client:
-    supabase_url = os.environ.get("SUPABASE_URL", "")
-    supabase_key = os.environ.get("SUPABASE_KEY", "")
-
-    if not supabase_url or not supabase_key:
-        raise ValueError(
-            "SUPABASE_URL and SUPABASE_KEY environment variables must be set"
+    with_end = (
+        unpaid().not_.is_("end_date", "null").order("end_date").order("id").limit(limit)
+    )
+    without_end = (
+        unpaid()
+        .is_("end_date", "null")
+        .order("start_date", nullsfirst=False)
+        .order("id")
+        .limit(limit)
+    )
+    return with_end, without_end
+
+
+def merge_due_soon(rows: List[dict], limit: int) -> List[dict]:
+    rows.sort(
+        key=lambda r: (
+            r.get("end_date") or r.get("start_date") or "9999-12-31",
+            r["id"],
         )
+    )
+    return rows[:limit]
 
-    return create_client(supabase_url, supabase_key)
+
+# Columns ReportingService.forecast reads from each recurring task.
+FORECAST_COLUMNS = (
+    "id,property_id,start_date,end_date,cost,recurrence_interval,parent_task_id"
+)
+
+
+def forecast_rows(tasks: List[dict], names: dict):
+    """ForecastService rows for recurring tasks the scheduler has not rolled over."""
+    parents = {t["parent_task_id"] for t in tasks}
+    return (
+        (
+            names.get(t["property_id"]),
+            t["end_date"] or t["start_date"],
+            t["cost"],
+            t["recurrence_interval"],
+        )
+        for t in tasks
+        if t["id"] not in parents
+    )
 
 
 class AuthService:
+    # Signing in stores the user's session on the client and swaps its
+    # Authorization header, so session-changing calls get their own client
+    # (still backed by the shared connection pool) instead of the shared one.
     @staticmethod
     def sign_up(email: str, password: str):
-        client = get_client()
+        client = ClientRegistry.build()
         return client.auth.sign_up({"email": email, "password": password})
 
     @staticmethod
     def sign_in(email: str, password: str):
-        client = get_client()
+        client = ClientRegistry.build()
         return client.auth.sign_in_with_password({"email": email, "password": password})
 
     @staticmethod
     def sign_out():
-        client = get_client()
+        client = ClientRegistry.build()
         return client.auth.sign_out()
 
     @staticmethod
@@ -37,12 +303,14 @@ class AuthService:
         return client.auth.get_user(token)
 
 
+@instrumented("supabase", "properties")
 class PropertyDAO:
     @staticmethod
     def create(data: dict, user_id: str) -> int:
         client = get_client()
         data["user_id"] = user_id
         result = client.table("properties").insert(data).execute()
+        read_cache.invalidate("properties", user_id)
         return result.data[0]["id"]
 
     @staticmethod
@@ -59,15 +327,42 @@ class PropertyDAO:
 
     @staticmethod
     def get_all(user_id: str) -> List[dict]:
-        client = get_client()
-        result = (
-            client.table("properties")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("name")
-            .execute()
-        )
-        return result.data
+        """Every property of the user by name, served from read_cache."""
+
+        def load():
+            client = get_client()
+            result = (
+                client.table("properties")
+                .select("*")
+                .eq("user_id", user_id)
+                .order("name")
+                .execute()
+            )
+            return result.data
+
+        return read_cache.get_or_load("properties", user_id, "all", load)
+
+    @staticmethod
+    def get_page(
+        user_id: str, limit: int = None, cursor: str = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        return _page_by_name("properties", user_id, limit, cursor)
+
+    @staticmethod
+    def get_names(user_id: str) -> dict:
+        """Map property id to name, for labelling task lists."""
+
+        def load():
+            client = get_client()
+            result = (
+                client.table("properties")
+                .select("id,name")
+                .eq("user_id", user_id)
+                .execute()
+            )
+            return {row["id"]: row["name"] for row in result.data}
+
+        return read_cache.get_or_load("properties", user_id, "names", load)
 
     @staticmethod
     def update(id: int, data: dict, user_id: str) -> None:
@@ -75,6 +370,7 @@ class PropertyDAO:
         client.table("properties").update(data).eq("id", id).eq(
             "user_id", user_id
         ).execute()
+        read_cache.invalidate("properties", user_id)
 
     @staticmethod
     def delete(id: int, user_id: str) -> None:
@@ -82,14 +378,17 @@ class PropertyDAO:
         client.table("properties").delete().eq("id", id).eq(
             "user_id", user_id
         ).execute()
+        read_cache.invalidate("properties", user_id)
 
 
+@instrumented("supabase", "contacts")
 class ContactDAO:
     @staticmethod
     def create(data: dict, user_id: str) -> int:
         client = get_client()
         data["user_id"] = user_id
         result = client.table("contacts").insert(data).execute()
+        read_cache.invalidate("contacts", user_id)
         return result.data[0]["id"]
 
     @staticmethod
@@ -106,15 +405,42 @@ class ContactDAO:
 
     @staticmethod
     def get_all(user_id: str) -> List[dict]:
-        client = get_client()
-        result = (
-            client.table("contacts")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("name")
-            .execute()
-        )
-        return result.data
+        """Every contact of the user by name, served from read_cache."""
+
+        def load():
+            client = get_client()
+            result = (
+                client.table("contacts")
+                .select("*")
+                .eq("user_id", user_id)
+                .order("name")
+                .execute()
+            )
+            return result.data
+
+        return read_cache.get_or_load("contacts", user_id, "all", load)
+
+    @staticmethod
+    def get_page(
+        user_id: str, limit: int = None, cursor: str = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        return _page_by_name("contacts", user_id, limit, cursor)
+
+    @staticmethod
+    def get_names(user_id: str) -> dict:
+        """Map contact id to name, for labelling and name lookups."""
+
+        def load():
+            client = get_client()
+            result = (
+                client.table("contacts")
+                .select("id,name")
+                .eq("user_id", user_id)
+                .execute()
+            )
+            return {row["id"]: row["name"] for row in result.data}
+
+        return read_cache.get_or_load("contacts", user_id, "names", load)
 
     @staticmethod
     def get_by_type(service_type: str, user_id: str) -> List[dict]:
@@ -134,21 +460,81 @@ class ContactDAO:
         client.table("contacts").update(data).eq("id", id).eq(
             "user_id", user_id
         ).execute()
+        read_cache.invalidate("contacts", user_id)
 
     @staticmethod
     def delete(id: int, user_id: str) -> None:
         client = get_client()
         client.table("contacts").delete().eq("id", id).eq("user_id", user_id).execute()
+        read_cache.invalidate("contacts", user_id)
 
 
+@instrumented("supabase", "tasks")
 class TaskDAO:
     @staticmethod
     def create(data: dict, user_id: str) -> int:
         client = get_client()
+        _normalize_task_dates(data)
         data["user_id"] = user_id
         result = client.table("tasks").insert(data).execute()
         return result.data[0]["id"]
 
+    @staticmethod
+    def create_many(rows: List[dict], user_id: str) -> List[int]:
+        """Insert tasks with one multi-row insert; returns their ids in order."""
+        if not rows:
+            return []
+        for data in rows:
+            _normalize_task_dates(data)
+            data["user_id"] = user_id
+        client = get_client()
+        result = client.table("tasks").insert(rows).execute()
+        return [row["id"] for row in result.data]
+
+    @staticmethod
+    def insert_imported(rows: List[dict], user_id: str) -> int:
+        """Insert normalized import rows with one request.
+
+        Rows whose (user_id, import_hash) already exists are skipped. Returns
+        the number of rows actually inserted.
+        """
+        if not rows:
+            return 0
+        for data in rows:
+            data["user_id"] = user_id
+        from postgrest.types import CountMethod, ReturnMethod
+
+        client = get_client()
+        result = (
+            client.table("tasks")
+            .upsert(
+                rows,
+                on_conflict="user_id,import_hash",
+                ignore_duplicates=True,
+                returning=ReturnMethod.minimal,
+                count=CountMethod.exact,
+            )
+            .execute()
+        )
+        return result.count or 0
+
+    @staticmethod
+    def update_many(rows: List[dict], user_id: str) -> int:
+        """Update tasks (each row carries its "id") in one RPC call.
+
+        Only the keys present in a row are changed. Rows whose id does not
+        belong to the user are ignored. Returns the number of tasks updated.
+        """
+        if not rows:
+            return 0
+        for data in rows:
+            _normalize_task_dates(data)
+        client = get_client()
+        result = client.rpc(
+            "bulk_update_tasks", {"p_user_id": user_id, "p_rows": rows}
+        ).execute()
+        return result.data or 0
+
     @staticmethod
     def get_by_id(id: int, user_id: str) -> Optional[dict]:
         client = get_client()
@@ -174,56 +560,154 @@ class TaskDAO:
         return result.data
 
     @staticmethod
-    def get_by_property(property_id: int, user_id: str) -> List[dict]:
+    def iter_all(
+        user_id: str,
+        page_size: int = 1000,
+        columns: str = "*",
+        recurring: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """Yield every task in id order, fetching page_size rows per request.
+
+        Pages are keyed on id, so only one page is held in memory and each
+        request costs the same however deep into the table it is. columns
+        must include id.
+        """
         client = get_client()
-        result = (
-            client.table("tasks")
-            .select("*")
-            .eq("property_id", property_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
-        return result.data
+        last_id = 0
+        while True:
+            query = task_id_page(
+                client, user_id, last_id, page_size, columns, recurring
+            )
+            result = query.execute()
+            yield from result.data
+            if len(result.data) < page_size:
+                break
+            last_id = result.data[-1]["id"]
 
     @staticmethod
-    def get_unpaid(user_id: str) -> List[dict]:
+    def get_page(
+        user_id: str, limit: int = None, cursor: str = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Keyset page ordered by (start_date DESC, id DESC), undated tasks last.
+
+        Each page seeks past the previous page's last row, so deep pages
+        cost the same as the first.
+        """
+        limit = clamp_limit(limit)
         client = get_client()
+        query = client.table("tasks").select("*").eq("user_id", user_id)
+        if cursor:
+            start_date, last_id = decode_cursor(cursor)
+            last_id = int(last_id)
+            if start_date is None:
+                query = query.is_("start_date", "null").lt("id", last_id)
+            else:
+                query = query.or_(
+                    f"start_date.lt.{_quote(start_date)},start_date.is.null,"
+                    f"and(start_date.eq.{_quote(start_date)},id.lt.{last_id})"
+                )
         result = (
-            client.table("tasks")
-            .select("*")
-            .eq("payment_status", "unpaid")
-            .eq("user_id", user_id)
+            query.order("start_date", desc=True, nullsfirst=False)
+            .order("id", desc=True)
+            .limit(limit + 1)
             .execute()
         )
-        return result.data
+        items = result.data[:limit]
+        next_cursor = None
+        if len(result.data) > limit:
+            next_cursor = encode_cursor([items[-1]["start_date"], items[-1]["id"]])
+        return items, next_cursor
 
     @staticmethod
-    def get_incomplete(user_id: str) -> List[dict]:
-        client = get_client()
-        result = (
-            client.table("tasks")
-            .select("*")
-            .eq("completion_status", "incomplete")
-            .eq("user_id", user_id)
-            .execute()
+    def query(
+        user_id: str,
+        property_id: int = None,
+        contact_id: int = None,
+        payment_status: str = None,
+        completion_status: str = None,
+        recurring: str = None,
+        start_from: str = None,
+        start_to: str = None,
+        sort: str = "-start_date",
+        limit: int = None,
+    ) -> List[dict]:
+        """Filter and sort tasks in the database; see dao.TaskDAO.query."""
+        query = task_query(
+            get_client(),
+            user_id,
+            property_id=property_id,
+            contact_id=contact_id,
+            payment_status=payment_status,
+            completion_status=completion_status,
+            recurring=recurring,
+            start_from=start_from,
+            start_to=start_to,
+            sort=sort,
+            limit=limit,
         )
-        return result.data
+        return query.execute().data
+
+    @staticmethod
+    def query_page(
+        user_id: str,
+        limit: int = None,
+        cursor: str = None,
+        sort: str = "-start_date",
+        **filters,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Keyset page of TaskDAO.query results; see dao.TaskDAO.query_page."""
+        limit = clamp_limit(limit)
+        column, direction = parse_task_sort(sort)
+        query = task_query(get_client(), user_id, sort=sort, limit=limit + 1, **filters)
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            op = "lt" if direction == "DESC" else "gt"
+            last_id = int(last_id)
+            if value is None:
+                query = query.is_(column, "null").filter("id", op, last_id)
+            else:
+                query = query.or_(
+                    f"{column}.{op}.{_quote(value)},{column}.is.null,"
+                    f"and({column}.eq.{_quote(value)},id.{op}.{last_id})"
+                )
+        rows = query.execute().data
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor([items[-1][column], items[-1]["id"]])
+        return items, next_cursor
+
+    @staticmethod
+    def get_by_property(property_id: int, user_id: str) -> List[dict]:
+        return TaskDAO.query(user_id, property_id=property_id)
+
+    @staticmethod
+    def get_unpaid(user_id: str) -> List[dict]:
+        return TaskDAO.query(user_id, payment_status="unpaid")
+
+    @staticmethod
+    def get_incomplete(user_id: str) -> List[dict]:
+        return TaskDAO.query(user_id, completion_status="incomplete")
 
     @staticmethod
     def get_recurring(user_id: str) -> List[dict]:
-        client = get_client()
-        result = (
-            client.table("tasks")
-            .select("*")
-            .eq("recurring", "yes")
-            .eq("user_id", user_id)
-            .execute()
-        )
-        return result.data
+        return TaskDAO.query(user_id, recurring="yes")
+
+    @staticmethod
+    def get_due_soon(user_id: str, limit: int = 10) -> List[dict]:
+        """Unpaid tasks ordered by due date (end date, else start date).
+
+        PostgREST cannot order by an expression, so tasks with and without
+        an end date are fetched as two bounded queries and merged here.
+        """
+        with_end, without_end = due_soon_queries(get_client(), user_id, limit)
+        rows = with_end.execute().data + without_end.execute().data
+        return merge_due_soon(rows, limit)
 
     @staticmethod
     def update(id: int, data: dict, user_id: str) -> None:
         client = get_client()
+        _normalize_task_dates(data)
         client.table("tasks").update(data).eq("id", id).eq("user_id", user_id).execute()
 
     @staticmethod
@@ -232,84 +716,143 @@ class TaskDAO:
         client.table("tasks").delete().eq("id", id).eq("user_id", user_id).execute()
 
 
-class ReportingService:
+@instrumented("supabase", "data_versions")
+class DataVersionDAO:
     @staticmethod
-    def monthly_breakdown(year: int, month: int, user_id: str) -> dict:
+    def get(user_id: str) -> int:
+        """The user's change counter, bumped by triggers on every write."""
         client = get_client()
-        month_str = f"{year}-{month:02d}%"
-
         result = (
-            client.table("tasks")
-            .select("property_id,cost,properties!inner(name)")
-            .like("start_date", month_str)
-            .eq("tasks.user_id", user_id)
+            client.table("data_versions")
+            .select("version")
+            .eq("user_id", user_id)
+            .limit(1)
             .execute()
         )
+        return result.data[0]["version"] if result.data else 0
 
-        breakdown = {}
-        total = 0
-        for row in result.data:
-            if row.get("properties"):
-                prop_name = row["properties"]["name"]
-                cost = row["cost"] or 0
-                breakdown[prop_name] = breakdown.get(prop_name, 0) + cost
-                total += cost
-
-        breakdown["total"] = total
-        return breakdown
 
+@instrumented("supabase", "tasks")
+class RecurringService:
     @staticmethod
-    def yearly_projection(user_id: str) -> float:
+    def schedule(
+        user_id: Optional[str] = None,
+        today: Optional[str] = None,
+        lead_days: int = 0,
+    ) -> int:
+        """Materialize the next task of every recurring series due to roll over.
+
+        One call to the schedule_recurring_tasks function (supabase/migrations)
+        finds the due tasks and inserts their successors in one statement;
+        user_id None covers every user (for the background job). Returns the
+        number of tasks created.
+        """
         client = get_client()
+        result = client.rpc(
+            "schedule_recurring_tasks",
+            {
+                "p_user_id": user_id,
+                "p_today": normalize_date(today or date.today()),
+                "p_lead_days": lead_days,
+            },
+        ).execute()
+        return int(result.data or 0)
 
-        # Project yearly cost from recurring tasks.
-        # Include recurring tasks regardless of completion_status.
-        result = (
-            client.table("tasks")
-            .select("cost,recurrence_interval")
-            .eq("recurring", "yes")
-            .eq("user_id", user_id)
-            .execute()
+    @staticmethod
+    def calendar(
+        user_id: str, start: str, end: str, property_id: Optional[int] = None
+    ) -> List[dict]:
+        """Stored and virtual recurring tasks starting within [start, end].
+
+        Stored tasks come from one range query and series heads from the
+        recurring_series_heads function; services.RecurringService.expand
+        merges them with the lazily generated occurrences.
+        """
+        first, last = calendar_window(start, end)
+        stored = TaskDAO.query(
+            user_id,
+            property_id=property_id,
+            start_from=first.isoformat(),
+            start_to=last.isoformat(),
+            sort="start_date",
         )
+        client = get_client()
+        heads = client.rpc(
+            "recurring_series_heads",
+            {
+                "p_user_id": user_id,
+                "p_until": last.isoformat(),
+                "p_property_id": property_id,
+            },
+        ).execute()
+        expand = services.RecurringService.expand
+        return list(expand(stored, heads.data or [], first, last))
 
-        yearly_total = 0
-        for row in result.data:
-            cost = row["cost"] or 0
-            interval = row.get("recurrence_interval", "")
-
-            if interval == "daily":
-                yearly_total += cost * 365
-            elif interval == "weekly":
-                yearly_total += cost * 52
-            elif interval == "monthly":
-                yearly_total += cost * 12
-            elif interval == "yearly":
-                yearly_total += cost
-            else:
-                yearly_total += cost
 
-        return yearly_total
+@instrumented("supabase", "reports")
+class ReportingService:
+    # Each report is a single Postgres function (see supabase/migrations),
+    # so only the aggregated result crosses the network. The cost summary and
+    # monthly breakdown read the trigger-maintained task_cost_rollup table.
+    @staticmethod
+    def monthly_breakdown(year: int, month: int, user_id: str) -> dict:
+        client = get_client()
+        result = client.rpc(
+            "report_monthly_breakdown",
+            {"p_user_id": user_id, "p_year": year, "p_month": month},
+        ).execute()
+        return {name: float(total) for name, total in (result.data or {}).items()}
 
     @staticmethod
-    def cost_summary(user_id: str) -> dict:
+    def trend(start: str, end: str, group_by: str, user_id: str) -> dict:
+        """Monthly cost per property, contact or service type over a month range."""
+        months = trend_months(start, end, group_by)
         client = get_client()
+        result = client.rpc(
+            "report_trend",
+            {
+                "p_user_id": user_id,
+                "p_from": months[0],
+                "p_to": months[-1],
+                "p_group_by": group_by,
+            },
+        ).execute()
+        rows = [(r["month"], r["name"], r["total"]) for r in result.data or []]
+        return trend_matrix(months, group_by, rows)
 
-        paid_result = (
-            client.table("tasks")
-            .select("cost")
-            .eq("payment_status", "paid")
-            .eq("user_id", user_id)
-            .execute()
-        )
-        unpaid_result = (
-            client.table("tasks")
-            .select("cost")
-            .eq("payment_status", "unpaid")
-            .eq("user_id", user_id)
-            .execute()
+    @staticmethod
+    def forecast(user_id: str, start: Optional[str] = None, months: int = 12) -> dict:
+        """Projected recurring spend per property for each month of a horizon.
+
+        Recurring tasks are paged in with only the columns the forecast needs
+        and counted by services.ForecastService. Tasks the scheduler has
+        already rolled over (they have a child) are left out.
+        """
+        keys = forecast_months(start, months)
+        names = PropertyDAO.get_names(user_id)
+        tasks = list(
+            TaskDAO.iter_all(user_id, columns=FORECAST_COLUMNS, recurring="yes")
         )
+        rows = forecast_rows(tasks, names)
+        return services.ForecastService.project(rows, keys)
 
-        paid = sum(r["cost"] or 0 for r in paid_result.data)
-        unpaid = sum(r["cost"] or 0 for r in unpaid_result.data)
+    @staticmethod
+    def yearly_projection(user_id: str) -> float:
+        """Projected recurring spend over the next twelve months."""
+        return ReportingService.forecast(user_id)["total"]
 
-        return {"paid": paid, "unpaid": unpaid, "total": paid + unpaid}
+    @staticmethod
+    def cost_summary(user_id: str) -> dict:
+        client = get_client()
+        result = client.rpc("report_cost_summary", {"p_user_id": user_id}).execute()
+        data = result.data or {}
+        return {key: float(data.get(key) or 0) for key in ("paid", "unpaid", "total")}
+
+    @staticmethod
+    def rebuild_rollup(user_id: str) -> None:
+        """Recompute the user's task_cost_rollup rows (backfill/repair).
+
+        The rollup is otherwise kept current by triggers on tasks.
+        """
+        client = get_client()
+        client.rpc("rebuild_task_cost_rollup", {"p_user_id": user_id}).execute()
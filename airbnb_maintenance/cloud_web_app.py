@@ -1,28 +1,130 @@
-from flask import Flask, jsonify, request, render_template, session
+"""Cloud web app: Flask routes on Supabase, built by create_app().
+
+Importing this module only defines the routes on a blueprint; the Supabase
+SDK, httpx and NumPy are imported on first use (see cloud_db and services).
+create_app() builds the app and, unless config["PRELOAD"] is set, also runs
+warmup() and start_worker(). Under gunicorn with preload_app (gunicorn.conf.py)
+the master runs warmup() once so forked workers inherit the imports, and each
+worker calls start_worker() from post_fork. startup_timings() reports how long
+each step took, and the time to the first response, on /api/health.
+"""
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    g,
+    jsonify,
+    request,
+    render_template,
+    session,
+)
 import os
-from functools import wraps
+from datetime import date
+from dataclasses import asdict
+from functools import partial, wraps
+from typing import Optional
+
+from airbnb_maintenance import cloud_db
+from airbnb_maintenance import exporter, metrics, profiling, scheduler, tracing
+from airbnb_maintenance.cache import read_cache
+from airbnb_maintenance.cloud_db import AuthService
+from airbnb_maintenance.importer import (
+    FORMATS,
+    ImportFileError,
+    detect_format,
+    import_records,
+    iter_records,
+    name_lookup,
+    text_stream,
+)
+
+bp = Blueprint("cloud", __name__)
 
-print("Starting app...")
+PropertyDAO = cloud_db.PropertyDAO
+ContactDAO = cloud_db.ContactDAO
+TaskDAO = cloud_db.TaskDAO
+ReportingService = cloud_db.ReportingService
 
-try:
-    from airbnb_maintenance import cloud_db
-    from airbnb_maintenance.cloud_db import AuthService
+# Largest list accepted by the /api/tasks/batch endpoints.
+MAX_BATCH = int(os.environ.get("MAX_BATCH", 1000))
+
+# Fans out independent Supabase queries for endpoints that need several.
+executor = tracing.ContextThreadPoolExecutor(
+    max_workers=int(os.environ.get("FANOUT_WORKERS", 8))
+)
+
+# Seconds spent in each startup step of this process, filled in as they run.
+_startup = {"import_s": round(time.perf_counter() - IMPORT_STARTED, 4)}
+
+
+def _timed(step: str, started: float) -> None:
+    _startup[step] = round(time.perf_counter() - started, 4)
+
+
+def create_app(config: Optional[dict] = None) -> Flask:
+    """Build the cloud Flask app; config overrides Flask config keys.
+
+    Set PRELOAD when the app is built in a preloading master that calls
+    warmup() itself and start_worker() in each forked worker.
+    """
+    started = time.perf_counter()
+    app = Flask(__name__, template_folder="templates")
+    app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
+    app.config.update(config or {})
+    app.register_blueprint(bp)
+    # Opt-in (PROFILE_TOKEN): cProfile/tracemalloc hooks and /api/debug/profiles.
+    profiling.init_app(app)
+    if not os.environ.get("SUPABASE_URL") or not os.environ.get("SUPABASE_KEY"):
+        app.logger.warning("SUPABASE_URL and SUPABASE_KEY must be set")
+    _timed("create_app_s", started)
+    if not app.config.get("PRELOAD"):
+        warmup()
+        start_worker()
+    return app
+
+
+def warmup() -> None:
+    """Import the lazily loaded dependencies ahead of the first request."""
+    started = time.perf_counter()
+    cloud_db.warmup()
+    import numpy  # noqa: F401  (ForecastService)
+
+    _timed("warmup_s", started)
+
+
+def start_worker() -> None:
+    """Per-process startup; call in each worker after any fork.
+
+    Threads and sockets do not survive a fork, so the scheduler thread and
+    the Supabase connection pool are started here rather than in a master.
+    """
+    started = time.perf_counter()
+    _startup["worker_started"] = started
+    # Opt-in (SCHEDULER_INTERVAL): roll recurring tasks over for every user.
+    scheduler.start(
+        lambda: cloud_db.RecurringService.schedule(
+            lead_days=scheduler.SCHEDULER_LEAD_DAYS
+        )
+    )
+    cloud_db.ClientRegistry.http_client()
+    _timed("start_worker_s", started)
 
-    print("Imported cloud_db")
-except Exception as e:
-    print(f"Error importing cloud_db: {e}")
-    raise
 
-app = Flask(__name__, template_folder="templates")
-app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
+def startup_timings() -> dict:
+    return {k: v for k, v in _startup.items() if k != "worker_started"}
 
-print(f"SUPABASE_URL set: {bool(os.environ.get('SUPABASE_URL'))}")
-print(f"SUPABASE_KEY set: {bool(os.environ.get('SUPABASE_KEY'))}")
 
-PropertyDAO = cloud_db.PropertyDAO
-ContactDAO = cloud_db.ContactDAO
-TaskDAO = cloud_db.TaskDAO
-ReportingService = cloud_db.ReportingService
+@bp.after_app_request
+def record_first_response(response):
+    """Time from worker start (or module import) to the first response."""
+    if "first_response_s" not in _startup:
+        origin = _startup.get("worker_started", IMPORT_STARTED)
+        _timed("first_response_s", origin)
+    return response
 
 
 def get_user_id():
@@ -30,22 +132,136 @@ def get_user_id():
     return session.get("user_id")
 
 
+# GET endpoints whose responses do not depend on the user's data version.
+UNVERSIONED_PATHS = (
+    "/api/auth/",
+    "/api/cache/",
+    "/api/health",
+    "/api/metrics",
+    "/api/debug/",
+)
+
+
+def data_etag(user_id, version) -> str:
+    """ETag of a user's data responses; also used by cloud_asgi."""
+    return f"{user_id}-{version}-{date.today():%Y%m%d}"
+
+
+@bp.before_app_request
+def start_timer():
+    # Registered first so it also runs for requests check_etag answers.
+    g.request_started = time.perf_counter()
+    tracing.begin(f"{request.method} {request.path}")
+
+
+@bp.after_app_request
+def record_latency(response):
+    """Per-route latency and 5xx counts for /api/metrics, and the request's
+    query trace (see tracing). Runs last."""
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        elapsed = time.perf_counter() - started
+        metrics.record_request(route, request.method, response.status_code, elapsed)
+    trace = tracing.finish()
+    if trace is not None and tracing.DB_TRACE:
+        response.headers[tracing.TRACE_HEADER] = trace.header()
+    return response
+
+
+@bp.before_app_request
+def check_etag():
+    """Answer a GET whose If-None-Match is still current with 304, unqueried.
+
+    The ETag is the user's data_versions counter (bumped by triggers on every
+    write) plus today's date, since due-soon lists and forecasts move with
+    the day. Endpoints that do not serve user data are left alone.
+    """
+    if request.method != "GET" or not request.path.startswith("/api/"):
+        return None
+    user_id = get_user_id()
+    if not user_id or request.path.startswith(UNVERSIONED_PATHS):
+        return None
+    g.etag = data_etag(user_id, cloud_db.DataVersionDAO.get(user_id))
+    if request.if_none_match.contains(g.etag):
+        response = Response(status=304)
+        response.set_etag(g.etag)
+        return response
+    return None
+
+
+@bp.after_app_request
+def add_etag(response):
+    etag = g.pop("etag", None)
+    if etag and response.status_code == 200:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# Legacy ?status= values and the TaskDAO.query filter each one maps to.
+STATUS_FILTERS = {
+    "unpaid": ("payment_status", "unpaid"),
+    "incomplete": ("completion_status", "incomplete"),
+    "recurring": ("recurring", "yes"),
+}
+
+
+def task_filters():
+    """Collect TaskDAO.query keyword arguments from the query string."""
+    args = request.args
+    filters = {}
+    for name in ("property_id", "contact_id"):
+        value = args.get(name, type=int)
+        if value is not None:
+            filters[name] = value
+    for name in (
+        "payment_status",
+        "completion_status",
+        "recurring",
+        "start_from",
+        "start_to",
+        "sort",
+    ):
+        if args.get(name):
+            filters[name] = args.get(name)
+    if args.get("status") in STATUS_FILTERS:
+        name, value = STATUS_FILTERS[args.get("status")]
+        filters.setdefault(name, value)
+    return filters
+
+
+def page_response(get_page, user_id):
+    """Keyset page envelope when the client sent limit/cursor, else None."""
+    if "limit" not in request.args and "cursor" not in request.args:
+        return None
+    try:
+        items, next_cursor = get_page(
+            user_id,
+            limit=request.args.get("limit", type=int),
+            cursor=request.args.get("cursor"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+
 # Auth routes
-@app.route("/")
+@bp.route("/")
 def index():
     if "user_id" in session:
         return render_template("index.html")
     return render_template("login.html")
 
 
-@app.route("/login")
+@bp.route("/login")
 def login_page():
     if "user_id" in session:
         return render_template("index.html")
     return render_template("login.html")
 
 
-@app.route("/api/auth/signup", methods=["POST"])
+@bp.route("/api/auth/signup", methods=["POST"])
 def signup():
     data = request.json
     try:
@@ -57,7 +273,7 @@ def signup():
         return jsonify({"error": str(e)}), 400
 
 
-@app.route("/api/auth/login", methods=["POST"])
+@bp.route("/api/auth/login", methods=["POST"])
 def login():
     data = request.json
     try:
@@ -71,37 +287,46 @@ def login():
         return jsonify({"error": str(e)}), 401
 
 
-@app.route("/api/auth/logout", methods=["POST"])
+@bp.route("/api/auth/logout", methods=["POST"])
 def logout():
     session.clear()
     return jsonify({"message": "Logged out"})
 
 
-@app.route("/api/auth/me", methods=["GET"])
+@bp.route("/api/auth/me", methods=["GET"])
 def me():
     if "user_id" in session:
         return jsonify({"user": session.get("user"), "user_id": session.get("user_id")})
     return jsonify({"user": None})
 
 
-@app.route("/api/health")
+@bp.route("/api/health")
 def health():
-    return jsonify({"status": "ok", "logged_in": "user_id" in session})
+    return jsonify(
+        {
+            "status": "ok",
+            "logged_in": "user_id" in session,
+            "startup": startup_timings(),
+        }
+    )
 
 
 # Properties
-@app.route("/api/properties", methods=["GET"])
+@bp.route("/api/properties", methods=["GET"])
 def get_properties():
     user_id = get_user_id()
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
     try:
+        page = page_response(PropertyDAO.get_page, user_id)
+        if page is not None:
+            return page
         return jsonify(PropertyDAO.get_all(user_id))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/properties/<int:id>", methods=["GET"])
+@bp.route("/api/properties/<int:id>", methods=["GET"])
 def get_property(id):
     user_id = get_user_id()
     if not user_id:
@@ -110,7 +335,7 @@ def get_property(id):
     return jsonify(prop)
 
 
-@app.route("/api/properties", methods=["POST"])
+@bp.route("/api/properties", methods=["POST"])
 def create_property():
     user_id = get_user_id()
     if not user_id:
@@ -127,7 +352,7 @@ def create_property():
     return jsonify({"id": pid}), 201
 
 
-@app.route("/api/properties/<int:id>", methods=["PUT"])
+@bp.route("/api/properties/<int:id>", methods=["PUT"])
 def update_property(id):
     user_id = get_user_id()
     if not user_id:
@@ -145,7 +370,7 @@ def update_property(id):
     return jsonify({"success": True})
 
 
-@app.route("/api/properties/<int:id>", methods=["DELETE"])
+@bp.route("/api/properties/<int:id>", methods=["DELETE"])
 def delete_property(id):
     user_id = get_user_id()
     if not user_id:
@@ -155,7 +380,7 @@ def delete_property(id):
 
 
 # Contacts
-@app.route("/api/contacts", methods=["GET"])
+@bp.route("/api/contacts", methods=["GET"])
 def get_contacts():
     user_id = get_user_id()
     if not user_id:
@@ -163,10 +388,13 @@ def get_contacts():
     service_type = request.args.get("service_type")
     if service_type:
         return jsonify(ContactDAO.get_by_type(service_type, user_id))
+    page = page_response(ContactDAO.get_page, user_id)
+    if page is not None:
+        return page
     return jsonify(ContactDAO.get_all(user_id))
 
 
-@app.route("/api/contacts/<int:id>", methods=["GET"])
+@bp.route("/api/contacts/<int:id>", methods=["GET"])
 def get_contact(id):
     user_id = get_user_id()
     if not user_id:
@@ -175,7 +403,7 @@ def get_contact(id):
     return jsonify(contact)
 
 
-@app.route("/api/contacts", methods=["POST"])
+@bp.route("/api/contacts", methods=["POST"])
 def create_contact():
     user_id = get_user_id()
     if not user_id:
@@ -194,7 +422,7 @@ def create_contact():
     return jsonify({"id": cid}), 201
 
 
-@app.route("/api/contacts/<int:id>", methods=["PUT"])
+@bp.route("/api/contacts/<int:id>", methods=["PUT"])
 def update_contact(id):
     user_id = get_user_id()
     if not user_id:
@@ -214,7 +442,7 @@ def update_contact(id):
     return jsonify({"success": True})
 
 
-@app.route("/api/contacts/<int:id>", methods=["DELETE"])
+@bp.route("/api/contacts/<int:id>", methods=["DELETE"])
 def delete_contact(id):
     user_id = get_user_id()
     if not user_id:
@@ -224,27 +452,43 @@ def delete_contact(id):
 
 
 # Tasks
-@app.route("/api/tasks", methods=["GET"])
+@bp.route("/api/tasks", methods=["GET"])
 def get_tasks():
     user_id = get_user_id()
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
 
-    property_id = request.args.get("property_id")
-    status = request.args.get("status")
-
-    if property_id:
-        return jsonify(TaskDAO.get_by_property(int(property_id), user_id))
-    elif status == "unpaid":
-        return jsonify(TaskDAO.get_unpaid(user_id))
-    elif status == "incomplete":
-        return jsonify(TaskDAO.get_incomplete(user_id))
-    elif status == "recurring":
-        return jsonify(TaskDAO.get_recurring(user_id))
+    filters = task_filters()
+    get_page = partial(TaskDAO.query_page, **filters) if filters else TaskDAO.get_page
+    page = page_response(get_page, user_id)
+    if page is not None:
+        return page
+    if filters:
+        try:
+            return jsonify(TaskDAO.query(user_id, **filters))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
     return jsonify(TaskDAO.get_all(user_id))
 
 
-@app.route("/api/tasks/<int:id>", methods=["GET"])
+@bp.route("/api/tasks/export", methods=["GET"])
+def export_tasks():
+    """Stream every task as CSV or NDJSON (?format=, default csv)."""
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    fmt = request.args.get("format", "csv")
+    if fmt not in exporter.FORMATS:
+        formats = ", ".join(exporter.FORMATS)
+        return jsonify({"error": f"format must be one of {formats}"}), 400
+    return Response(
+        exporter.export_rows(TaskDAO.iter_all(user_id), fmt),
+        mimetype=exporter.MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{fmt}"},
+    )
+
+
+@bp.route("/api/tasks/<int:id>", methods=["GET"])
 def get_task(id):
     user_id = get_user_id()
     if not user_id:
@@ -253,62 +497,137 @@ def get_task(id):
     return jsonify(task)
 
 
-@app.route("/api/tasks", methods=["POST"])
+TASK_COLUMNS = (
+    "property_id",
+    "contact_id",
+    "description",
+    "start_date",
+    "start_time",
+    "end_date",
+    "end_time",
+    "cost",
+    "payment_status",
+    "completion_status",
+    "recurring",
+    "recurrence_interval",
+    "notes",
+)
+
+
+def task_payload(data, update=False):
+    """Task columns from a request body; create fills status defaults."""
+    return {
+        "property_id": data.get("property_id"),
+        "contact_id": data.get("contact_id"),
+        "description": data.get("description"),
+        "start_date": data.get("start_date", ""),
+        "start_time": data.get("start_time", ""),
+        "end_date": data.get("end_date", ""),
+        "end_time": data.get("end_time", ""),
+        "cost": data.get("cost", 0),
+        "payment_status": data.get("payment_status", None if update else "unpaid"),
+        "completion_status": data.get(
+            "completion_status", None if update else "incomplete"
+        ),
+        "recurring": data.get("recurring", "no"),
+        "recurrence_interval": data.get("recurrence_interval", ""),
+        "notes": data.get("notes", ""),
+    }
+
+
+@bp.route("/api/tasks", methods=["POST"])
 def create_task():
     user_id = get_user_id()
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
     data = request.json
-    tid = TaskDAO.create(
-        {
-            "property_id": data.get("property_id"),
-            "contact_id": data.get("contact_id"),
-            "description": data.get("description"),
-            "start_date": data.get("start_date", ""),
-            "start_time": data.get("start_time", ""),
-            "end_date": data.get("end_date", ""),
-            "end_time": data.get("end_time", ""),
-            "cost": data.get("cost", 0),
-            "payment_status": data.get("payment_status", "unpaid"),
-            "completion_status": data.get("completion_status", "incomplete"),
-            "recurring": data.get("recurring", "no"),
-            "recurrence_interval": data.get("recurrence_interval", ""),
-            "notes": data.get("notes", ""),
-        },
-        user_id,
-    )
+    try:
+        tid = TaskDAO.create(task_payload(data), user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify({"id": tid}), 201
 
 
-@app.route("/api/tasks/<int:id>", methods=["PUT"])
+@bp.route("/api/tasks/<int:id>", methods=["PUT"])
 def update_task(id):
     user_id = get_user_id()
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
     data = request.json
-    TaskDAO.update(
-        id,
-        {
-            "property_id": data.get("property_id"),
-            "contact_id": data.get("contact_id"),
-            "description": data.get("description"),
-            "start_date": data.get("start_date", ""),
-            "start_time": data.get("start_time", ""),
-            "end_date": data.get("end_date", ""),
-            "end_time": data.get("end_time", ""),
-            "cost": data.get("cost", 0),
-            "payment_status": data.get("payment_status"),
-            "completion_status": data.get("completion_status"),
-            "recurring": data.get("recurring", "no"),
-            "recurrence_interval": data.get("recurrence_interval", ""),
-            "notes": data.get("notes", ""),
-        },
-        user_id,
-    )
+    try:
+        TaskDAO.update(id, task_payload(data, update=True), user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify({"success": True})
 
 
-@app.route("/api/tasks/<int:id>", methods=["DELETE"])
+def batch_body():
+    """The "tasks" list of a batch request, or raise ValueError."""
+    tasks = (request.json or {}).get("tasks")
+    if not isinstance(tasks, list) or not tasks:
+        raise ValueError("Body must be {\"tasks\": [...]} with at least one task")
+    if len(tasks) > MAX_BATCH:
+        raise ValueError(f"At most {MAX_BATCH} tasks per batch")
+    return tasks
+
+
+@bp.route("/api/tasks/batch", methods=["POST"])
+def create_tasks_batch():
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        rows = [task_payload(data) for data in batch_body()]
+        ids = TaskDAO.create_many(rows, user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"ids": ids}), 201
+
+
+@bp.route("/api/tasks/batch", methods=["PUT"])
+def update_tasks_batch():
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        tasks = batch_body()
+        if any(not isinstance(data.get("id"), int) for data in tasks):
+            raise ValueError("Every task in a batch update needs an integer id")
+        # Partial rows: only the fields each task sends are changed.
+        rows = [
+            {key: data[key] for key in ("id",) + TASK_COLUMNS if key in data}
+            for data in tasks
+        ]
+        updated = TaskDAO.update_many(rows, user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"updated": updated})
+
+
+@bp.route("/api/tasks/import", methods=["POST"])
+def import_tasks():
+    """Stream a CSV/NDJSON upload (multipart "file" or raw body) into tasks."""
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    upload = request.files.get("file")
+    fmt = request.args.get("format") or detect_format(upload.filename if upload else "")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(FORMATS)}"}), 400
+    stream = text_stream(upload.stream if upload else request.stream)
+    try:
+        result = import_records(
+            iter_records(stream, fmt),
+            lambda rows: TaskDAO.insert_imported(rows, user_id),
+            name_lookup(PropertyDAO.get_names(user_id)),
+            name_lookup(ContactDAO.get_names(user_id)),
+        )
+    except ImportFileError as e:
+        return jsonify({"error": str(e), "row": e.row}), 400
+    return jsonify(asdict(result))
+
+
+@bp.route("/api/tasks/<int:id>", methods=["DELETE"])
 def delete_task(id):
     user_id = get_user_id()
     if not user_id:
@@ -317,8 +636,46 @@ def delete_task(id):
     return jsonify({"success": True})
 
 
+# Dashboard
+@bp.route("/api/dashboard", methods=["GET"])
+def get_dashboard():
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    limit = min(request.args.get("limit", 10, type=int), 50)
+    try:
+        summary = executor.submit(ReportingService.cost_summary, user_id)
+        projection = executor.submit(ReportingService.yearly_projection, user_id)
+        names = executor.submit(PropertyDAO.get_names, user_id)
+        due_soon = executor.submit(TaskDAO.get_due_soon, user_id, limit)
+        return jsonify(
+            {
+                "summary": summary.result(),
+                "yearly_projection": projection.result(),
+                "properties": names.result(),
+                "due_soon": due_soon.result(),
+            }
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Route and DAO latency histograms in the Prometheus text format."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+
+@bp.route("/api/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """Hit/miss counters of this worker's property/contact read cache."""
+    if not get_user_id():
+        return jsonify({"error": "Not authenticated"}), 401
+    return jsonify(read_cache.stats())
+
+
 # Reports
-@app.route("/api/reports/summary", methods=["GET"])
+@bp.route("/api/reports/summary", methods=["GET"])
 def get_summary():
     user_id = get_user_id()
     if not user_id:
@@ -326,15 +683,26 @@ def get_summary():
     return jsonify(ReportingService.cost_summary(user_id))
 
 
-@app.route("/api/reports/projection", methods=["GET"])
+@bp.route("/api/reports/projection", methods=["GET"])
 def get_projection():
+    """Recurring-spend forecast: ?from=YYYY-MM (default this month)&months=12."""
     user_id = get_user_id()
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
-    return jsonify({"yearly_projection": ReportingService.yearly_projection(user_id)})
+    try:
+        forecast = ReportingService.forecast(
+            user_id,
+            request.args.get("from"),
+            request.args.get("months", 12, type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if len(forecast["totals"]) >= 12:
+        forecast["yearly_projection"] = round(sum(forecast["totals"][:12]), 2)
+    return jsonify(forecast)
 
 
-@app.route("/api/reports/monthly", methods=["GET"])
+@bp.route("/api/reports/monthly", methods=["GET"])
 def get_monthly():
     user_id = get_user_id()
     if not user_id:
@@ -346,10 +714,52 @@ def get_monthly():
 
         now = datetime.now()
         year, month = now.year, now.month
+    if not 1 <= month <= 12:
+        return jsonify({"error": "month must be between 1 and 12"}), 400
     return jsonify(ReportingService.monthly_breakdown(year, month, user_id))
 
 
+@bp.route("/api/calendar", methods=["GET"])
+def get_calendar():
+    """Tasks starting in ?from=&to= (inclusive), with recurring series expanded.
+
+    Occurrences not yet created by the scheduler are included with
+    "virtual": true and the id of the task they repeat as source_task_id.
+    """
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        items = cloud_db.RecurringService.calendar(
+            user_id,
+            request.args.get("from", ""),
+            request.args.get("to", ""),
+            request.args.get("property_id", type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"items": items})
+
+
+@bp.route("/api/reports/trend", methods=["GET"])
+def get_trend():
+    """Month-by-group cost matrix: ?from=YYYY-MM&to=YYYY-MM&group_by=property."""
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        trend = ReportingService.trend(
+            request.args.get("from", ""),
+            request.args.get("to", ""),
+            request.args.get("group_by", "property"),
+            user_id,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(trend)
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    print(f"Starting server on port {port}")
+    app = create_app()
     app.run(host="0.0.0.0", port=port, debug=False)
@@ -2,10 +2,26 @@ import os
 from pathlib import Path
 
 def get_db_path():
-    """Get default database path in user's Documents folder."""
+    """Get default database path in user's Documents folder.
+    
+    AIRBNB_DB_PATH overrides it (the benchmarks use a scratch database).
+    """
+    if os.environ.get("AIRBNB_DB_PATH"):
+        return Path(os.environ["AIRBNB_DB_PATH"])
     documents = Path.home() / "Documents"
     db_dir = documents / "airbnb_maintenance"
     db_dir.mkdir(parents=True, exist_ok=True)
     return db_dir / "maintenance.db"
 
 DB_PATH = get_db_path()
+
+# SQLite connection tuning (see database.get_connection)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+# Statement timing and the slow-query log (see querylog)
+SQLITE_QUERY_STATS = os.environ.get("SQLITE_QUERY_STATS", "1").lower() not in ("0", "false", "no")
+SQLITE_SLOW_MS = float(os.environ.get("SQLITE_SLOW_MS", 100))
+SQLITE_STATS_FLUSH = float(os.environ.get("SQLITE_STATS_FLUSH", 30))
+QUERY_STATS_PATH = DB_PATH.with_name("query_stats.db")
@@ -1,230 +1,504 @@
 import sqlite3
-from typing import Optional, List
-from .database import get_connection
+from typing import Optional, List, Dict, Tuple, Iterator
+from .database import connection, get_connection
 from .models import Property, Contact, Task
+from .dates import normalize_date, day_after
+from .pagination import clamp_limit, encode_cursor, decode_cursor, parse_task_sort
+from .metrics import instrumented
 
+
+_TASK_INSERT = """INSERT INTO tasks (property_id, contact_id, description, start_date, start_time,
+    end_date, end_time, cost, payment_status, completion_status, recurring,
+    recurrence_interval, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Scheduler inserts: idx_tasks_parent makes a second child of the same parent a no-op.
+_TASK_INSERT_SCHEDULED = """INSERT OR IGNORE INTO tasks (property_id, contact_id, description,
+    start_date, start_time, end_date, end_time, cost, payment_status, completion_status,
+    recurring, recurrence_interval, notes, parent_task_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_TASK_UPDATE = """UPDATE tasks SET property_id=?, contact_id=?, description=?, start_date=?, start_time=?,
+    end_date=?, end_time=?, cost=?, payment_status=?, completion_status=?, recurring=?,
+    recurrence_interval=?, notes=?
+    WHERE id=?"""
+
+
+# Columns a partial update (TaskDAO.update_many) may set.
+TASK_COLUMNS = ('property_id', 'contact_id', 'description', 'start_date', 'start_time',
+                'end_date', 'end_time', 'cost', 'payment_status', 'completion_status',
+                'recurring', 'recurrence_interval', 'notes')
+
+
+def _task_params(task: Task) -> tuple:
+    """Column values for _TASK_INSERT (append task.id for _TASK_UPDATE)."""
+    return (task.property_id, task.contact_id, task.description, normalize_date(task.start_date),
+            task.start_time, normalize_date(task.end_date), task.end_time, task.cost,
+            task.payment_status, task.completion_status, task.recurring,
+            task.recurrence_interval, task.notes)
+
+
+def _task_filters(property_id: int = None, contact_id: int = None, payment_status: str = None,
+                  completion_status: str = None, recurring: str = None, start_from: str = None,
+                  start_to: str = None) -> Tuple[List[str], list]:
+    """WHERE clauses and parameters for the TaskDAO.query filters."""
+    clauses, params = [], []
+    for name, value in (('property_id', property_id), ('contact_id', contact_id),
+                        ('payment_status', payment_status),
+                        ('completion_status', completion_status), ('recurring', recurring)):
+        if value is not None:
+            clauses.append(f"{name} = ?")
+            params.append(value)
+    if start_from:
+        clauses.append("start_date >= ?")
+        params.append(normalize_date(start_from))
+    if start_to:
+        clauses.append("start_date < ?")
+        params.append(day_after(start_to))
+    return clauses, params
+
+
+def _task_from_row(r) -> Task:
+    return Task(id=r['id'], property_id=r['property_id'], contact_id=r['contact_id'],
+                description=r['description'], start_date=r['start_date'], start_time=r['start_time'],
+                end_date=r['end_date'], end_time=r['end_time'], cost=r['cost'],
+                payment_status=r['payment_status'], completion_status=r['completion_status'],
+                recurring=r['recurring'], recurrence_interval=r['recurrence_interval'], notes=r['notes'],
+                parent_task_id=r['parent_task_id'])
+
+@instrumented("sqlite", "properties")
 class PropertyDAO:
     @staticmethod
     def create(property: Property) -> Optional[int]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO properties (name, address, status) VALUES (?, ?, ?)",
-            (property.name, property.address, property.status)
-        )
-        conn.commit()
-        pid = cursor.lastrowid
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO properties (name, address, status) VALUES (?, ?, ?)",
+                (property.name, property.address, property.status)
+            )
+            pid = cursor.lastrowid
         return pid
     
     @staticmethod
     def get_by_id(id: int) -> Optional[Property]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM properties WHERE id = ?", (id,))
-        row = cursor.fetchone()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM properties WHERE id = ?", (id,))
+            row = cursor.fetchone()
         if row:
             return Property(id=row[0], name=row[1], address=row[2], status=row[3])
         return None
     
     @staticmethod
     def get_all() -> List[Property]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM properties ORDER BY name")
-        rows = cursor.fetchall()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM properties ORDER BY name")
+            rows = cursor.fetchall()
         return [Property(id=r[0], name=r[1], address=r[2], status=r[3]) for r in rows]
     
+    @staticmethod
+    def get_page(limit: int = None, cursor: str = None) -> Tuple[List[Property], Optional[str]]:
+        """One page ordered by (name, id); pass the returned cursor for the next."""
+        limit = clamp_limit(limit)
+        with connection() as conn:
+            cur = conn.cursor()
+            if cursor:
+                name, last_id = decode_cursor(cursor)
+                cur.execute(
+                    "SELECT * FROM properties WHERE (name, id) > (?, ?) ORDER BY name, id LIMIT ?",
+                    (name, last_id, limit + 1)
+                )
+            else:
+                cur.execute("SELECT * FROM properties ORDER BY name, id LIMIT ?", (limit + 1,))
+            rows = cur.fetchall()
+        items = [Property(id=r[0], name=r[1], address=r[2], status=r[3]) for r in rows[:limit]]
+        next_cursor = encode_cursor([items[-1].name, items[-1].id]) if len(rows) > limit else None
+        return items, next_cursor
+    
+    @staticmethod
+    def get_names() -> Dict[int, str]:
+        """Map property id to name, for labelling task lists."""
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM properties")
+            rows = cursor.fetchall()
+        return {r[0]: r[1] for r in rows}
+    
     @staticmethod
     def update(property: Property) -> None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE properties SET name=?, address=?, status=? WHERE id=?",
-            (property.name, property.address, property.status, property.id)
-        )
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE properties SET name=?, address=?, status=? WHERE id=?",
+                (property.name, property.address, property.status, property.id)
+            )
     
     @staticmethod
     def delete(id: int) -> None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM properties WHERE id=?", (id,))
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM properties WHERE id=?", (id,))
 
 
+@instrumented("sqlite", "contacts")
 class ContactDAO:
     @staticmethod
     def create(contact: Contact) -> Optional[int]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO contacts (name, company, phone, email, service_type) VALUES (?, ?, ?, ?, ?)",
-            (contact.name, contact.company, contact.phone, contact.email, contact.service_type)
-        )
-        conn.commit()
-        cid = cursor.lastrowid
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO contacts (name, company, phone, email, service_type) VALUES (?, ?, ?, ?, ?)",
+                (contact.name, contact.company, contact.phone, contact.email, contact.service_type)
+            )
+            cid = cursor.lastrowid
         return cid
     
     @staticmethod
     def get_by_id(id: int) -> Optional[Contact]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM contacts WHERE id = ?", (id,))
-        row = cursor.fetchone()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM contacts WHERE id = ?", (id,))
+            row = cursor.fetchone()
         if row:
             return Contact(id=row[0], name=row[1], company=row[2], phone=row[3], email=row[4], service_type=row[5])
         return None
     
     @staticmethod
     def get_all() -> List[Contact]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM contacts ORDER BY name")
-        rows = cursor.fetchall()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM contacts ORDER BY name")
+            rows = cursor.fetchall()
         return [Contact(id=r[0], name=r[1], company=r[2], phone=r[3], email=r[4], service_type=r[5]) for r in rows]
     
+    @staticmethod
+    def get_page(limit: int = None, cursor: str = None) -> Tuple[List[Contact], Optional[str]]:
+        """One page ordered by (name, id); pass the returned cursor for the next."""
+        limit = clamp_limit(limit)
+        with connection() as conn:
+            cur = conn.cursor()
+            if cursor:
+                name, last_id = decode_cursor(cursor)
+                cur.execute(
+                    "SELECT * FROM contacts WHERE (name, id) > (?, ?) ORDER BY name, id LIMIT ?",
+                    (name, last_id, limit + 1)
+                )
+            else:
+                cur.execute("SELECT * FROM contacts ORDER BY name, id LIMIT ?", (limit + 1,))
+            rows = cur.fetchall()
+        items = [Contact(id=r[0], name=r[1], company=r[2], phone=r[3], email=r[4], service_type=r[5])
+                 for r in rows[:limit]]
+        next_cursor = encode_cursor([items[-1].name, items[-1].id]) if len(rows) > limit else None
+        return items, next_cursor
+    
+    @staticmethod
+    def get_names() -> Dict[int, str]:
+        """Map contact id to name, for labelling and name lookups."""
+        with connection() as conn:
+            rows = conn.execute("SELECT id, name FROM contacts").fetchall()
+        return {r[0]: r[1] for r in rows}
+    
     @staticmethod
     def get_by_type(service_type: str) -> List[Contact]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM contacts WHERE service_type = ?", (service_type,))
-        rows = cursor.fetchall()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM contacts WHERE service_type = ?", (service_type,))
+            rows = cursor.fetchall()
         return [Contact(id=r[0], name=r[1], company=r[2], phone=r[3], email=r[4], service_type=r[5]) for r in rows]
     
     @staticmethod
     def update(contact: Contact) -> None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE contacts SET name=?, company=?, phone=?, email=?, service_type=? WHERE id=?",
-            (contact.name, contact.company, contact.phone, contact.email, contact.service_type, contact.id)
-        )
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE contacts SET name=?, company=?, phone=?, email=?, service_type=? WHERE id=?",
+                (contact.name, contact.company, contact.phone, contact.email, contact.service_type, contact.id)
+            )
     
     @staticmethod
     def delete(id: int) -> None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM contacts WHERE id=?", (id,))
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM contacts WHERE id=?", (id,))
 
 
+@instrumented("sqlite", "tasks")
 class TaskDAO:
     @staticmethod
     def create(task: Task) -> Optional[int]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """INSERT INTO tasks (property_id, contact_id, description, start_date, end_date, 
-               cost, payment_status, completion_status, recurring, recurrence_interval, notes) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (task.property_id, task.contact_id, task.description, task.start_date, task.end_date,
-             task.cost, task.payment_status, task.completion_status, task.recurring, 
-             task.recurrence_interval, task.notes)
-        )
-        conn.commit()
-        tid = cursor.lastrowid
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_TASK_INSERT, _task_params(task))
+            tid = cursor.lastrowid
         return tid
     
+    @staticmethod
+    def create_many(tasks: List[Task]) -> List[int]:
+        """Insert tasks in one transaction with executemany; returns their ids.
+        
+        Every row is validated before anything is written, so a bad date
+        rejects the whole batch.
+        """
+        params = [_task_params(t) for t in tasks]
+        if not params:
+            return []
+        with connection() as conn:
+            conn.executemany(_TASK_INSERT, params)
+            # The write lock is held for the whole transaction, so the new
+            # AUTOINCREMENT ids are contiguous and end at last_insert_rowid().
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(params) + 1, last_id + 1))
+    
+    @staticmethod
+    def get_due_recurring(until: str, property_id: int = None) -> List[Task]:
+        """Recurring tasks ending on or before until that have no generated child yet.
+        
+        These are the latest task of each series: the scheduler rolls them
+        over and the calendar expands their future occurrences.
+        """
+        sql = """
+            SELECT t.* FROM tasks t
+            WHERE t.recurring = 'yes' AND t.end_date <= ?
+              AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_task_id = t.id)
+        """
+        params = [normalize_date(until)]
+        if property_id is not None:
+            sql += " AND t.property_id = ?"
+            params.append(property_id)
+        with connection() as conn:
+            cursor = conn.execute(sql + " ORDER BY t.id", params)
+            rows = cursor.fetchall()
+        return [_task_from_row(r) for r in rows]
+    
+    @staticmethod
+    def insert_scheduled(tasks: List[Task]) -> int:
+        """Insert generated recurring tasks in one transaction.
+        
+        Each task carries its parent_task_id; a parent that already has a
+        child (an overlapping scheduler run got there first) is skipped.
+        Returns the number of rows inserted.
+        """
+        params = [_task_params(t) + (t.parent_task_id,) for t in tasks]
+        if not params:
+            return 0
+        with connection() as conn:
+            cursor = conn.executemany(_TASK_INSERT_SCHEDULED, params)
+            return cursor.rowcount
+    
+    @staticmethod
+    def insert_imported(rows: List[dict]) -> int:
+        """Insert normalized import rows in one transaction.
+        
+        Rows whose import_hash already exists are skipped. Returns the number
+        of rows actually inserted.
+        """
+        # rowcount, unlike total_changes, leaves out rows written by triggers.
+        with connection() as conn:
+            cursor = conn.executemany(
+                """INSERT OR IGNORE INTO tasks (property_id, contact_id, description, start_date,
+                   start_time, end_date, end_time, cost, payment_status, completion_status,
+                   recurring, recurrence_interval, notes, import_hash)
+                   VALUES (:property_id, :contact_id, :description, :start_date, :start_time,
+                   :end_date, :end_time, :cost, :payment_status, :completion_status, :recurring,
+                   :recurrence_interval, :notes, :import_hash)""",
+                rows
+            )
+            return cursor.rowcount
+    
     @staticmethod
     def get_by_id(id: int) -> Optional[Task]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE id = ?", (id,))
-        row = cursor.fetchone()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tasks WHERE id = ?", (id,))
+            row = cursor.fetchone()
         if row:
-            return Task(id=row[0], property_id=row[1], contact_id=row[2], description=row[3],
-                       start_date=row[4], end_date=row[5], cost=row[6], payment_status=row[7],
-                       completion_status=row[8], recurring=row[9], recurrence_interval=row[10], notes=row[11])
+            return _task_from_row(row)
         return None
     
     @staticmethod
     def get_all() -> List[Task]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks ORDER BY start_date DESC")
-        rows = cursor.fetchall()
-        conn.close()
-        return [Task(id=r[0], property_id=r[1], contact_id=r[2], description=r[3],
-                   start_date=r[4], end_date=r[5], cost=r[6], payment_status=r[7],
-                   completion_status=r[8], recurring=r[9], recurrence_interval=r[10], notes=r[11]) for r in rows]
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tasks ORDER BY start_date DESC")
+            rows = cursor.fetchall()
+        return [_task_from_row(r) for r in rows]
+    
+    @staticmethod
+    def iter_all(batch_size: int = 1000) -> Iterator[Task]:
+        """Yield every task in id order, fetching batch_size rows at a time.
+        
+        Holds one batch in memory rather than the whole table; for streaming
+        exports.
+        """
+        cursor = get_connection().execute("SELECT * FROM tasks ORDER BY id")
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for r in rows:
+                    yield _task_from_row(r)
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def get_page(limit: int = None, cursor: str = None) -> Tuple[List[Task], Optional[str]]:
+        """One page ordered by (start_date DESC, id DESC), undated tasks last.
+        
+        Keyset pagination: each page seeks past the previous page's last row,
+        so deep pages cost the same as the first.
+        """
+        limit = clamp_limit(limit)
+        with connection() as conn:
+            cur = conn.cursor()
+            where, params = "", []
+            if cursor:
+                start_date, last_id = decode_cursor(cursor)
+                if start_date is None:
+                    where = "WHERE start_date IS NULL AND id < ?"
+                    params = [last_id]
+                else:
+                    where = "WHERE (start_date < ? OR start_date IS NULL OR (start_date = ? AND id < ?))"
+                    params = [start_date, start_date, last_id]
+            cur.execute(
+                f"SELECT * FROM tasks {where} ORDER BY start_date DESC, id DESC LIMIT ?",
+                params + [limit + 1]
+            )
+            rows = cur.fetchall()
+        items = [_task_from_row(r) for r in rows[:limit]]
+        next_cursor = encode_cursor([items[-1].start_date, items[-1].id]) if len(rows) > limit else None
+        return items, next_cursor
+    
+    @staticmethod
+    def query(property_id: int = None, contact_id: int = None, payment_status: str = None,
+              completion_status: str = None, recurring: str = None, start_from: str = None,
+              start_to: str = None, sort: str = '-start_date', limit: int = None) -> List[Task]:
+        """Filter and sort tasks in SQL. Any combination of filters may be given.
+        
+        `start_from`/`start_to` bound start_date (inclusive, applied as a
+        half-open range so the start_date index is used). `sort` is one of
+        TASK_SORT_KEYS, prefixed with '-' for descending; undated rows sort last.
+        """
+        column, direction = parse_task_sort(sort)
+        clauses, params = _task_filters(property_id, contact_id, payment_status, completion_status,
+                                        recurring, start_from, start_to)
+        sql = "SELECT * FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {column} {direction} NULLS LAST, id {direction}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return [_task_from_row(r) for r in rows]
+    
+    @staticmethod
+    def query_page(limit: int = None, cursor: str = None, sort: str = '-start_date',
+                   **filters) -> Tuple[List[Task], Optional[str]]:
+        """Keyset page of TaskDAO.query results, ordered by (sort column, id).
+        
+        The cursor holds the last row's sort value and id; rows with a null
+        sort value come last, as in query().
+        """
+        limit = clamp_limit(limit)
+        column, direction = parse_task_sort(sort)
+        clauses, params = _task_filters(**filters)
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            op = '<' if direction == 'DESC' else '>'
+            if value is None:
+                clauses.append(f"{column} IS NULL AND id {op} ?")
+                params.append(last_id)
+            else:
+                clauses.append(f"({column} {op} ? OR {column} IS NULL OR ({column} = ? AND id {op} ?))")
+                params += [value, value, last_id]
+        sql = "SELECT * FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {column} {direction} NULLS LAST, id {direction} LIMIT ?"
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params + [limit + 1])
+            rows = cur.fetchall()
+        items = [_task_from_row(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor([getattr(items[-1], column), items[-1].id])
+        return items, next_cursor
     
     @staticmethod
     def get_by_property(property_id: int) -> List[Task]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE property_id = ?", (property_id,))
-        rows = cursor.fetchall()
-        conn.close()
-        return [Task(id=r[0], property_id=r[1], contact_id=r[2], description=r[3],
-                   start_date=r[4], end_date=r[5], cost=r[6], payment_status=r[7],
-                   completion_status=r[8], recurring=r[9], recurrence_interval=r[10], notes=r[11]) for r in rows]
+        return TaskDAO.query(property_id=property_id)
     
     @staticmethod
     def get_unpaid() -> List[Task]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE payment_status = 'unpaid'")
-        rows = cursor.fetchall()
-        conn.close()
-        return [Task(id=r[0], property_id=r[1], contact_id=r[2], description=r[3],
-                   start_date=r[4], end_date=r[5], cost=r[6], payment_status=r[7],
-                   completion_status=r[8], recurring=r[9], recurrence_interval=r[10], notes=r[11]) for r in rows]
+        return TaskDAO.query(payment_status='unpaid')
     
     @staticmethod
     def get_incomplete() -> List[Task]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE completion_status = 'incomplete'")
-        rows = cursor.fetchall()
-        conn.close()
-        return [Task(id=r[0], property_id=r[1], contact_id=r[2], description=r[3],
-                   start_date=r[4], end_date=r[5], cost=r[6], payment_status=r[7],
-                   completion_status=r[8], recurring=r[9], recurrence_interval=r[10], notes=r[11]) for r in rows]
+        return TaskDAO.query(completion_status='incomplete')
     
     @staticmethod
     def get_recurring() -> List[Task]:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE recurring = 'yes'")
-        rows = cursor.fetchall()
-        conn.close()
-        return [Task(id=r[0], property_id=r[1], contact_id=r[2], description=r[3],
-                   start_date=r[4], end_date=r[5], cost=r[6], payment_status=r[7],
-                   completion_status=r[8], recurring=r[9], recurrence_interval=r[10], notes=r[11]) for r in rows]
+        return TaskDAO.query(recurring='yes')
+    
+    @staticmethod
+    def get_due_soon(limit: int = 10) -> List[Task]:
+        """Unpaid tasks ordered by due date (end date, else start date)."""
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM tasks WHERE payment_status = 'unpaid'
+                ORDER BY COALESCE(end_date, start_date, '9999-12-31'), id
+                LIMIT ?
+            """, (limit,))
+            rows = cursor.fetchall()
+        return [_task_from_row(r) for r in rows]
     
     @staticmethod
     def update(task: Task) -> None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """UPDATE tasks SET property_id=?, contact_id=?, description=?, start_date=?, end_date=?,
-               cost=?, payment_status=?, completion_status=?, recurring=?, recurrence_interval=?, notes=? 
-               WHERE id=?""",
-            (task.property_id, task.contact_id, task.description, task.start_date, task.end_date,
-             task.cost, task.payment_status, task.completion_status, task.recurring,
-             task.recurrence_interval, task.notes, task.id)
-        )
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_TASK_UPDATE, _task_params(task) + (task.id,))
+    
+    @staticmethod
+    def update_many(rows: List[dict]) -> int:
+        """Update tasks (each row carries its "id") in one transaction.
+        
+        Only the TASK_COLUMNS keys present in a row are changed, as in
+        cloud_db. Returns the number of tasks updated; unknown ids count 0.
+        """
+        updated = 0
+        with connection() as conn:
+            for data in rows:
+                columns = [key for key in TASK_COLUMNS if key in data]
+                if not columns:
+                    continue
+                values = [normalize_date(data[key]) if key in ('start_date', 'end_date')
+                          else data[key] for key in columns]
+                cursor = conn.execute(
+                    f"UPDATE tasks SET {', '.join(f'{key}=?' for key in columns)} WHERE id=?",
+                    values + [data['id']]
+                )
+                updated += cursor.rowcount
+        return updated
     
     @staticmethod
     def delete(id: int) -> None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tasks WHERE id=?", (id,))
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM tasks WHERE id=?", (id,))
+
+
+@instrumented("sqlite", "data_version")
+class DataVersionDAO:
+    @staticmethod
+    def get() -> int:
+        """Counter bumped by triggers on every property, contact or task write."""
+        with connection() as conn:
+            return conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()[0]
@@ -1,59 +1,75 @@
+import os
 import sqlite3
-from .config import DB_PATH
+import threading
+from contextlib import contextmanager
+from .config import (DB_PATH, SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE,
+                     SQLITE_QUERY_STATS)
+from .migrations import migrate
+from .querylog import TimedConnection
+from .tracing import on_statement
 
-def get_connection():
-    """Get a database connection."""
-    conn = sqlite3.connect(DB_PATH)
+_local = threading.local()
+
+
+def _open_connection():
+    # TimedConnection feeds the slow-query log and query-stats (see querylog).
+    factory = TimedConnection if SQLITE_QUERY_STATS else sqlite3.Connection
+    conn = sqlite3.connect(DB_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, factory=factory)
     conn.row_factory = sqlite3.Row
+    # WAL lets readers run alongside a writer; NORMAL sync is durable under
+    # WAL except on power loss, and skips an fsync per commit.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # Counts statements toward the current request's trace, if any.
+    conn.set_trace_callback(on_statement)
     return conn
 
-def init_db():
-    """Initialize database with tables."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Properties table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS properties (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            address TEXT NOT NULL,
-            status TEXT DEFAULT 'active'
-        )
-    ''')
-    
-    # Contacts table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS contacts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            company TEXT,
-            phone TEXT,
-            email TEXT,
-            service_type TEXT
-        )
-    ''')
+
+def get_connection():
+    """Get this thread's database connection, opening it on first use.
     
-    # Tasks table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            property_id INTEGER,
-            contact_id INTEGER,
-            description TEXT NOT NULL,
-            start_date TEXT,
-            end_date TEXT,
-            cost REAL DEFAULT 0,
-            payment_status TEXT DEFAULT 'unpaid',
-            completion_status TEXT DEFAULT 'incomplete',
-            recurring TEXT DEFAULT 'no',
-            recurrence_interval TEXT,
-            notes TEXT,
-            FOREIGN KEY (property_id) REFERENCES properties (id),
-            FOREIGN KEY (contact_id) REFERENCES contacts (id)
-        )
-    ''')
+    The connection is reused by every later call on the same thread, so
+    callers must not close it; use close_connection() to drop it.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        try:
+            conn.total_changes  # raises if someone closed it
+            return conn
+        except sqlite3.ProgrammingError:
+            pass
+    conn = _open_connection()
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def close_connection():
+    """Close this thread's connection, if it has one."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        if _local.pid == os.getpid():
+            conn.close()
+
+
+@contextmanager
+def connection():
+    """Yield this thread's connection as a transaction.
     
-    conn.commit()
-    conn.close()
+    Commits when the block exits normally and rolls back if it raises.
+    """
+    conn = get_connection()
+    with conn:
+        yield conn
+
+
+def init_db():
+    """Initialize database with tables, applying any pending migrations."""
+    applied = migrate(get_connection())
+    if applied:
+        print(f"Applied migrations: {', '.join(map(str, applied))}")
     print(f"Database initialized at: {DB_PATH}")
@@ -0,0 +1,84 @@
+"""Date parsing and range helpers shared by the DAOs, reports and web apps.
+
+Task dates are stored as canonical ISO strings (YYYY-MM-DD) or NULL, so
+string order is date order and range predicates can use an index.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple, Union
+
+# Accepted on input; everything is written back out as ISO.
+INPUT_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%d.%m.%Y')
+
+DateLike = Union[str, date, datetime, None]
+
+
+def parse_date(value: DateLike) -> Optional[date]:
+    """Parse a date from an ISO string, common variants, or a date object.
+
+    Returns None for empty values and raises ValueError for anything else
+    that is not a valid date. A time part (YYYY-MM-DDTHH:MM...) is ignored.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    if not text:
+        return None
+    if len(text) > 10 and text[10] in 'T ':
+        text = text[:10]
+    for fmt in INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def normalize_date(value: DateLike) -> Optional[str]:
+    """Canonical ISO string for storage, or None if empty."""
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else None
+
+
+def day_after(value: DateLike) -> Optional[str]:
+    """ISO date one day later; turns an inclusive end into an exclusive one."""
+    parsed = parse_date(value)
+    return (parsed + timedelta(days=1)).isoformat() if parsed else None
+
+
+def add_months(value: date, months: int) -> date:
+    """Same day months later (or earlier), clamped to the end of short months."""
+    year, month = divmod(value.year * 12 + value.month - 1 + months, 12)
+    month += 1
+    return value.replace(year=year, month=month,
+                         day=min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def month_range(year: int, month: int) -> Tuple[str, str]:
+    """Half-open [first day, first day of next month) as ISO strings."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+def parse_month(value: str) -> Tuple[int, int]:
+    """Parse 'YYYY-MM' into (year, month); raises ValueError otherwise."""
+    try:
+        parsed = datetime.strptime(str(value or '').strip(), '%Y-%m')
+    except ValueError:
+        raise ValueError(f"Invalid month: {value!r} (expected YYYY-MM)") from None
+    return parsed.year, parsed.month
+
+
+def month_keys(first: Tuple[int, int], last: Tuple[int, int]) -> List[str]:
+    """Every 'YYYY-MM' from first to last inclusive (empty if last < first)."""
+    year, month = first
+    keys = []
+    while (year, month) <= last:
+        keys.append(f'{year:04d}-{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
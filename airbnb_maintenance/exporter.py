@@ -0,0 +1,54 @@
+"""Streaming CSV / NDJSON export of tasks.
+
+Rows come from a DAO iter_* generator and are written out in small text
+chunks, so neither the row list nor the serialized document is ever held
+in memory in full. The CSV columns match what importer.py reads back.
+"""
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+FORMATS = ('csv', 'ndjson')
+
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+EXPORT_COLUMNS = (
+    'id', 'property_id', 'contact_id', 'description', 'start_date', 'start_time',
+    'end_date', 'end_time', 'cost', 'payment_status', 'completion_status',
+    'recurring', 'recurrence_interval', 'notes',
+)
+
+# Rows serialized per yielded chunk; keeps chunks a few KB each.
+ROWS_PER_CHUNK = 200
+
+
+def _as_dict(row) -> dict:
+    return row if isinstance(row, dict) else vars(row)
+
+
+def export_rows(rows: Iterable, fmt: str) -> Iterator[str]:
+    """Yield the export of rows (dicts or Task objects) as text chunks."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        data = _as_dict(row)
+        values = [data.get(column) for column in EXPORT_COLUMNS]
+        if writer:
+            writer.writerow(['' if v is None else v for v in values])
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), default=str))
+            buffer.write('\n')
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,224 @@
+"""Streaming CSV / NDJSON importer for historical task records.
+
+Records are read one at a time, validated and normalized, and written in
+fixed-size chunks, so memory stays constant however large the file is.
+Property and contact names are resolved through in-memory lookup tables
+loaded once up front. Each row gets a content hash stored in
+tasks.import_hash; the unique index on it makes re-importing the same
+file (or overlapping files) skip rows that are already there.
+"""
+import codecs
+import csv
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+from .dates import normalize_date
+from .models import PAYMENT_STATUSES, COMPLETION_STATUSES, RECURRENCE_INTERVALS
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# How many row errors to keep for the report; the rest are only counted.
+MAX_ERRORS_KEPT = 20
+
+FORMATS = ('csv', 'ndjson')
+
+_PARSE_ERROR = '__parse_error__'
+
+TRUE_VALUES = ('yes', 'y', 'true', '1')
+FALSE_VALUES = ('no', 'n', 'false', '0', '')
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append(f"row {line}: {message}")
+
+
+def detect_format(filename: str, default: str = 'csv') -> str:
+    """Pick csv or ndjson from a file name's extension."""
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+class ImportFileError(ValueError):
+    """The file itself is unreadable from a row on (bad UTF-8 or CSV syntax)."""
+
+    def __init__(self, row: int, message: str):
+        super().__init__(f"row {row}: {message}")
+        self.row = row
+
+
+def iter_records(stream: Iterable[str], fmt: str) -> Iterator[dict]:
+    """Yield one dict per CSV row or NDJSON line from lines of text.
+
+    Raises ImportFileError, numbered like ImportResult errors, when the
+    stream stops decoding or is not valid CSV. Chunks already written by
+    import_records stay; importing the fixed file again skips them.
+    """
+    if fmt == 'csv':
+        records = csv.DictReader(stream)
+    elif fmt == 'ndjson':
+        records = _ndjson_records(stream)
+    else:
+        raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+    row = 0
+    try:
+        for record in records:
+            row += 1
+            yield record
+    except UnicodeDecodeError as e:
+        raise ImportFileError(row + 1, f"not valid UTF-8 ({e.reason})") from e
+    except csv.Error as e:
+        raise ImportFileError(row + 1, f"malformed CSV ({e})") from e
+
+
+def _ndjson_records(stream: Iterable[str]) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        # A bad line becomes a record that fails validation, so one
+        # corrupt line is reported instead of ending the import.
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = {_PARSE_ERROR: f"invalid JSON: {e}"}
+        if not isinstance(record, dict):
+            record = {_PARSE_ERROR: "expected a JSON object"}
+        yield record
+
+
+def text_stream(binary: IO[bytes]) -> Iterator[str]:
+    """Decode an uploaded binary file line by line for iter_records.
+
+    Lines end as in a newline='' text file and a leading UTF-8 BOM is
+    dropped. Decoding per line, rather than in buffered blocks, makes a bad
+    byte fail at the row that holds it.
+    """
+    first = True
+    for block in binary:
+        if first:
+            block = block[len(codecs.BOM_UTF8):] if block.startswith(codecs.BOM_UTF8) else block
+            first = False
+        for line in block.splitlines(keepends=True):
+            yield line.decode('utf-8')
+
+
+def name_lookup(names_by_id: Dict[int, str]) -> Dict[str, int]:
+    """Invert an id -> name map into a case-insensitive name -> id table."""
+    return {name.strip().lower(): id for id, name in names_by_id.items() if name}
+
+
+def _text(record: dict, key: str) -> str:
+    value = record.get(key)
+    return '' if value is None else str(value).strip()
+
+
+def _resolve(record: dict, kind: str, lookup: Dict[str, int]) -> Optional[int]:
+    """Id for a row's property/contact, from an explicit id or a name."""
+    raw_id = _text(record, f'{kind}_id')
+    if raw_id:
+        return int(raw_id)
+    name = _text(record, kind) or _text(record, f'{kind}_name')
+    if not name:
+        return None
+    try:
+        return lookup[name.lower()]
+    except KeyError:
+        raise ValueError(f"unknown {kind} {name!r}") from None
+
+
+def _choice(record: dict, key: str, allowed, default: str) -> str:
+    value = _text(record, key).lower() or default
+    if value not in allowed:
+        raise ValueError(f"{key} must be one of {', '.join(allowed)}")
+    return value
+
+
+def normalize_record(record: dict, properties: Dict[str, int], contacts: Dict[str, int]) -> dict:
+    """Validate one input record and return task columns plus import_hash.
+
+    Raises ValueError describing the first problem found.
+    """
+    if _PARSE_ERROR in record:
+        raise ValueError(record[_PARSE_ERROR])
+    description = _text(record, 'description')
+    if not description:
+        raise ValueError("description is required")
+
+    recurring = _text(record, 'recurring').lower()
+    if recurring in TRUE_VALUES:
+        recurring = 'yes'
+    elif recurring in FALSE_VALUES:
+        recurring = 'no'
+    else:
+        raise ValueError("recurring must be yes or no")
+    interval = _text(record, 'recurrence_interval').lower()
+    if interval and interval not in RECURRENCE_INTERVALS:
+        raise ValueError(f"recurrence_interval must be one of {', '.join(RECURRENCE_INTERVALS)}")
+
+    cost_text = _text(record, 'cost').replace('$', '').replace(',', '')
+    row = {
+        'property_id': _resolve(record, 'property', properties),
+        'contact_id': _resolve(record, 'contact', contacts),
+        'description': description,
+        'start_date': normalize_date(_text(record, 'start_date')),
+        'start_time': _text(record, 'start_time'),
+        'end_date': normalize_date(_text(record, 'end_date')),
+        'end_time': _text(record, 'end_time'),
+        'cost': float(cost_text) if cost_text else 0.0,
+        'payment_status': _choice(record, 'payment_status', PAYMENT_STATUSES, 'unpaid'),
+        'completion_status': _choice(record, 'completion_status', COMPLETION_STATUSES, 'incomplete'),
+        'recurring': recurring,
+        'recurrence_interval': interval,
+        'notes': _text(record, 'notes'),
+    }
+    canonical = json.dumps(row, sort_keys=True, separators=(',', ':'))
+    row['import_hash'] = hashlib.sha256(canonical.encode()).hexdigest()
+    return row
+
+
+def import_records(records: Iterable[dict], write_chunk: Callable[[List[dict]], int],
+                   properties: Dict[str, int], contacts: Dict[str, int],
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportResult:
+    """Normalize records and hand them to write_chunk in batches.
+
+    write_chunk inserts one batch in a single transaction, ignoring rows
+    whose import_hash already exists, and returns how many it inserted.
+    Rows that fail validation are counted and skipped.
+    """
+    result = ImportResult()
+    chunk: List[dict] = []
+
+    def flush():
+        inserted = write_chunk(chunk)
+        result.inserted += inserted
+        result.duplicates += len(chunk) - inserted
+        chunk.clear()
+
+    for record in records:
+        result.read += 1
+        try:
+            chunk.append(normalize_record(record, properties, contacts))
+        except (ValueError, TypeError) as e:
+            result.add_error(result.read, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return result
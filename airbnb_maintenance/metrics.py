@@ -0,0 +1,248 @@
+"""In-process latency histograms and error counters in Prometheus text format.
+
+The web apps time every request by route (see their before/after request
+hooks) and the DAO and reporting classes are wrapped by instrumented(), which
+times each public method by backend, table and operation. GET /api/metrics
+renders the registry for a Prometheus scrape.
+
+Recording an observation is a perf_counter() call, a bisect over the buckets
+and a few integer updates under one lock. Values are kept per process, so
+each gunicorn worker reports the requests it served.
+"""
+import bisect
+import functools
+import inspect
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+from . import tracing
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects."""
+
+    def __init__(
+        self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format(labels + (('le', le),))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format(labels)} {count}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, int] = {}
+
+    def inc(self, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format(labels)} {n}" for labels, n in values)
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+http_latency = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by route."
+)
+http_errors = Counter(
+    "http_request_errors_total", "Requests answered with a 5xx status, by route."
+)
+db_latency = Histogram(
+    "db_operation_duration_seconds",
+    "Time spent in a DAO or reporting method, by backend, table and operation.",
+)
+db_errors = Counter(
+    "db_operation_errors_total", "DAO or reporting calls that raised, by operation."
+)
+
+METRICS = (http_latency, http_errors, db_latency, db_errors)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    for metric in METRICS:
+        metric.reset()
+
+
+def record_request(route: str, method: str, status: int, seconds: float) -> None:
+    """Called by the web apps' after_request hooks."""
+    labels = {"route": route, "method": method, "status": str(status)}
+    http_latency.observe(seconds, **labels)
+    if status >= 500:
+        http_errors.inc(route=route, method=method)
+
+
+def timed(func: Callable, **labels: str) -> Callable:
+    """Wrap func to record its latency (and any exception) under labels.
+
+    Generators are timed until exhausted or closed, coroutines until they
+    return, so streaming and async methods report the real query time.
+    Each call is also added to the request's tracing.RequestTrace, if any.
+    """
+    operation = f"{labels.get('table')}.{labels.get('operation')}"
+
+    def record(started: float, failed: bool) -> None:
+        db_latency.observe(time.perf_counter() - started, **labels)
+        if failed:
+            db_errors.inc(**labels)
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started, failed, rows = time.perf_counter(), True, 0
+            outermost = tracing.is_outermost()
+            try:
+                async for item in func(*args, **kwargs):
+                    rows += 1
+                    yield item
+                failed = False
+            except GeneratorExit:
+                failed = False
+                raise
+            finally:
+                record(started, failed)
+                if outermost:
+                    tracing.add_call(operation, rows)
+
+    elif inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started, failed, result = time.perf_counter(), True, None
+            token = tracing.enter()
+            try:
+                result = await func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(started, failed)
+                tracing.leave(token, operation, result)
+
+    elif inspect.isgeneratorfunction(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started, failed, rows = time.perf_counter(), True, 0
+            outermost = tracing.is_outermost()
+            try:
+                for item in func(*args, **kwargs):
+                    rows += 1
+                    yield item
+                failed = False
+            except GeneratorExit:
+                failed = False
+                raise
+            finally:
+                record(started, failed)
+                if outermost:
+                    tracing.add_call(operation, rows)
+
+    else:
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started, failed, result = time.perf_counter(), True, None
+            token = tracing.enter()
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(started, failed)
+                tracing.leave(token, operation, result)
+
+    return wrapper
+
+
+def instrumented(backend: str, table: str) -> Callable[[type], type]:
+    """Class decorator timing every public static/class method of a DAO.
+
+    Each method is recorded as operation=<method name> under the given
+    backend ("sqlite", "supabase", "supabase-async") and table.
+    """
+
+    def decorate(cls: type) -> type:
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            labels = {"backend": backend, "table": table, "operation": name}
+            if isinstance(attr, staticmethod):
+                setattr(cls, name, staticmethod(timed(attr.__func__, **labels)))
+            elif isinstance(attr, classmethod):
+                setattr(cls, name, classmethod(timed(attr.__func__, **labels)))
+        return cls
+
+    return decorate
@@ -0,0 +1,261 @@
+"""Numbered schema migrations for the local SQLite database.
+
+Each migration is applied once, in order, inside its own transaction, and
+recorded in the schema_version table. A step is either a SQL string or a
+function taking the connection, for data fixes SQL cannot express. Add new
+migrations to the end of MIGRATIONS; never edit one that has shipped. The
+Supabase equivalents live in supabase/migrations/.
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple, Union
+from .dates import normalize_date
+
+
+def _normalize_task_dates(conn) -> None:
+    """Rewrite task dates as ISO strings and empty strings as NULL.
+
+    Values that cannot be parsed as dates are left untouched.
+    """
+    rows = conn.execute("SELECT id, start_date, end_date FROM tasks").fetchall()
+    updates = []
+    for task_id, start_date, end_date in rows:
+        fixed = []
+        for value in (start_date, end_date):
+            try:
+                fixed.append(normalize_date(value))
+            except ValueError:
+                fixed.append(value)
+        if fixed != [start_date, end_date]:
+            updates.append((fixed[0], fixed[1], task_id))
+    conn.executemany("UPDATE tasks SET start_date = ?, end_date = ? WHERE id = ?", updates)
+
+
+# Per (user, property, month) cost totals behind the monthly and summary
+# reports. Tasks without a user, property or start date are keyed as '', 0
+# and '' so every task lands in exactly one row; month is 'YYYY-MM'.
+_ROLLUP_KEY = (
+    "IFNULL({t}.user_id, ''), IFNULL({t}.property_id, 0), "
+    "IFNULL(substr({t}.start_date, 1, 7), '')"
+)
+
+
+def _rollup_upsert(row: str, sign: str) -> str:
+    """Trigger statement adding (sign '+') or removing (sign '-') one task."""
+    return f'''
+        INSERT INTO task_cost_rollup
+            (user_id, property_id, month, paid_cost, unpaid_cost, total_cost, task_count)
+        VALUES (
+            {_ROLLUP_KEY.format(t=row)},
+            {sign}(CASE WHEN {row}.payment_status = 'paid' THEN IFNULL({row}.cost, 0) ELSE 0 END),
+            {sign}(CASE WHEN {row}.payment_status = 'unpaid' THEN IFNULL({row}.cost, 0) ELSE 0 END),
+            {sign}IFNULL({row}.cost, 0),
+            {sign}1
+        )
+        ON CONFLICT (user_id, property_id, month) DO UPDATE SET
+            paid_cost = paid_cost + excluded.paid_cost,
+            unpaid_cost = unpaid_cost + excluded.unpaid_cost,
+            total_cost = total_cost + excluded.total_cost,
+            task_count = task_count + excluded.task_count;
+    '''
+
+
+# Drop the OLD task's row once its last task has left it.
+_ROLLUP_PRUNE = f'''
+        DELETE FROM task_cost_rollup
+        WHERE (user_id, property_id, month) = ({_ROLLUP_KEY.format(t='OLD')})
+          AND task_count <= 0;
+    '''
+
+
+def rebuild_cost_rollup(conn) -> None:
+    """Recompute task_cost_rollup from the tasks table."""
+    conn.execute("DELETE FROM task_cost_rollup")
+    conn.execute(f'''
+        INSERT INTO task_cost_rollup
+            (user_id, property_id, month, paid_cost, unpaid_cost, total_cost, task_count)
+        SELECT {_ROLLUP_KEY.format(t='t')},
+               SUM(CASE WHEN t.payment_status = 'paid' THEN IFNULL(t.cost, 0) ELSE 0 END),
+               SUM(CASE WHEN t.payment_status = 'unpaid' THEN IFNULL(t.cost, 0) ELSE 0 END),
+               SUM(IFNULL(t.cost, 0)),
+               COUNT(*)
+        FROM tasks t
+        GROUP BY 1, 2, 3
+    ''')
+
+
+# Tables whose writes change what the read endpoints return (see data_version).
+_VERSIONED_TABLES = ('properties', 'contacts', 'tasks')
+
+
+MIGRATIONS: List[Tuple[int, str, List[Union[str, Callable]]]] = [
+    (1, 'initial schema', [
+        '''
+        CREATE TABLE IF NOT EXISTS properties (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            address TEXT NOT NULL,
+            status TEXT DEFAULT 'active'
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            company TEXT,
+            phone TEXT,
+            email TEXT,
+            service_type TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id INTEGER,
+            contact_id INTEGER,
+            description TEXT NOT NULL,
+            start_date TEXT,
+            end_date TEXT,
+            cost REAL DEFAULT 0,
+            payment_status TEXT DEFAULT 'unpaid',
+            completion_status TEXT DEFAULT 'incomplete',
+            recurring TEXT DEFAULT 'no',
+            recurrence_interval TEXT,
+            notes TEXT,
+            FOREIGN KEY (property_id) REFERENCES properties (id),
+            FOREIGN KEY (contact_id) REFERENCES contacts (id)
+        )
+        ''',
+    ]),
+    (2, 'align columns with the cloud schema', [
+        "ALTER TABLE tasks ADD COLUMN start_time TEXT DEFAULT ''",
+        "ALTER TABLE tasks ADD COLUMN end_time TEXT DEFAULT ''",
+        "ALTER TABLE tasks ADD COLUMN user_id TEXT",
+        "ALTER TABLE properties ADD COLUMN user_id TEXT",
+        "ALTER TABLE contacts ADD COLUMN user_id TEXT",
+    ]),
+    (3, 'indexes for list, filter and report queries', [
+        # Task list keyset pages, default query sort, month ranges
+        "CREATE INDEX IF NOT EXISTS idx_tasks_start_date ON tasks (start_date, id)",
+        # get_by_property / query(property_id=...) and per-property reports
+        "CREATE INDEX IF NOT EXISTS idx_tasks_property_start ON tasks (property_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_contact ON tasks (contact_id)",
+        # Unpaid lists, due-soon and the cost summary
+        "CREATE INDEX IF NOT EXISTS idx_tasks_payment_end ON tasks (payment_status, end_date)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completion_start ON tasks (completion_status, start_date)",
+        # Recurring lists and the yearly projection only touch recurring rows
+        "CREATE INDEX IF NOT EXISTS idx_tasks_recurring ON tasks (recurrence_interval, cost) "
+        "WHERE recurring = 'yes'",
+        # Property and contact keyset pages
+        "CREATE INDEX IF NOT EXISTS idx_properties_name ON properties (name, id)",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts (name, id)",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_service_type ON contacts (service_type)",
+    ]),
+    (4, 'canonical ISO task dates', [
+        _normalize_task_dates,
+    ]),
+    (5, 'content hash for imported tasks', [
+        "ALTER TABLE tasks ADD COLUMN import_hash TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_import_hash ON tasks (import_hash)",
+    ]),
+    (6, 'monthly cost rollup maintained by triggers', [
+        '''
+        CREATE TABLE IF NOT EXISTS task_cost_rollup (
+            user_id TEXT NOT NULL,
+            property_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            paid_cost REAL NOT NULL DEFAULT 0,
+            unpaid_cost REAL NOT NULL DEFAULT 0,
+            total_cost REAL NOT NULL DEFAULT 0,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, property_id, month)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_task_cost_rollup_month ON task_cost_rollup (month)",
+        f'''
+        CREATE TRIGGER IF NOT EXISTS tasks_rollup_insert AFTER INSERT ON tasks
+        BEGIN
+            {_rollup_upsert('NEW', '+')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS tasks_rollup_update
+        AFTER UPDATE OF user_id, property_id, start_date, cost, payment_status ON tasks
+        BEGIN
+            {_rollup_upsert('OLD', '-')}
+            {_rollup_upsert('NEW', '+')}
+            {_ROLLUP_PRUNE}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS tasks_rollup_delete AFTER DELETE ON tasks
+        BEGIN
+            {_rollup_upsert('OLD', '-')}
+            {_ROLLUP_PRUNE}
+        END
+        ''',
+        rebuild_cost_rollup,
+    ]),
+    (7, 'recurring task lineage for the scheduler', [
+        "ALTER TABLE tasks ADD COLUMN parent_task_id INTEGER REFERENCES tasks (id)",
+        # One generated child per task: scheduler inserts are INSERT OR IGNORE
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_parent ON tasks (parent_task_id)",
+        # Recurring tasks due to roll over, by end date
+        "CREATE INDEX IF NOT EXISTS idx_tasks_recurring_end ON tasks (end_date) "
+        "WHERE recurring = 'yes'",
+    ]),
+    (8, 'change counter for conditional GETs', [
+        '''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        ''',
+        "INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)",
+    ] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table}
+        BEGIN
+            UPDATE data_version SET version = version + 1 WHERE id = 1;
+        END
+        '''
+        for table in _VERSIONED_TABLES
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ]),
+]
+
+
+def current_version(conn) -> int:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    ''')
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn) -> List[int]:
+    """Apply every pending migration; returns the versions applied."""
+    applied = []
+    version = current_version(conn)
+    for number, name, statements in MIGRATIONS:
+        if number <= version:
+            continue
+        conn.execute("BEGIN")
+        try:
+            for step in statements:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (number, name, datetime.now().isoformat(timespec='seconds'))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(number)
+    return applied
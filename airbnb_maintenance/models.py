@@ -1,6 +1,11 @@
 from dataclasses import dataclass
 from typing import Optional
 
+PAYMENT_STATUSES = ("paid", "unpaid")
+COMPLETION_STATUSES = ("complete", "incomplete")
+RECURRENCE_INTERVALS = ("daily", "weekly", "monthly", "yearly")
+TREND_GROUPS = ("property", "contact", "service_type")
+
 @dataclass
 class Property:
     id: Optional[int] = None
@@ -24,10 +29,13 @@ class Task:
     contact_id: Optional[int] = None
     description: str = ""
     start_date: str = ""
+    start_time: str = ""
     end_date: str = ""
+    end_time: str = ""
     cost: float = 0
     payment_status: str = "unpaid"
     completion_status: str = "incomplete"
     recurring: str = "no"
     recurrence_interval: str = ""
     notes: str = ""
+    parent_task_id: Optional[int] = None
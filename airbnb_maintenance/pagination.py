@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Columns task lists may sort by; prefix with "-" for descending.
+TASK_SORT_KEYS = ("start_date", "end_date", "cost", "description", "id")
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Keep a requested page size within 1..MAX_LIMIT."""
+    if not limit:
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_task_sort(sort: str) -> Tuple[str, str]:
+    """Split a sort key like "-cost" into ("cost", "DESC"). Raises ValueError."""
+    column = sort.lstrip("-")
+    if column not in TASK_SORT_KEYS:
+        raise ValueError(f"Unsupported sort key: {sort}")
+    return column, "DESC" if sort.startswith("-") else "ASC"
@@ -0,0 +1,175 @@
+"""Opt-in cProfile + tracemalloc profiling of live requests.
+
+Nothing is registered unless PROFILE_TOKEN is set, so a normal deployment
+pays nothing. With it, init_app() adds request hooks and debug endpoints,
+and a request is profiled when:
+
+- it carries an X-Profile-Token header with the token, or
+- its route is in PROFILE_ROUTES (comma-separated URL rules such as
+  /api/dashboard), or
+- it falls in the PROFILE_SAMPLE_RATE fraction (0-1) of all requests.
+
+Each profiled request writes <PROFILE_DIR>/<time>-<pid>-<route>.prof (load it
+with pstats or snakeviz) and keeps a summary of the top PROFILE_TOP functions
+by cumulative time and allocation sites by size. GET /api/debug/profiles
+lists the summaries. POST /api/debug/profiles changes sample_rate and routes
+at runtime for the worker that receives it. Both need the token header.
+
+Only one request per process is profiled at a time, since cProfile and
+tracemalloc hooks are process-wide; concurrent requests are skipped.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+from flask import Flask, g, jsonify, request
+
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "airbnb_maintenance_profiles")
+)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_ROUTES = {r for r in os.environ.get("PROFILE_ROUTES", "").split(",") if r}
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", 20))
+TOKEN_HEADER = "X-Profile-Token"
+
+# Runtime-adjustable settings (POST /api/debug/profiles) and recent results.
+settings = {"sample_rate": PROFILE_SAMPLE_RATE, "routes": set(PROFILE_ROUTES)}
+summaries: deque = deque(maxlen=50)
+_busy = threading.Lock()
+
+
+def authorized() -> bool:
+    sent = request.headers.get(TOKEN_HEADER, "")
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(sent, PROFILE_TOKEN)
+
+
+def wanted(route: str) -> bool:
+    if route in settings["routes"] or authorized():
+        return True
+    rate = settings["sample_rate"]
+    return rate > 0 and random.random() < rate
+
+
+def start_profile():
+    route = request.url_rule.rule if request.url_rule else request.path
+    if route.startswith("/api/debug/"):
+        return None
+    if not wanted(route) or not _busy.acquire(blocking=False):
+        return None
+    g.profile_route = route
+    g.profile_tracing = not tracemalloc.is_tracing()
+    if g.profile_tracing:
+        tracemalloc.start()
+    g.profile_started = time.perf_counter()
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+    return None
+
+
+def stop_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    try:
+        profiler.disable()
+        elapsed = time.perf_counter() - g.profile_started
+        snapshot = tracemalloc.take_snapshot()
+        if g.profile_tracing:
+            tracemalloc.stop()
+        summary = save(profiler, snapshot, g.profile_route, elapsed)
+        summary["status"] = response.status_code
+        summaries.append(summary)
+    finally:
+        _busy.release()
+    return response
+
+
+def abandon_profile(exc=None):
+    """Teardown: stop a profile whose request never reached stop_profile."""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        if g.profile_tracing:
+            tracemalloc.stop()
+        _busy.release()
+
+
+def save(profiler: cProfile.Profile, snapshot, route: str, elapsed: float) -> dict:
+    """Write the stats file and return the request's top-N summary."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{slug}.prof"
+    path = os.path.join(PROFILE_DIR, name)
+    profiler.dump_stats(path)
+
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+    allocations = snapshot.statistics("lineno")[:PROFILE_TOP]
+    return {
+        "file": path,
+        "route": route,
+        "method": request.method,
+        "seconds": round(elapsed, 4),
+        "functions": out.getvalue().splitlines(),
+        "allocations": [str(stat) for stat in allocations],
+    }
+
+
+def list_profiles():
+    if not authorized():
+        return jsonify({"error": "Not authorized"}), 403
+    return jsonify({"settings": _settings(), "profiles": list(summaries)})
+
+
+def configure():
+    """Set sample_rate and/or routes for this worker process."""
+    if not authorized():
+        return jsonify({"error": "Not authorized"}), 403
+    data = request.get_json(silent=True) or {}
+    if "sample_rate" in data:
+        try:
+            rate = float(data["sample_rate"])
+        except (TypeError, ValueError):
+            rate = -1
+        if not 0 <= rate <= 1:
+            return jsonify({"error": "sample_rate must be between 0 and 1"}), 400
+        settings["sample_rate"] = rate
+    if "routes" in data:
+        if not isinstance(data["routes"], list):
+            return jsonify({"error": "routes must be a list"}), 400
+        settings["routes"] = set(map(str, data["routes"]))
+    return jsonify({"settings": _settings()})
+
+
+def _settings() -> dict:
+    return {
+        "sample_rate": settings["sample_rate"],
+        "routes": sorted(settings["routes"]),
+        "dir": PROFILE_DIR,
+        "pid": os.getpid(),
+    }
+
+
+def init_app(app: Flask) -> bool:
+    """Register the profiling hooks and endpoints if PROFILE_TOKEN is set."""
+    if not PROFILE_TOKEN:
+        return False
+    app.before_request(start_profile)
+    app.after_request(stop_profile)
+    app.teardown_request(abandon_profile)
+    app.add_url_rule("/api/debug/profiles", "list_profiles", list_profiles)
+    app.add_url_rule(
+        "/api/debug/profiles", "configure_profiles", configure, methods=["POST"]
+    )
+    return True
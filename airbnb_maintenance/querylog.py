@@ -0,0 +1,253 @@
+"""Statement timing and slow-query log for the SQLite backend.
+
+database._open_connection() opens connections with TimedConnection when
+SQLITE_QUERY_STATS is on (the default). Every statement is timed from
+execute() until its rows have been fetched, and stats are aggregated per
+statement text (whitespace collapsed): calls, total, max and slow count.
+
+A statement slower than SQLITE_SLOW_MS is logged with its parameters and its
+EXPLAIN QUERY PLAN, and the plan is kept with the stats, so a SCAN of a large
+table (a missing index) shows up in `python -m airbnb_maintenance.cli
+query-stats`. A daemon thread in each process adds its stats to
+QUERY_STATS_PATH every SQLITE_STATS_FLUSH seconds (and atexit does at exit),
+so the CLI also sees the web app's without requests writing to disk.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional
+
+from .config import QUERY_STATS_PATH, SQLITE_SLOW_MS, SQLITE_STATS_FLUSH
+
+logger = logging.getLogger(__name__)
+
+# Statements EXPLAIN QUERY PLAN can describe.
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_lock = threading.Lock()
+# statement -> [calls, total seconds, max seconds, slow calls, last slow plan]
+_stats: dict = {}
+# Pid of the process whose flusher thread is running (a forked child has none).
+_flusher_pid: Optional[int] = None
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times each statement through to its last fetch."""
+
+    _pending: Optional[list] = None  # [sql, parameters, seconds]
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = [sql, parameters, time.perf_counter() - started]
+        if self.description is None:  # no rows to fetch
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        # Counted as they stream past, so generators are not materialized.
+        seen = [0, None]
+
+        def counted():
+            for params in seq_of_parameters:
+                if not seen[0]:
+                    seen[1] = params
+                seen[0] += 1
+                yield params
+
+        started = time.perf_counter()
+        super().executemany(sql, counted())
+        record(self.connection, sql, seen[1], time.perf_counter() - started, seen[0])
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._finish(time.perf_counter() - started)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(time.perf_counter() - started)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._finish(time.perf_counter() - started)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._finish(time.perf_counter() - started)
+            raise
+        self._add(time.perf_counter() - started)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def _add(self, seconds: float) -> None:
+        if self._pending is not None:
+            self._pending[2] += seconds
+
+    def _finish(self, seconds: float = 0.0) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, parameters, elapsed = pending
+            record(self.connection, sql, parameters, elapsed + seconds)
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3.connect() factory whose cursors are TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def record(
+    conn, sql: str, parameters: Any, seconds: float, many: Optional[int] = None
+) -> None:
+    """Add one execution to the stats; many is the executemany row count,
+    with parameters the first row's."""
+    key = " ".join(sql.split())
+    plan = None
+    slow = seconds * 1000 >= SQLITE_SLOW_MS
+    if slow:
+        plan = explain(conn, sql, parameters or ())
+        shown = repr(parameters)
+        if many is not None:
+            shown = f"{many} rows, first {shown}"
+        logger.warning(
+            "Slow query (%.1f ms): %s\n  params: %s\n  plan:\n%s",
+            seconds * 1000, key, shown, plan or "    (none)",
+        )
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = [0, 0.0, 0.0, 0, None]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+        if slow:
+            entry[3] += 1
+            entry[4] = plan
+    if _flusher_pid != os.getpid():
+        _start_flusher()
+
+
+def _start_flusher() -> None:
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="query-stats-flush", daemon=True).start()
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(SQLITE_STATS_FLUSH)
+        flush()
+
+
+def explain(conn, sql: str, parameters: Any) -> Optional[str]:
+    """EXPLAIN QUERY PLAN output as an indented tree, or None."""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # The base class method, so the EXPLAIN is not timed itself.
+        rows = sqlite3.Connection.execute(
+            conn, "EXPLAIN QUERY PLAN " + sql, parameters
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+    depth = {0: 0}
+    lines = []
+    for row in rows:
+        node, parent, detail = row[0], row[1], row[3]
+        depth[node] = depth.get(parent, 0) + 1
+        lines.append("  " * (depth[node] + 1) + detail)
+    return "\n".join(lines)
+
+
+def _open_stats_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(QUERY_STATS_PATH, timeout=5)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS query_stats (
+            statement TEXT PRIMARY KEY,
+            calls INTEGER NOT NULL,
+            total_s REAL NOT NULL,
+            max_s REAL NOT NULL,
+            slow INTEGER NOT NULL,
+            plan TEXT
+        )
+    """)
+    return conn
+
+
+def flush() -> None:
+    """Add this process's stats since the last flush to QUERY_STATS_PATH."""
+    with _lock:
+        rows = [(k, *v) for k, v in _stats.items()]
+        _stats.clear()
+    if not rows:
+        return
+    try:
+        conn = _open_stats_db()
+        with conn:
+            conn.executemany("""
+                INSERT INTO query_stats (statement, calls, total_s, max_s, slow, plan)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(statement) DO UPDATE SET
+                    calls = calls + excluded.calls,
+                    total_s = total_s + excluded.total_s,
+                    max_s = MAX(max_s, excluded.max_s),
+                    slow = slow + excluded.slow,
+                    plan = COALESCE(excluded.plan, plan)
+            """, rows)
+        conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Could not save query stats: %s", e)
+
+
+def load_stats(limit: int = 20) -> List[dict]:
+    """Top statements by total time, including this process's unflushed stats."""
+    flush()
+    conn = _open_stats_db()
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        "SELECT * FROM query_stats ORDER BY total_s DESC LIMIT ?", (limit,)
+    ).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def reset_stats() -> None:
+    with _lock:
+        _stats.clear()
+    conn = _open_stats_db()
+    with conn:
+        conn.execute("DELETE FROM query_stats")
+    conn.close()
+
+
+atexit.register(flush)
@@ -0,0 +1,76 @@
+"""Shared request validation and shaping for the report endpoints.
+
+Both backends answer a trend with one grouped query returning
+(month, group, total) rows; these helpers validate the request and turn
+the rows into the month-by-group matrix the API returns. The forecast and
+calendar windows are validated here too.
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from .dates import month_keys, parse_date, parse_month
+from .models import TREND_GROUPS
+
+# Longest range one request may ask for (ten years of months).
+MAX_TREND_MONTHS = 120
+MAX_FORECAST_MONTHS = 120
+# Widest /api/calendar window, in days.
+MAX_CALENDAR_DAYS = 366
+
+
+def trend_months(start: str, end: str, group_by: str) -> List[str]:
+    """Validate a trend request and list its 'YYYY-MM' keys in order."""
+    if group_by not in TREND_GROUPS:
+        raise ValueError(f"group_by must be one of {', '.join(TREND_GROUPS)}")
+    months = month_keys(parse_month(start), parse_month(end))
+    if not months:
+        raise ValueError("from must not be after to")
+    if len(months) > MAX_TREND_MONTHS:
+        raise ValueError(f"Range is limited to {MAX_TREND_MONTHS} months")
+    return months
+
+
+def forecast_months(start: Optional[str] = None, months: int = 12) -> List[str]:
+    """'YYYY-MM' keys of a forecast horizon; start defaults to this month."""
+    if not 1 <= months <= MAX_FORECAST_MONTHS:
+        raise ValueError(f"months must be between 1 and {MAX_FORECAST_MONTHS}")
+    year, month = parse_month(start) if start else (date.today().year, date.today().month)
+    last = divmod(year * 12 + month - 1 + months - 1, 12)
+    return month_keys((year, month), (last[0], last[1] + 1))
+
+
+def calendar_window(start: str, end: str) -> Tuple[date, date]:
+    """Validate an inclusive calendar window of ISO dates."""
+    first, last = parse_date(start), parse_date(end)
+    if not first or not last:
+        raise ValueError("from and to are required (YYYY-MM-DD)")
+    if last < first:
+        raise ValueError("from must not be after to")
+    if (last - first).days >= MAX_CALENDAR_DAYS:
+        raise ValueError(f"Window is limited to {MAX_CALENDAR_DAYS} days")
+    return first, last
+
+
+def trend_matrix(months: List[str], group_by: str,
+                 rows: Iterable[Tuple[str, Optional[str], float]]) -> Dict:
+    """Build {months, series: {group: [total per month]}, totals} from rows.
+
+    Rows whose group is NULL (no property/contact/service type) count
+    toward the monthly totals but get no series, as in monthly_breakdown.
+    """
+    index = {month: i for i, month in enumerate(months)}
+    series: Dict[str, List[float]] = {}
+    totals = [0.0] * len(months)
+    for month, name, total in rows:
+        i = index.get(month)
+        if i is None:
+            continue
+        total = float(total or 0)
+        if name is not None:
+            series.setdefault(name, [0.0] * len(months))[i] = round(total, 2)
+        totals[i] += total
+    return {
+        'group_by': group_by,
+        'months': months,
+        'series': dict(sorted(series.items())),
+        'totals': [round(total, 2) for total in totals],
+    }
@@ -0,0 +1,54 @@
+"""Opt-in background thread that runs the recurring task scheduler.
+
+web_app calls start() at import; cloud_web_app calls it from start_worker(),
+i.e. in each gunicorn worker after fork (post_fork), or from create_app()
+when it is not preloading. It does nothing unless SCHEDULER_INTERVAL
+(seconds) is set. Every worker process may run its own thread: the
+scheduler is idempotent, so overlapping runs are harmless.
+"""
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_INTERVAL = int(os.environ.get("SCHEDULER_INTERVAL", 0))
+SCHEDULER_LEAD_DAYS = int(os.environ.get("SCHEDULER_LEAD_DAYS", 0))
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def _loop(run: Callable[[], int], interval: int) -> None:
+    while True:
+        try:
+            created = run()
+            if created:
+                logger.info("Scheduler created %d recurring tasks", created)
+        except Exception:
+            logger.exception("Recurring task scheduler run failed")
+        if _stop.wait(interval):
+            return
+
+
+def start(run: Callable[[], int], interval: int = SCHEDULER_INTERVAL) -> bool:
+    """Call run() now and then every interval seconds on a daemon thread.
+
+    Returns False (and starts nothing) when interval is 0 or a thread is
+    already running in this process.
+    """
+    global _thread
+    if interval <= 0 or (_thread and _thread.is_alive()):
+        return False
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_loop, args=(run, interval), name="recurring-scheduler", daemon=True
+    )
+    _thread.start()
+    return True
+
+
+def stop() -> None:
+    """Ask the scheduler thread to exit after its current run."""
+    _stop.set()
@@ -1,128 +1,393 @@
-from datetime import datetime, timedelta
-from typing import List, Dict
-from .database import get_connection
+import heapq
+from dataclasses import asdict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Optional, Sequence, Tuple
+from .dao import TaskDAO
+from .database import connection
+from .dates import add_months, month_range, parse_date, parse_month
+from .migrations import rebuild_cost_rollup
+from .reports import calendar_window, forecast_months, trend_matrix, trend_months
 from .models import Task
+from .metrics import instrumented
 
+# NumPy is only needed by ForecastService; it is imported there on first use
+# to keep it off the web apps' startup path.
+if TYPE_CHECKING:
+    import numpy as np
+
+@instrumented("sqlite", "reports")
 class ReportingService:
     @staticmethod
     def monthly_breakdown(year: int, month: int) -> Dict[str, float]:
         """Get total costs by property for a specific month."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Format month with leading zero
-        month_str = f"{year}-{month:02d}%"
-        
-        cursor.execute("""
-            SELECT p.name, SUM(t.cost) as total
-            FROM tasks t
-            JOIN properties p ON t.property_id = p.id
-            WHERE t.start_date LIKE ?
-            GROUP BY p.name
-        """, (month_str,))
-        
-        results = {row[0]: row[1] for row in cursor.fetchall()}
+        month_key = month_range(year, month)[0][:7]
         
-        # Also get total
-        cursor.execute("SELECT SUM(cost) FROM tasks WHERE start_date LIKE ?", (month_str,))
-        total = cursor.fetchone()[0] or 0
-        results['total'] = total
+        # Reads the per-property rows of task_cost_rollup for the month.
+        # Tasks without a property land in the NULL group: counted in the
+        # total but not listed by name.
+        with connection() as conn:
+            cursor = conn.execute("""
+                SELECT p.name, SUM(r.total_cost) as total
+                FROM task_cost_rollup r
+                LEFT JOIN properties p ON r.property_id = p.id
+                WHERE r.month = ?
+                GROUP BY p.name
+            """, (month_key,))
+            rows = cursor.fetchall()
         
-        conn.close()
+        results = {}
+        total = 0
+        for name, cost in rows:
+            cost = round(cost or 0, 2)
+            if name is not None:
+                results[name] = cost
+            total += cost
+        results['total'] = round(total, 2)
         return results
     
     @staticmethod
-    def yearly_projection() -> float:
-        """Project yearly costs based on recurring tasks."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT SUM(cost) FROM tasks 
-            WHERE recurring = 'yes' AND completion_status = 'complete'
-        """)
-        monthly_total = cursor.fetchone()[0] or 0
-        
-        # Project: daily * 365, weekly * 52, monthly * 12, yearly * 1
-        cursor.execute("""
-            SELECT recurrence_interval, cost FROM tasks 
-            WHERE recurring = 'yes' AND completion_status = 'complete'
-        """)
+    def trend(start: str, end: str, group_by: str = 'property') -> Dict:
+        """Monthly cost per property, contact or service type over a month range.
         
-        yearly_total = 0
-        for interval, cost in cursor.fetchall():
-            if interval == 'daily':
-                yearly_total += cost * 365
-            elif interval == 'weekly':
-                yearly_total += cost * 52
-            elif interval == 'monthly':
-                yearly_total += cost * 12
-            elif interval == 'yearly':
-                yearly_total += cost
+        One grouped query covers the whole range: per-property totals come
+        from task_cost_rollup, the contact groupings from one range scan of
+        tasks.
+        """
+        months = trend_months(start, end, group_by)
+        with connection() as conn:
+            if group_by == 'property':
+                cursor = conn.execute("""
+                    SELECT r.month, p.name, SUM(r.total_cost)
+                    FROM task_cost_rollup r
+                    LEFT JOIN properties p ON r.property_id = p.id
+                    WHERE r.month >= ? AND r.month <= ?
+                    GROUP BY r.month, p.name
+                """, (months[0], months[-1]))
             else:
-                yearly_total += cost  # fallback
-        
-        conn.close()
-        return yearly_total
+                column = 'c.name' if group_by == 'contact' else 'c.service_type'
+                first_day = month_range(*parse_month(months[0]))[0]
+                after_last = month_range(*parse_month(months[-1]))[1]
+                cursor = conn.execute(f"""
+                    SELECT substr(t.start_date, 1, 7), {column}, SUM(t.cost)
+                    FROM tasks t
+                    LEFT JOIN contacts c ON t.contact_id = c.id
+                    WHERE t.start_date >= ? AND t.start_date < ?
+                    GROUP BY 1, 2
+                """, (first_day, after_last))
+            rows = cursor.fetchall()
+        return trend_matrix(months, group_by, rows)
+    
+    @staticmethod
+    def forecast(start: Optional[str] = None, months: int = 12) -> Dict:
+        """Projected recurring spend per property for each month of a horizon."""
+        keys = forecast_months(start, months)
+        with connection() as conn:
+            cursor = conn.execute("""
+                SELECT p.name, COALESCE(t.end_date, t.start_date), t.cost,
+                       t.recurrence_interval
+                FROM tasks t
+                LEFT JOIN properties p ON t.property_id = p.id
+                WHERE t.recurring = 'yes'
+                  AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_task_id = t.id)
+            """)
+            rows = cursor.fetchall()
+        return ForecastService.project(rows, keys)
+    
+    @staticmethod
+    def yearly_projection() -> float:
+        """Projected recurring spend over the next twelve months."""
+        return ReportingService.forecast()['total']
     
     @staticmethod
     def cost_summary() -> Dict[str, float]:
         """Get total paid vs unpaid costs."""
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.execute("""
+                SELECT ROUND(SUM(paid_cost), 2), ROUND(SUM(unpaid_cost), 2)
+                FROM task_cost_rollup
+            """)
+            row = cursor.fetchone()
+        paid = row[0] or 0
+        unpaid = row[1] or 0
+        return {'paid': paid, 'unpaid': unpaid, 'total': paid + unpaid}
+    
+    @staticmethod
+    def rebuild_rollup() -> None:
+        """Recompute the monthly cost rollup from every task (backfill/repair)."""
+        with connection() as conn:
+            rebuild_cost_rollup(conn)
+
+
+class ForecastService:
+    """Counts future occurrences of recurring tasks month by month.
+    
+    Each recurring series repeats every interval after the anchor of its
+    latest task (end date, else start date, else today), matching
+    RecurringService.get_next_occurrence; tasks the scheduler has already
+    rolled over are left out.
+    Occurrence counts for every task and month are computed at once on
+    NumPy arrays, so thousands of tasks over a multi-year horizon take a few
+    milliseconds.
+    """
+    DAY_STEPS = {'daily': 1, 'weekly': 7}
+    MONTH_STEPS = {'monthly': 1, 'yearly': 12}
+    
+    @staticmethod
+    def _anchors(values: Sequence[Optional[str]]) -> 'np.ndarray':
+        import numpy as np
+        try:
+            anchors = np.array(values, dtype='datetime64[D]')
+        except ValueError:
+            anchors = np.array([ForecastService._parse(v) for v in values], dtype='datetime64[D]')
+        anchors[np.isnat(anchors)] = np.datetime64(date.today())
+        return anchors
+    
+    @staticmethod
+    def _parse(value) -> Optional[date]:
+        try:
+            return parse_date(value)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _steps(intervals: 'np.ndarray', steps: Dict[str, int]) -> 'np.ndarray':
+        import numpy as np
+        out = np.zeros(len(intervals), dtype=np.int64)
+        for interval, step in steps.items():
+            out[intervals == interval] = step
+        return out
+    
+    @staticmethod
+    def occurrence_counts(anchors: Sequence[Optional[str]], intervals: Sequence[str],
+                          months: List[str], today: Optional[date] = None) -> 'np.ndarray':
+        """(tasks x months) array of occurrences after each anchor per month.
         
-        cursor.execute("SELECT SUM(cost) FROM tasks WHERE payment_status = 'paid'")
-        paid = cursor.fetchone()[0] or 0
+        Only occurrences from today on are counted: earlier months are 0 and
+        the current month counts the rest of the month.
+        """
+        import numpy as np
+        # Work in plain integers: days and months since the epoch.
+        anchor_dates = ForecastService._anchors(anchors)
+        anchor_days = anchor_dates.astype(np.int64)
+        anchor_months = anchor_dates.astype('datetime64[M]').astype(np.int64)
+        today = np.datetime64(today or date.today(), 'D')
+        this_month = today.astype('datetime64[M]')
+        month_edges = np.arange(
+            np.datetime64(months[0], 'M'), np.datetime64(months[-1], 'M') + 2
+        )
+        day_edges = np.maximum(month_edges.astype('datetime64[D]').astype(np.float64),
+                               float(today.astype(np.int64)))
+        month_edges = month_edges.astype(np.int64)
+        counts = np.zeros((len(anchor_days), len(months)), dtype=np.int64)
         
-        cursor.execute("SELECT SUM(cost) FROM tasks WHERE payment_status = 'unpaid'")
-        unpaid = cursor.fetchone()[0] or 0
+        intervals = np.array(intervals, dtype=object)
+        day_steps = ForecastService._steps(intervals, ForecastService.DAY_STEPS)
+        rows = np.nonzero(day_steps)[0]
+        if rows.size:
+            # Occurrence k >= 1 falls on anchor + k * step; the number of
+            # k below each month edge is ceil(days / step), floored at 1.
+            offsets = day_edges[None, :] - anchor_days[rows, None]
+            below = np.maximum(np.ceil(offsets / day_steps[rows, None]), 1)
+            counts[rows] = np.diff(below, axis=1)
         
-        conn.close()
-        return {'paid': paid, 'unpaid': unpaid, 'total': paid + unpaid}
+        month_steps = ForecastService._steps(intervals, ForecastService.MONTH_STEPS)
+        rows = np.nonzero(month_steps)[0]
+        if rows.size:
+            # One occurrence in every month that is a positive multiple of
+            # the step after the anchor month (short months clamp the day).
+            offsets = month_edges[None, :-1] - anchor_months[rows, None]
+            upcoming = month_edges[:-1] >= this_month.astype(np.int64)
+            counts[rows] = ((offsets > 0) & (offsets % month_steps[rows, None] == 0)
+                            & upcoming[None, :])
+            current = np.nonzero(month_edges[:-1] == this_month.astype(np.int64))[0]
+            if current.size:
+                # This month's occurrence is on the anchor's day of month,
+                # clamped to the month's length; drop it if that has passed.
+                first = this_month.astype('datetime64[D]')
+                month_length = int(((this_month + 1).astype('datetime64[D]') - first)
+                                   .astype(np.int64))
+                anchor_day = anchor_days[rows] - anchor_dates[rows].astype(
+                    'datetime64[M]').astype('datetime64[D]').astype(np.int64) + 1
+                today_day = int((today - first).astype(np.int64)) + 1
+                col = current[0]
+                counts[rows, col] *= np.minimum(anchor_day, month_length) >= today_day
+        return counts
+    
+    @staticmethod
+    def project(tasks: Iterable[Tuple[Optional[str], Optional[str], float, str]],
+                months: List[str]) -> Dict:
+        """Forecast matrix from (property name, anchor date, cost, interval) rows.
+        
+        Returns the trend report shape (months, per-property series, monthly
+        totals) plus the horizon total.
+        """
+        import numpy as np
+        columns = list(zip(*tasks))
+        series, totals = {}, np.zeros(len(months))
+        if columns:
+            names, anchors, costs, intervals = columns
+            counts = ForecastService.occurrence_counts(anchors, intervals, months)
+            spend = counts * np.array([float(c or 0) for c in costs])[:, None]
+            # Sum task rows into one row per property name with a 0/1 matrix.
+            groups = {name: i for i, name in enumerate(dict.fromkeys(names))}
+            members = np.zeros((len(groups), len(names)))
+            members[[groups[name] for name in names], np.arange(len(names))] = 1
+            by_group = np.round(members @ spend, 2)
+            # Tasks without a property count toward totals only, as in the trend.
+            series = {
+                name: by_group[i].tolist()
+                for name, i in sorted(groups.items(), key=lambda item: str(item[0]))
+                if name is not None
+            }
+            totals = spend.sum(axis=0)
+        result = {
+            'group_by': 'property',
+            'months': months,
+            'series': series,
+            'totals': np.round(totals, 2).tolist(),
+        }
+        result['total'] = round(float(totals.sum()), 2)
+        return result
 
 
 class RecurringService:
+    @staticmethod
+    def advance(anchor: date, interval: str, count: int = 1) -> Optional[date]:
+        """anchor moved count intervals ahead; months and years follow the calendar."""
+        if interval in ForecastService.DAY_STEPS:
+            return anchor + timedelta(days=ForecastService.DAY_STEPS[interval] * count)
+        if interval in ForecastService.MONTH_STEPS:
+            return add_months(anchor, ForecastService.MONTH_STEPS[interval] * count)
+        return None
+    
+    @staticmethod
+    def steps_after(anchor: date, interval: str, after: date) -> int:
+        """Smallest count >= 1 whose occurrence falls after the given date."""
+        if interval in ForecastService.DAY_STEPS:
+            return max(1, (after - anchor).days // ForecastService.DAY_STEPS[interval] + 1)
+        step = ForecastService.MONTH_STEPS[interval]
+        months = (after.year - anchor.year) * 12 + after.month - anchor.month
+        count = max(1, months // step)
+        while RecurringService.advance(anchor, interval, count) <= after:
+            count += 1
+        return count
+    
     @staticmethod
     def get_next_occurrence(task: Task) -> str:
         """Calculate next occurrence date based on interval."""
-        if not task.end_date:
+        if not task.end_date or task.recurring != 'yes':
             return ""
         
         try:
-            end_date = datetime.strptime(task.end_date, "%Y-%m-%d")
+            end_date = parse_date(task.end_date)
         except ValueError:
             return ""
         
-        if task.recurring == 'yes':
-            if task.recurrence_interval == 'daily':
-                next_date = end_date + timedelta(days=1)
-            elif task.recurrence_interval == 'weekly':
-                next_date = end_date + timedelta(weeks=1)
-            elif task.recurrence_interval == 'monthly':
-                next_date = end_date + timedelta(days=30)
-            elif task.recurrence_interval == 'yearly':
-                next_date = end_date + timedelta(days=365)
-            else:
-                return ""
-            return next_date.strftime("%Y-%m-%d")
-        
-        return ""
+        next_date = RecurringService.advance(end_date, task.recurrence_interval)
+        return next_date.isoformat() if next_date else ""
     
     @staticmethod
-    def generate_next_task(original_task: Task) -> Task:
-        """Create a new task based on the recurring pattern."""
+    def generate_next_task(original_task: Task, after: Optional[date] = None) -> Task:
+        """Create a new task based on the recurring pattern.
+        
+        With after, occurrences on or before that date are skipped, so a
+        long-overdue series resumes at its first future occurrence.
+        """
+        start_date = original_task.end_date
         next_date = RecurringService.get_next_occurrence(original_task)
+        if after and next_date:
+            end_date = parse_date(original_task.end_date)
+            interval = original_task.recurrence_interval
+            count = RecurringService.steps_after(end_date, interval, after)
+            start_date = RecurringService.advance(end_date, interval, count - 1).isoformat()
+            next_date = RecurringService.advance(end_date, interval, count).isoformat()
         
         return Task(
             property_id=original_task.property_id,
             contact_id=original_task.contact_id,
             description=original_task.description,
-            start_date=original_task.end_date,
+            start_date=start_date,
+            start_time=original_task.start_time,
             end_date=next_date,
+            end_time=original_task.end_time,
             cost=original_task.cost,
             payment_status='unpaid',
             completion_status='incomplete',
             recurring=original_task.recurring,
             recurrence_interval=original_task.recurrence_interval,
-            notes=original_task.notes
+            notes=original_task.notes,
+            parent_task_id=original_task.id
         )
+    
+    @staticmethod
+    def schedule(today: Optional[date] = None, lead_days: int = 0) -> int:
+        """Materialize the next task of every recurring series due to roll over.
+        
+        A series rolls over once its latest task ends within lead_days of
+        today. Due tasks come from one query and their successors are written
+        in one transaction; a parent that already has a child is skipped, so
+        overlapping runs never duplicate. Returns the number of tasks created.
+        """
+        today = today or date.today()
+        due = TaskDAO.get_due_recurring((today + timedelta(days=lead_days)).isoformat())
+        new_tasks = [
+            RecurringService.generate_next_task(task, after=today)
+            for task in due
+            if RecurringService.get_next_occurrence(task)
+        ]
+        return TaskDAO.insert_scheduled(new_tasks)
+    
+    @staticmethod
+    def occurrences(task: dict, first: date, last: date) -> Iterator[dict]:
+        """Virtual occurrences of a recurring task starting within [first, last].
+        
+        Occurrence k runs from the k-1th to the kth interval after the task's
+        end date, as generate_next_task would create it. The first one in
+        the window is computed directly, so the cost depends only on how many
+        fall inside it.
+        """
+        interval = task.get('recurrence_interval')
+        try:
+            anchor = parse_date(task.get('end_date'))
+        except ValueError:
+            return
+        if task.get('recurring') != 'yes' or not anchor:
+            return
+        if RecurringService.advance(anchor, interval) is None:
+            return
+        count = 0
+        if anchor < first:
+            count = RecurringService.steps_after(anchor, interval, first - timedelta(days=1))
+        start = RecurringService.advance(anchor, interval, count)
+        while start <= last:
+            end = RecurringService.advance(anchor, interval, count + 1)
+            yield dict(
+                task, id=None, parent_task_id=None, source_task_id=task.get('id'),
+                virtual=True, start_date=start.isoformat(), end_date=end.isoformat(),
+                payment_status='unpaid', completion_status='incomplete'
+            )
+            count += 1
+            start = end
+    
+    @staticmethod
+    def expand(stored: Iterable[dict], heads: Iterable[dict], first: date,
+               last: date) -> Iterator[dict]:
+        """Merge stored tasks (sorted by start_date) with expanded series heads.
+        
+        Every source is a sorted generator and heapq.merge pulls from them
+        lazily, so nothing outside the window is ever generated.
+        """
+        streams = [(dict(task, virtual=False) for task in stored)]
+        streams.extend(RecurringService.occurrences(head, first, last) for head in heads)
+        return heapq.merge(*streams, key=lambda entry: entry['start_date'])
+    
+    @staticmethod
+    def calendar(start: str, end: str, property_id: int = None) -> List[dict]:
+        """Stored and virtual recurring tasks starting within [start, end]."""
+        first, last = calendar_window(start, end)
+        stored = TaskDAO.query(property_id=property_id, start_from=first.isoformat(),
+                               start_to=last.isoformat(), sort='start_date')
+        heads = TaskDAO.get_due_recurring(last.isoformat(), property_id=property_id)
+        return list(RecurringService.expand(
+            (asdict(t) for t in stored), (asdict(t) for t in heads), first, last
+        ))
@@ -0,0 +1,165 @@
+"""Request-scoped counts of database work, to catch N+1 query patterns.
+
+The web apps begin() a RequestTrace for each request and finish() it when
+the response is ready. While it is active:
+
+- every DAO or reporting call made through metrics.instrumented() is listed
+  in calls, and the rows returned by the outermost calls are added to rows
+  (a method that calls another DAO method is only counted once);
+- every round trip to the database adds to queries: each HTTP request to
+  Supabase (counted by httpx event hooks, which also add the response body
+  to bytes) and each SQL statement SQLite executes, apart from transaction
+  control, PRAGMAs and EXPLAINs. executemany() counts one statement per row.
+
+With DB_TRACE=1 the totals are sent in an X-DB-Trace response header. A
+request that issues more than QUERY_BUDGET queries logs a warning listing
+its calls, whether or not DB_TRACE is set. Without an active trace the
+hooks return after one ContextVar lookup.
+"""
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, List, Optional
+
+DB_TRACE = os.environ.get("DB_TRACE", "").lower() in ("1", "true", "yes")
+QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", 20))
+TRACE_HEADER = "X-DB-Trace"
+
+logger = logging.getLogger(__name__)
+
+# Statements that are not queries of their own.
+_UNCOUNTED = (
+    "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA", "EXPLAIN",
+)
+
+
+class RequestTrace:
+    def __init__(self, name: str):
+        self.name = name
+        self.queries = 0
+        self.rows = 0
+        self.bytes = 0
+        self.calls: List[str] = []
+        # Dashboard fan-out threads add to the same trace.
+        self._lock = threading.Lock()
+
+    def add_query(self, nbytes: int = 0) -> None:
+        with self._lock:
+            self.queries += 1
+            self.bytes += nbytes
+
+    def add_call(self, operation: str, rows: int) -> None:
+        with self._lock:
+            self.calls.append(operation)
+            self.rows += rows
+
+    def header(self) -> str:
+        return (
+            f"queries={self.queries}; rows={self.rows}; "
+            f"bytes={self.bytes}; calls={len(self.calls)}"
+        )
+
+    def summary(self) -> str:
+        """Calls grouped by operation, most frequent first."""
+        counts = Counter(self.calls).most_common()
+        return ", ".join(f"{op} x{n}" if n > 1 else op for op, n in counts)
+
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("db_trace", default=None)
+# Nesting depth of instrumented calls in the current context.
+_depth: ContextVar[int] = ContextVar("db_trace_depth", default=0)
+
+
+def begin(name: str) -> RequestTrace:
+    trace = RequestTrace(name)
+    _trace.set(trace)
+    return trace
+
+
+def current() -> Optional[RequestTrace]:
+    return _trace.get()
+
+
+def finish(budget: int = QUERY_BUDGET) -> Optional[RequestTrace]:
+    """End the current trace, warning if it went over budget queries."""
+    trace = _trace.get()
+    _trace.set(None)
+    if trace is not None and trace.queries > budget:
+        logger.warning(
+            "%s issued %d queries (budget %d): %s",
+            trace.name,
+            trace.queries,
+            budget,
+            trace.summary(),
+        )
+    return trace
+
+
+def enter() -> Any:
+    """Mark the start of an instrumented call; returns a token for leave()."""
+    if _trace.get() is None:
+        return None
+    return _depth.set(_depth.get() + 1)
+
+
+def leave(token: Any, operation: str, result: Any) -> None:
+    if token is None:
+        return
+    _depth.reset(token)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_call(operation, row_count(result) if _depth.get() == 0 else 0)
+
+
+def is_outermost() -> bool:
+    """Whether an instrumented call starting now is not nested in another."""
+    return _trace.get() is not None and _depth.get() == 0
+
+
+def add_call(operation: str, rows: int) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_call(operation, rows)
+
+
+def row_count(result: Any) -> int:
+    """Rows in a DAO result: a list or mapping, a (page, cursor) tuple or one row."""
+    if result is None or isinstance(result, (bool, int, float, str)):
+        return 0
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1
+
+
+def on_statement(sql: str) -> None:
+    """sqlite3 trace callback (see database._open_connection)."""
+    trace = _trace.get()
+    if trace is not None and not sql.lstrip().upper().startswith(_UNCOUNTED):
+        trace.add_query()
+
+
+def on_response(response) -> None:
+    """httpx response hook for the Supabase client."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_query(len(response.read()))
+
+
+async def on_async_response(response) -> None:
+    """httpx.AsyncClient response hook for cloud_async."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_query(len(await response.aread()))
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks see the submitter's context variables,
+    so queries a request fans out to worker threads count toward its trace."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(copy_context().run, fn, *args, **kwargs)
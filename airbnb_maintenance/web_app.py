@@ -1,10 +1,74 @@
-from flask import Flask, jsonify, request, render_template
+import sqlite3
+import time
+from dataclasses import asdict
+from datetime import date
+from functools import partial
+from flask import Flask, Response, g, jsonify, request, render_template
 from airbnb_maintenance import (
-    PropertyDAO, ContactDAO, TaskDAO, ReportingService, RecurringService,
+    PropertyDAO, ContactDAO, TaskDAO, DataVersionDAO, ReportingService, RecurringService,
     Property, Contact, Task
 )
+from airbnb_maintenance import exporter, metrics, profiling, scheduler, tracing
+from airbnb_maintenance.importer import (
+    FORMATS, ImportFileError, detect_format, import_records, iter_records, name_lookup,
+    text_stream
+)
 
 app = Flask(__name__, template_folder='templates')
+# Opt-in (PROFILE_TOKEN): cProfile/tracemalloc hooks and /api/debug/profiles.
+profiling.init_app(app)
+executor = tracing.ContextThreadPoolExecutor(max_workers=4)
+# Opt-in (SCHEDULER_INTERVAL): roll recurring tasks over in the background.
+scheduler.start(lambda: RecurringService.schedule(lead_days=scheduler.SCHEDULER_LEAD_DAYS))
+
+# Largest list accepted by the /api/tasks/batch endpoints.
+MAX_BATCH = 1000
+
+@app.before_request
+def start_timer():
+    # Registered first so it also runs for requests check_etag answers.
+    g.request_started = time.perf_counter()
+    tracing.begin(f'{request.method} {request.path}')
+
+@app.after_request
+def record_latency(response):
+    """Per-route latency and 5xx counts for /api/metrics, and the request's
+    query trace (see tracing). Runs last."""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        elapsed = time.perf_counter() - started
+        metrics.record_request(route, request.method, response.status_code, elapsed)
+    trace = tracing.finish()
+    if trace is not None and tracing.DB_TRACE:
+        response.headers[tracing.TRACE_HEADER] = trace.header()
+    return response
+
+@app.before_request
+def check_etag():
+    """Answer a GET whose If-None-Match is still current with 304, unqueried.
+    
+    The ETag is the data_version counter (bumped by triggers on every write)
+    plus today's date, since due-soon lists and forecasts move with the day.
+    """
+    if request.method != 'GET' or not request.path.startswith('/api/'):
+        return None
+    if request.path == '/api/metrics' or request.path.startswith('/api/debug/'):
+        return None
+    g.etag = f'{DataVersionDAO.get()}-{date.today():%Y%m%d}'
+    if request.if_none_match.contains(g.etag):
+        response = Response(status=304)
+        response.set_etag(g.etag)
+        return response
+    return None
+
+@app.after_request
+def add_etag(response):
+    etag = g.pop('etag', None)
+    if etag and response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/')
 def index():
@@ -19,16 +83,55 @@ def serialize(obj):
     result = {}
     for field in ['id', 'name', 'address', 'status', 'company', 'phone', 'email', 
                   'service_type', 'property_id', 'contact_id', 'description', 
-                  'start_date', 'end_date', 'cost', 'payment_status', 
+                  'start_date', 'start_time', 'end_date', 'end_time', 'cost', 'payment_status', 
                   'completion_status', 'recurring', 'recurrence_interval', 'notes']:
         if hasattr(obj, field):
             result[field] = getattr(obj, field)
     return result
 
+# Legacy ?status= values and the TaskDAO.query filter each one maps to.
+STATUS_FILTERS = {
+    'unpaid': ('payment_status', 'unpaid'),
+    'incomplete': ('completion_status', 'incomplete'),
+    'recurring': ('recurring', 'yes'),
+}
+
+def task_filters():
+    """Collect TaskDAO.query keyword arguments from the query string."""
+    args = request.args
+    filters = {}
+    for name in ('property_id', 'contact_id'):
+        value = args.get(name, type=int)
+        if value is not None:
+            filters[name] = value
+    for name in ('payment_status', 'completion_status', 'recurring', 'start_from', 'start_to', 'sort'):
+        if args.get(name):
+            filters[name] = args.get(name)
+    if args.get('status') in STATUS_FILTERS:
+        name, value = STATUS_FILTERS[args.get('status')]
+        filters.setdefault(name, value)
+    return filters
+
+def page_response(get_page):
+    """Keyset page envelope when the client sent limit/cursor, else None."""
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    try:
+        items, next_cursor = get_page(
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': serialize(items), 'next_cursor': next_cursor})
+
 
 # Properties
 @app.route('/api/properties', methods=['GET'])
 def get_properties():
+    page = page_response(PropertyDAO.get_page)
+    if page is not None:
+        return page
     return jsonify(serialize(PropertyDAO.get_all()))
 
 @app.route('/api/properties/<int:id>', methods=['GET'])
@@ -71,6 +174,9 @@ def get_contacts():
     service_type = request.args.get('service_type')
     if service_type:
         return jsonify(serialize(ContactDAO.get_by_type(service_type)))
+    page = page_response(ContactDAO.get_page)
+    if page is not None:
+        return page
     return jsonify(serialize(ContactDAO.get_all()))
 
 @app.route('/api/contacts/<int:id>', methods=['GET'])
@@ -114,69 +220,150 @@ def delete_contact(id):
 # Tasks
 @app.route('/api/tasks', methods=['GET'])
 def get_tasks():
-    property_id = request.args.get('property_id')
-    status = request.args.get('status')
-    
-    if property_id:
-        return jsonify(serialize(TaskDAO.get_by_property(int(property_id))))
-    elif status == 'unpaid':
-        return jsonify(serialize(TaskDAO.get_unpaid()))
-    elif status == 'incomplete':
-        return jsonify(serialize(TaskDAO.get_incomplete()))
-    elif status == 'recurring':
-        return jsonify(serialize(TaskDAO.get_recurring()))
+    filters = task_filters()
+    page = page_response(partial(TaskDAO.query_page, **filters) if filters else TaskDAO.get_page)
+    if page is not None:
+        return page
+    if filters:
+        try:
+            tasks = TaskDAO.query(**filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(serialize(tasks))
     return jsonify(serialize(TaskDAO.get_all()))
 
+@app.route('/api/tasks/export', methods=['GET'])
+def export_tasks():
+    """Stream every task as CSV or NDJSON (?format=, default csv)."""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in exporter.FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(exporter.FORMATS)}"}), 400
+    return Response(
+        exporter.export_rows(TaskDAO.iter_all(), fmt),
+        mimetype=exporter.MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename=tasks.{fmt}'}
+    )
+
 @app.route('/api/tasks/<int:id>', methods=['GET'])
 def get_task(id):
     task = TaskDAO.get_by_id(id)
     return jsonify(serialize(task))
 
-@app.route('/api/tasks', methods=['POST'])
-def create_task():
-    data = request.json
-    task = Task(
+def task_from_request(data, id=None):
+    """Build a Task from a request body; create fills status defaults."""
+    return Task(
+        id=id,
         property_id=data.get('property_id'),
         contact_id=data.get('contact_id'),
         description=data.get('description'),
         start_date=data.get('start_date', ''),
+        start_time=data.get('start_time', ''),
         end_date=data.get('end_date', ''),
+        end_time=data.get('end_time', ''),
         cost=data.get('cost', 0),
-        payment_status=data.get('payment_status', 'unpaid'),
-        completion_status=data.get('completion_status', 'incomplete'),
+        payment_status=data.get('payment_status', None if id else 'unpaid'),
+        completion_status=data.get('completion_status', None if id else 'incomplete'),
         recurring=data.get('recurring', 'no'),
         recurrence_interval=data.get('recurrence_interval', ''),
         notes=data.get('notes', '')
     )
-    tid = TaskDAO.create(task)
+
+@app.route('/api/tasks', methods=['POST'])
+def create_task():
+    data = request.json
+    try:
+        tid = TaskDAO.create(task_from_request(data))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify({'id': tid}), 201
 
 @app.route('/api/tasks/<int:id>', methods=['PUT'])
 def update_task(id):
     data = request.json
-    task = Task(
-        id=id,
-        property_id=data.get('property_id'),
-        contact_id=data.get('contact_id'),
-        description=data.get('description'),
-        start_date=data.get('start_date', ''),
-        end_date=data.get('end_date', ''),
-        cost=data.get('cost', 0),
-        payment_status=data.get('payment_status'),
-        completion_status=data.get('completion_status'),
-        recurring=data.get('recurring', 'no'),
-        recurrence_interval=data.get('recurrence_interval', ''),
-        notes=data.get('notes', '')
-    )
-    TaskDAO.update(task)
+    try:
+        TaskDAO.update(task_from_request(data, id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify({'success': True})
 
+def batch_body():
+    """The "tasks" list of a batch request, or raise ValueError."""
+    tasks = (request.json or {}).get('tasks')
+    if not isinstance(tasks, list) or not tasks:
+        raise ValueError('Body must be {"tasks": [...]} with at least one task')
+    if len(tasks) > MAX_BATCH:
+        raise ValueError(f'At most {MAX_BATCH} tasks per batch')
+    return tasks
+
+@app.route('/api/tasks/batch', methods=['POST'])
+def create_tasks_batch():
+    try:
+        tasks = batch_body()
+        for i, data in enumerate(tasks):
+            if not data.get('description'):
+                raise ValueError(f'Task {i} needs a description')
+        ids = TaskDAO.create_many([task_from_request(data) for data in tasks])
+    except (ValueError, sqlite3.IntegrityError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'ids': ids}), 201
+
+@app.route('/api/tasks/batch', methods=['PUT'])
+def update_tasks_batch():
+    try:
+        tasks = batch_body()
+        if any(not isinstance(data.get('id'), int) for data in tasks):
+            raise ValueError('Every task in a batch update needs an integer id')
+        # Partial, like the cloud app: only the keys an item sends change.
+        updated = TaskDAO.update_many(tasks)
+    except (ValueError, sqlite3.IntegrityError) as e:
+        # e.g. a null description; the transaction is rolled back
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'updated': updated})
+
+@app.route('/api/tasks/import', methods=['POST'])
+def import_tasks():
+    """Stream a CSV/NDJSON upload (multipart "file" or raw body) into tasks."""
+    upload = request.files.get('file')
+    fmt = request.args.get('format') or detect_format(upload.filename if upload else '')
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(FORMATS)}"}), 400
+    stream = text_stream(upload.stream if upload else request.stream)
+    try:
+        result = import_records(
+            iter_records(stream, fmt), TaskDAO.insert_imported,
+            name_lookup(PropertyDAO.get_names()), name_lookup(ContactDAO.get_names())
+        )
+    except ImportFileError as e:
+        return jsonify({'error': str(e), 'row': e.row}), 400
+    return jsonify(asdict(result))
+
 @app.route('/api/tasks/<int:id>', methods=['DELETE'])
 def delete_task(id):
     TaskDAO.delete(id)
     return jsonify({'success': True})
 
 
+# Dashboard
+@app.route('/api/dashboard', methods=['GET'])
+def get_dashboard():
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    summary = executor.submit(ReportingService.cost_summary)
+    projection = executor.submit(ReportingService.yearly_projection)
+    names = executor.submit(PropertyDAO.get_names)
+    due_soon = executor.submit(TaskDAO.get_due_soon, limit)
+    return jsonify({
+        'summary': summary.result(),
+        'yearly_projection': projection.result(),
+        'properties': names.result(),
+        'due_soon': serialize(due_soon.result())
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Route and DAO latency histograms in the Prometheus text format."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+
 # Reports
 @app.route('/api/reports/summary', methods=['GET'])
 def get_summary():
@@ -184,7 +371,17 @@ def get_summary():
 
 @app.route('/api/reports/projection', methods=['GET'])
 def get_projection():
-    return jsonify({'yearly_projection': ReportingService.yearly_projection()})
+    """Recurring-spend forecast: ?from=YYYY-MM (default this month)&months=12."""
+    try:
+        forecast = ReportingService.forecast(
+            request.args.get('from'), request.args.get('months', 12, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Only a horizon of at least 12 months covers a whole year.
+    if len(forecast['totals']) >= 12:
+        forecast['yearly_projection'] = round(sum(forecast['totals'][:12]), 2)
+    return jsonify(forecast)
 
 @app.route('/api/reports/monthly', methods=['GET'])
 def get_monthly():
@@ -194,8 +391,37 @@ def get_monthly():
         from datetime import datetime
         now = datetime.now()
         year, month = now.year, now.month
+    if not 1 <= month <= 12:
+        return jsonify({'error': 'month must be between 1 and 12'}), 400
     return jsonify(ReportingService.monthly_breakdown(year, month))
 
+@app.route('/api/calendar', methods=['GET'])
+def get_calendar():
+    """Tasks starting in ?from=&to= (inclusive), with recurring series expanded.
+    
+    Occurrences not yet created by the scheduler are included with
+    "virtual": true and the id of the task they repeat as source_task_id.
+    """
+    try:
+        items = RecurringService.calendar(
+            request.args.get('from', ''), request.args.get('to', ''),
+            request.args.get('property_id', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items})
+
+@app.route('/api/reports/trend', methods=['GET'])
+def get_trend():
+    """Month-by-group cost matrix: ?from=YYYY-MM&to=YYYY-MM&group_by=property."""
+    try:
+        return jsonify(ReportingService.trend(
+            request.args.get('from', ''), request.args.get('to', ''),
+            request.args.get('group_by', 'property')
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,16 @@
+"""Benchmarks for the DAO, reporting, recurring-task and HTTP hot paths.
+
+    python -m benchmarks --tasks 100000 --out results.json
+    python -m benchmarks --tasks 100000 --baseline results.json
+
+The local SQLite backend is seeded with deterministic synthetic data in a
+scratch database (see data.py), which is kept and reused for the same sizes.
+Each case is run once to warm up, then timed --repeat times. Results are
+written as JSON and, given a baseline file from an earlier run, compared
+case by case. With --fail-on-regression the run exits non-zero if any
+median got slower than the threshold allows.
+
+--supabase runs the cloud_db cases and the cloud app's endpoints against
+SUPABASE_URL/SUPABASE_KEY, e.g. a local `supabase start` stack with the
+service-role key, as the user given by --user-id.
+"""
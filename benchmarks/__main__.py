@@ -0,0 +1,87 @@
+"""python -m benchmarks: seed, time every case, write and compare results."""
+import argparse
+import fnmatch
+import logging
+import os
+import sys
+import tempfile
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--properties", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the data")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per case")
+    parser.add_argument("--db", help="SQLite file (default: one per size in the temp dir)")
+    parser.add_argument("--reseed", action="store_true", help="recreate the database")
+    parser.add_argument("--only", action="append", default=[],
+                        help="glob over group/name, e.g. 'reports/*' (repeatable)")
+    parser.add_argument("--no-http", action="store_true", help="skip the Flask endpoints")
+    parser.add_argument("--supabase", action="store_true",
+                        help="also benchmark cloud_db against SUPABASE_URL")
+    parser.add_argument("--user-id", help="Supabase user to seed and query (--supabase)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed median slowdown vs baseline (default 0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sizes = {"properties": args.properties, "contacts": args.contacts, "tasks": args.tasks}
+    db = args.db or os.path.join(
+        tempfile.gettempdir(),
+        f"airbnb-bench-{args.properties}-{args.contacts}-{args.tasks}-{args.seed}.db",
+    )
+    if args.reseed:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db + suffix):
+                os.remove(db + suffix)
+    # Read by airbnb_maintenance.config at import, so set before importing it.
+    os.environ["AIRBNB_DB_PATH"] = db
+    # Slow-query warnings for every full scan would drown the output.
+    logging.getLogger("airbnb_maintenance.querylog").setLevel(logging.ERROR)
+    logging.getLogger("airbnb_maintenance.tracing").setLevel(logging.ERROR)
+
+    from . import cases, data, runner
+
+    print(f"SQLite database: {db}")
+    if data.seed_sqlite(args.properties, args.contacts, args.tasks, args.seed):
+        print(f"Seeded {sizes}")
+    selected = cases.sqlite_cases(http=not args.no_http)
+
+    if args.supabase:
+        if not args.user_id:
+            print("--supabase needs --user-id")
+            return 2
+        if data.seed_supabase(args.user_id, args.properties, args.contacts,
+                              args.tasks, args.seed):
+            print(f"Seeded Supabase user {args.user_id} with {sizes}")
+        selected += cases.supabase_cases(args.user_id, http=not args.no_http)
+
+    if args.only:
+        selected = [c for c in selected
+                    if any(fnmatch.fnmatch(f"{c.group}/{c.name}", p) for p in args.only)]
+
+    results = runner.run(selected, args.repeat)
+    payload = {"meta": runner.metadata(sizes), "results": results}
+    if args.out:
+        runner.write(args.out, payload)
+        print(f"Wrote {args.out}")
+
+    status = 1 if any("error" in r for r in results) else 0
+    if args.baseline:
+        baseline = runner.load(args.baseline)
+        rows = runner.compare(results, baseline, args.threshold)
+        runner.print_comparison(rows, baseline.get("meta", {}).get("sizes"), sizes)
+        if args.fail_on_regression and any(r["regressed"] for r in rows):
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Benchmark cases for the local (SQLite) and cloud (Supabase) backends."""
+from datetime import date, timedelta
+from typing import List
+
+from .runner import Case
+
+SLOW = 3  # repeats for cases that scan every task
+
+
+def _window(today: date):
+    month = f"{today:%Y-%m}"
+    year_ago = f"{today.replace(day=1) - timedelta(days=335):%Y-%m}"
+    quarter = (today.isoformat(), (today + timedelta(days=90)).isoformat())
+    return month, year_ago, quarter
+
+
+def sqlite_cases(http: bool = True) -> List[Case]:
+    from airbnb_maintenance import (ContactDAO, PropertyDAO, RecurringService,
+                                    ReportingService, TaskDAO)
+
+    today = date.today()
+    month, year_ago, (cal_from, cal_to) = _window(today)
+    page, next_cursor = TaskDAO.get_page(limit=50)
+    prop_id = PropertyDAO.get_all()[0].id
+
+    cases = [
+        Case("dao", "TaskDAO.get_all", TaskDAO.get_all, SLOW),
+        Case("dao", "TaskDAO.iter_all", TaskDAO.iter_all, SLOW),
+        Case("dao", "TaskDAO.get_page", lambda: TaskDAO.get_page(limit=50)),
+        Case("dao", "TaskDAO.get_page[next]",
+             lambda: TaskDAO.get_page(limit=50, cursor=next_cursor)),
+        Case("dao", "TaskDAO.get_unpaid", TaskDAO.get_unpaid, SLOW),
+        Case("dao", "TaskDAO.get_incomplete", TaskDAO.get_incomplete, SLOW),
+        Case("dao", "TaskDAO.get_recurring", TaskDAO.get_recurring),
+        Case("dao", "TaskDAO.get_by_property", lambda: TaskDAO.get_by_property(prop_id)),
+        Case("dao", "TaskDAO.get_due_soon", TaskDAO.get_due_soon),
+        Case("dao", "TaskDAO.query[unpaid,month]",
+             lambda: TaskDAO.query(payment_status="unpaid", start_from=f"{month}-01",
+                                   start_to=cal_to, limit=100)),
+        Case("dao", "TaskDAO.get_by_id", lambda: TaskDAO.get_by_id(page[0].id)),
+        Case("dao", "PropertyDAO.get_all", PropertyDAO.get_all),
+        Case("dao", "ContactDAO.get_all", ContactDAO.get_all),
+        Case("dao", "ContactDAO.get_page", lambda: ContactDAO.get_page(limit=50)),
+        Case("reports", "cost_summary", ReportingService.cost_summary),
+        Case("reports", "monthly_breakdown",
+             lambda: ReportingService.monthly_breakdown(today.year, today.month)),
+        Case("reports", "trend[property]",
+             lambda: ReportingService.trend(year_ago, month, "property")),
+        Case("reports", "trend[contact]",
+             lambda: ReportingService.trend(year_ago, month, "contact")),
+        Case("reports", "trend[service_type]",
+             lambda: ReportingService.trend(year_ago, month, "service_type")),
+        Case("reports", "forecast", ReportingService.forecast),
+        Case("reports", "yearly_projection", ReportingService.yearly_projection),
+        Case("reports", "rebuild_rollup", ReportingService.rebuild_rollup, SLOW),
+        # The warm-up run materializes what is due; timed runs are steady state.
+        Case("recurring", "schedule", RecurringService.schedule),
+        Case("recurring", "calendar[quarter]",
+             lambda: RecurringService.calendar(cal_from, cal_to)),
+    ]
+    if http:
+        from airbnb_maintenance.web_app import app
+
+        cases += http_cases(app.test_client(), month, year_ago, cal_from, cal_to)
+    return cases
+
+
+def http_cases(client, month, year_ago, cal_from, cal_to) -> List[Case]:
+    def get(url):
+        return lambda: client.get(url)
+
+    return [
+        Case("http", "GET /api/properties", get("/api/properties")),
+        Case("http", "GET /api/contacts", get("/api/contacts")),
+        Case("http", "GET /api/tasks", get("/api/tasks"), SLOW),
+        Case("http", "GET /api/tasks?limit=50", get("/api/tasks?limit=50")),
+        Case("http", "GET /api/tasks?status=unpaid", get("/api/tasks?status=unpaid"), SLOW),
+        Case("http", "GET /api/tasks/export", get("/api/tasks/export"), SLOW),
+        Case("http", "GET /api/dashboard", get("/api/dashboard")),
+        Case("http", "GET /api/reports/summary", get("/api/reports/summary")),
+        Case("http", "GET /api/reports/monthly", get("/api/reports/monthly")),
+        Case("http", "GET /api/reports/projection", get("/api/reports/projection")),
+        Case("http", "GET /api/reports/trend",
+             get(f"/api/reports/trend?from={year_ago}&to={month}")),
+        Case("http", "GET /api/calendar", get(f"/api/calendar?from={cal_from}&to={cal_to}")),
+    ]
+
+
+def supabase_cases(user_id: str, http: bool = True) -> List[Case]:
+    from airbnb_maintenance import cloud_db
+
+    TaskDAO = cloud_db.TaskDAO
+    ReportingService = cloud_db.ReportingService
+    today = date.today()
+    month, year_ago, (cal_from, cal_to) = _window(today)
+    page, next_cursor = TaskDAO.get_page(user_id, limit=50)
+    prop_id = cloud_db.PropertyDAO.get_all(user_id)[0]["id"]
+
+    cases = [
+        Case("cloud-dao", "TaskDAO.get_all", lambda: TaskDAO.get_all(user_id), SLOW),
+        Case("cloud-dao", "TaskDAO.iter_all", lambda: TaskDAO.iter_all(user_id), SLOW),
+        Case("cloud-dao", "TaskDAO.get_page", lambda: TaskDAO.get_page(user_id, limit=50)),
+        Case("cloud-dao", "TaskDAO.get_page[next]",
+             lambda: TaskDAO.get_page(user_id, limit=50, cursor=next_cursor)),
+        Case("cloud-dao", "TaskDAO.get_unpaid", lambda: TaskDAO.get_unpaid(user_id), SLOW),
+        Case("cloud-dao", "TaskDAO.get_recurring", lambda: TaskDAO.get_recurring(user_id)),
+        Case("cloud-dao", "TaskDAO.get_by_property",
+             lambda: TaskDAO.get_by_property(prop_id, user_id)),
+        Case("cloud-dao", "TaskDAO.get_due_soon", lambda: TaskDAO.get_due_soon(user_id)),
+        Case("cloud-dao", "PropertyDAO.get_all",
+             lambda: cloud_db.PropertyDAO.get_all(user_id)),
+        Case("cloud-dao", "ContactDAO.get_all",
+             lambda: cloud_db.ContactDAO.get_all(user_id)),
+        Case("cloud-reports", "cost_summary",
+             lambda: ReportingService.cost_summary(user_id)),
+        Case("cloud-reports", "monthly_breakdown",
+             lambda: ReportingService.monthly_breakdown(today.year, today.month, user_id)),
+        Case("cloud-reports", "trend[property]",
+             lambda: ReportingService.trend(year_ago, month, "property", user_id)),
+        Case("cloud-reports", "forecast", lambda: ReportingService.forecast(user_id)),
+        Case("cloud-reports", "yearly_projection",
+             lambda: ReportingService.yearly_projection(user_id)),
+        Case("cloud-recurring", "schedule",
+             lambda: cloud_db.RecurringService.schedule(user_id)),
+        Case("cloud-recurring", "calendar[quarter]",
+             lambda: cloud_db.RecurringService.calendar(user_id, cal_from, cal_to)),
+    ]
+    if http:
+        from airbnb_maintenance.cloud_web_app import create_app
+
+        client = create_app({"TESTING": True}).test_client()
+        with client.session_transaction() as session:
+            session["user_id"] = user_id
+        cases += [
+            Case("cloud-" + case.group, case.name, case.fn, case.repeat)
+            for case in http_cases(client, month, year_ago, cal_from, cal_to)
+        ]
+    return cases
@@ -0,0 +1,141 @@
+"""Deterministic synthetic data at configurable sizes."""
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+SERVICE_TYPES = ("plumber", "electrician", "hvac", "landscaping", "cleaning", "general")
+DESCRIPTIONS = (
+    "Fix leaky faucet", "Electrical inspection", "Pool maintenance", "Lawn mowing",
+    "General repairs", "Heater inspection", "Deep clean", "Replace smoke detectors",
+    "Gutter cleaning", "Pest control", "Repaint bedroom", "Appliance repair",
+)
+# Roughly how often each interval appears among recurring tasks.
+INTERVALS = ("monthly",) * 6 + ("weekly",) * 3 + ("yearly",) * 2 + ("daily",)
+
+
+def property_rows(count: int) -> List[Dict]:
+    return [
+        {
+            "name": f"Property {i:04d}",
+            "address": f"{100 + i} Main St",
+            "status": "active" if i % 10 else "inactive",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def contact_rows(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Contact {i:05d}",
+            "company": f"Company {i % 250}",
+            "phone": f"555-{i:04d}",
+            "email": f"contact{i}@example.com",
+            "service_type": rng.choice(SERVICE_TYPES),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def task_rows(count: int, properties: int, contacts: int, seed: int = 0,
+              today: date = None) -> Iterator[Dict]:
+    """Tasks over the last three years and the next quarter, ~5% recurring."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    first = today - timedelta(days=3 * 365)
+    span = (today + timedelta(days=90) - first).days
+    for _ in range(count):
+        start = first + timedelta(days=rng.randrange(span))
+        end = start + timedelta(days=rng.randrange(15)) if rng.random() < 0.9 else None
+        recurring = rng.random() < 0.05
+        done = end is not None and end < today and rng.random() < 0.8
+        yield {
+            "property_id": rng.randint(1, properties),
+            "contact_id": rng.randint(1, contacts) if contacts else None,
+            "description": rng.choice(DESCRIPTIONS),
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat() if end else "",
+            "cost": round(rng.uniform(25, 2000), 2),
+            "payment_status": "paid" if done or rng.random() < 0.3 else "unpaid",
+            "completion_status": "complete" if done else "incomplete",
+            "recurring": "yes" if recurring else "no",
+            "recurrence_interval": rng.choice(INTERVALS) if recurring else "",
+            "notes": "",
+        }
+
+
+def batches(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_sqlite(properties: int, contacts: int, tasks: int, seed: int = 0,
+                batch_size: int = 10000) -> bool:
+    """Fill the local database unless it already holds exactly these sizes.
+
+    Returns True if it seeded.
+    """
+    from airbnb_maintenance import ContactDAO, PropertyDAO, TaskDAO, init_db
+    from airbnb_maintenance.database import connection
+    from airbnb_maintenance.models import Contact, Property, Task
+
+    init_db()
+    with connection() as conn:
+        have = tuple(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                     for table in ("properties", "contacts", "tasks"))
+    if have[:2] == (properties, contacts) and have[2] >= tasks:
+        return False
+    if any(have):
+        raise SystemExit(f"Benchmark database holds {have} rows, not "
+                         f"{(properties, contacts, tasks)}; use --reseed")
+    for row in property_rows(properties):
+        PropertyDAO.create(Property(**row))
+    for row in contact_rows(contacts, seed):
+        ContactDAO.create(Contact(**row))
+    for batch in batches(task_rows(tasks, properties, contacts, seed), batch_size):
+        TaskDAO.create_many([Task(**row) for row in batch])
+    return True
+
+
+def seed_supabase(user_id: str, properties: int, contacts: int, tasks: int,
+                  seed: int = 0, batch_size: int = 1000) -> bool:
+    """Fill the user's Supabase data unless it already holds exactly these sizes.
+
+    Like seed_sqlite: the user's property, contact and task counts are
+    compared with the requested sizes. Returns True if it seeded.
+    """
+    from postgrest.types import CountMethod
+
+    from airbnb_maintenance import cloud_db
+
+    client = cloud_db.get_client()
+    have = tuple(
+        client.table(table).select("id", count=CountMethod.exact, head=True)
+        .eq("user_id", user_id).execute().count or 0
+        for table in ("properties", "contacts", "tasks")
+    )
+    if have[:2] == (properties, contacts) and have[2] >= tasks:
+        return False
+    if any(have):
+        raise SystemExit(f"Supabase user {user_id} holds {have} rows, not "
+                         f"{(properties, contacts, tasks)}; use another --user-id")
+    property_ids = [cloud_db.PropertyDAO.create(row, user_id)
+                    for row in property_rows(properties)]
+    contact_ids = [cloud_db.ContactDAO.create(row, user_id)
+                   for row in contact_rows(contacts, seed)]
+    rows = task_rows(tasks, properties, contacts, seed)
+    for batch in batches(rows, batch_size):
+        for row in batch:
+            # Map the 1-based local ids onto the rows Supabase created.
+            row["property_id"] = property_ids[row["property_id"] - 1]
+            if row["contact_id"]:
+                row["contact_id"] = contact_ids[row["contact_id"] - 1]
+        cloud_db.TaskDAO.create_many(batch, user_id)
+    return True
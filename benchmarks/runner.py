@@ -0,0 +1,124 @@
+"""Timing harness, JSON results and baseline comparison."""
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class Case:
+    group: str
+    name: str
+    fn: Callable[[], object]
+    # Caps the repeat count for cases that take seconds at full size.
+    repeat: Optional[int] = None
+
+
+def consume(result) -> int:
+    """Drain generators and streamed responses so their work is timed."""
+    if hasattr(result, "get_data") and hasattr(result, "status_code"):
+        if result.status_code >= 400:
+            body = result.get_data(as_text=True)[:200]
+            raise RuntimeError(f"HTTP {result.status_code}: {body}")
+        return len(result.get_data())
+    if hasattr(result, "__next__"):
+        return sum(1 for _ in result)
+    return 0
+
+
+def run_case(case: Case, repeat: int) -> Dict:
+    times = []
+    try:
+        consume(case.fn())  # warm-up
+        for _ in range(min(case.repeat or repeat, repeat)):
+            started = time.perf_counter()
+            consume(case.fn())
+            times.append(time.perf_counter() - started)
+    except Exception as e:
+        return {"group": case.group, "name": case.name,
+                "error": f"{type(e).__name__}: {e}",
+                "traceback": traceback.format_exc(limit=3)}
+    return {
+        "group": case.group,
+        "name": case.name,
+        "repeat": len(times),
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "max_s": max(times),
+    }
+
+
+def run(cases: List[Case], repeat: int, log=print) -> List[Dict]:
+    results = []
+    for case in cases:
+        result = run_case(case, repeat)
+        results.append(result)
+        if "error" in result:
+            log(f"  {case.group}/{case.name}: ERROR {result['error']}")
+        else:
+            log(f"  {case.group}/{case.name}: median {result['median_s'] * 1000:.2f} ms")
+    return results
+
+
+def metadata(sizes: Dict) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "sizes": sizes,
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[Dict]:
+    """Median ratio of each case to the baseline's; > 1 + threshold regressed."""
+    before = {(r["group"], r["name"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in results:
+        old = before.get((result["group"], result["name"]))
+        if not old or "median_s" not in old or "median_s" not in result:
+            continue
+        ratio = result["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        rows.append({
+            "group": result["group"],
+            "name": result["name"],
+            "baseline_s": old["median_s"],
+            "median_s": result["median_s"],
+            "ratio": ratio,
+            "regressed": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict], baseline_sizes: Dict, sizes: Dict) -> None:
+    if baseline_sizes != sizes:
+        print(f"Warning: baseline sizes {baseline_sizes} differ from {sizes}")
+    print(f"{'case':<48} {'baseline ms':>12} {'now ms':>10} {'ratio':>7}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['group'] + '/' + row['name']:<48} {row['baseline_s'] * 1000:>12.2f} "
+              f"{row['median_s'] * 1000:>10.2f} {row['ratio']:>7.2f}{flag}")
+
+
+def write(path: str, payload: Dict) -> None:
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
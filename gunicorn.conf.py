@@ -0,0 +1,25 @@
+"""gunicorn settings for the cloud web app (read automatically from the cwd).
+
+The master imports the app and its heavy dependencies once (preload_app),
+and forked workers share those pages instead of each paying the import
+cost. Each worker then starts its own scheduler thread and connection pool.
+"""
+import os
+
+wsgi_app = "airbnb_maintenance.cloud_web_app:create_app({'PRELOAD': True})"
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+
+def on_starting(server):
+    from airbnb_maintenance import cloud_web_app
+
+    cloud_web_app.warmup()
+
+
+def post_fork(server, worker):
+    from airbnb_maintenance import cloud_web_app
+
+    cloud_web_app.start_worker()
@@ -0,0 +1,50 @@
+-- Report aggregates computed in Postgres and called over RPC from
+-- cloud_db.ReportingService, so reports return one row instead of every task.
+
+create or replace function report_cost_summary(p_user_id uuid)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'paid', coalesce(sum(cost) filter (where payment_status = 'paid'), 0),
+        'unpaid', coalesce(sum(cost) filter (where payment_status = 'unpaid'), 0),
+        'total', coalesce(sum(cost) filter (where payment_status in ('paid', 'unpaid')), 0)
+    )
+    from tasks
+    where user_id = p_user_id;
+$$;
+
+create or replace function report_monthly_breakdown(p_user_id uuid, p_year int, p_month int)
+returns jsonb
+language sql
+stable
+as $$
+    with per_property as (
+        select p.name, coalesce(sum(t.cost), 0) as total
+        from tasks t
+        join properties p on p.id = t.property_id
+        where t.user_id = p_user_id
+          and t.start_date like p_year || '-' || lpad(p_month::text, 2, '0') || '%'
+        group by p.name
+    )
+    select coalesce(jsonb_object_agg(name, total), '{}'::jsonb)
+        || jsonb_build_object('total', coalesce(sum(total), 0))
+    from per_property;
+$$;
+
+create or replace function report_yearly_projection(p_user_id uuid)
+returns numeric
+language sql
+stable
+as $$
+    select coalesce(sum(coalesce(cost, 0) * case recurrence_interval
+        when 'daily' then 365
+        when 'weekly' then 52
+        when 'monthly' then 12
+        else 1
+    end), 0)
+    from tasks
+    where user_id = p_user_id
+      and recurring = 'yes';
+$$;
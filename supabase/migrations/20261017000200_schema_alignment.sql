@@ -0,0 +1,67 @@
+-- Cloud counterpart of local migrations 1-3 (airbnb_maintenance/migrations.py):
+-- base tables, the columns both backends share, and indexes for the hot queries.
+-- Every index leads with user_id because every cloud query filters on it.
+
+create table if not exists properties (
+    id bigint generated by default as identity primary key,
+    user_id uuid not null references auth.users (id) on delete cascade,
+    name text not null,
+    address text not null,
+    status text default 'active'
+);
+
+create table if not exists contacts (
+    id bigint generated by default as identity primary key,
+    user_id uuid not null references auth.users (id) on delete cascade,
+    name text not null,
+    company text,
+    phone text,
+    email text,
+    service_type text
+);
+
+create table if not exists tasks (
+    id bigint generated by default as identity primary key,
+    user_id uuid not null references auth.users (id) on delete cascade,
+    property_id bigint references properties (id) on delete set null,
+    contact_id bigint references contacts (id) on delete set null,
+    description text not null,
+    start_date text,
+    start_time text default '',
+    end_date text,
+    end_time text default '',
+    cost numeric default 0,
+    payment_status text default 'unpaid',
+    completion_status text default 'incomplete',
+    recurring text default 'no',
+    recurrence_interval text,
+    notes text
+);
+
+alter table tasks add column if not exists start_time text default '';
+alter table tasks add column if not exists end_time text default '';
+
+alter table properties enable row level security;
+alter table contacts enable row level security;
+alter table tasks enable row level security;
+
+-- Task list keyset pages, default query sort, month ranges
+create index if not exists idx_tasks_user_start_date
+    on tasks (user_id, start_date desc, id desc);
+-- query(property_id=...) and per-property reports
+create index if not exists idx_tasks_user_property_start
+    on tasks (user_id, property_id, start_date);
+create index if not exists idx_tasks_user_contact on tasks (user_id, contact_id);
+-- Unpaid lists, due-soon and the cost summary
+create index if not exists idx_tasks_user_payment_end
+    on tasks (user_id, payment_status, end_date);
+create index if not exists idx_tasks_user_completion_start
+    on tasks (user_id, completion_status, start_date);
+-- Recurring lists and the yearly projection only touch recurring rows
+create index if not exists idx_tasks_user_recurring
+    on tasks (user_id, recurrence_interval, cost) where recurring = 'yes';
+-- Property and contact keyset pages
+create index if not exists idx_properties_user_name on properties (user_id, name, id);
+create index if not exists idx_contacts_user_name on contacts (user_id, name, id);
+create index if not exists idx_contacts_user_service_type
+    on contacts (user_id, service_type);
@@ -0,0 +1,88 @@
+-- Store task dates as DATE instead of free-form text so range predicates use
+-- the start_date/end_date indexes and malformed values cannot be written.
+-- Existing values are parsed with the formats the local app accepts
+-- (dates.INPUT_FORMATS: YYYY-MM-DD, YYYY/MM/DD, MM/DD/YYYY, DD.MM.YYYY, any
+-- time part ignored) and empty strings become NULL. Nothing is dropped: if
+-- any value cannot be parsed, the migration fails and lists those tasks.
+
+-- NULL for empty values and for anything that is not a valid date.
+create or replace function task_date_from_text(p_value text)
+returns date
+language plpgsql
+immutable
+as $$
+declare
+    v text := btrim(p_value);
+    m text[];
+begin
+    if v is null or v = '' then
+        return null;
+    end if;
+    if length(v) > 10 and substr(v, 11, 1) in ('T', ' ') then
+        v := substr(v, 1, 10);
+    end if;
+    m := coalesce(regexp_match(v, '^(\d{4})-(\d{1,2})-(\d{1,2})$'),
+                  regexp_match(v, '^(\d{4})/(\d{1,2})/(\d{1,2})$'));
+    if m is not null then
+        return make_date(m[1]::int, m[2]::int, m[3]::int);
+    end if;
+    m := regexp_match(v, '^(\d{1,2})/(\d{1,2})/(\d{4})$');
+    if m is not null then
+        return make_date(m[3]::int, m[1]::int, m[2]::int);
+    end if;
+    m := regexp_match(v, '^(\d{1,2})\.(\d{1,2})\.(\d{4})$');
+    if m is not null then
+        return make_date(m[3]::int, m[2]::int, m[1]::int);
+    end if;
+    return null;
+exception
+    when datetime_field_overflow then  -- e.g. 2026-02-30
+        return null;
+end;
+$$;
+
+do $$
+declare
+    bad text;
+begin
+    select string_agg(
+               format('id %s (start_date %L, end_date %L)', id, start_date, end_date),
+               ', ' order by id)
+    into bad
+    from tasks
+    where (nullif(btrim(start_date), '') is not null
+           and task_date_from_text(start_date) is null)
+       or (nullif(btrim(end_date), '') is not null
+           and task_date_from_text(end_date) is null);
+    if bad is not null then
+        raise exception 'Tasks with unparseable dates: %', bad
+            using hint = 'Correct or clear these values, then re-run the migration.';
+    end if;
+end;
+$$;
+
+alter table tasks
+    alter column start_date type date using (task_date_from_text(start_date)),
+    alter column end_date type date using (task_date_from_text(end_date));
+
+drop function task_date_from_text(text);
+
+-- Month selection becomes a half-open range instead of LIKE 'YYYY-MM%'.
+create or replace function report_monthly_breakdown(p_user_id uuid, p_year int, p_month int)
+returns jsonb
+language sql
+stable
+as $$
+    with per_property as (
+        select p.name, coalesce(sum(t.cost), 0) as total
+        from tasks t
+        join properties p on p.id = t.property_id
+        where t.user_id = p_user_id
+          and t.start_date >= make_date(p_year, p_month, 1)
+          and t.start_date < make_date(p_year, p_month, 1) + interval '1 month'
+        group by p.name
+    )
+    select coalesce(jsonb_object_agg(name, total), '{}'::jsonb)
+        || jsonb_build_object('total', coalesce(sum(total), 0))
+    from per_property;
+$$;
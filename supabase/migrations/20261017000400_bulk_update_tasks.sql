@@ -0,0 +1,30 @@
+-- Update many tasks in one statement for cloud_db.TaskDAO.update_many.
+-- Each element of p_rows is an object with an "id" plus the columns to change;
+-- columns missing from an object keep their current value.
+
+create or replace function bulk_update_tasks(p_user_id uuid, p_rows jsonb)
+returns integer
+language sql
+as $$
+    with updated as (
+        update tasks t set
+            property_id = case when r ? 'property_id' then (r->>'property_id')::bigint else t.property_id end,
+            contact_id = case when r ? 'contact_id' then (r->>'contact_id')::bigint else t.contact_id end,
+            description = case when r ? 'description' then r->>'description' else t.description end,
+            start_date = case when r ? 'start_date' then (r->>'start_date')::date else t.start_date end,
+            start_time = case when r ? 'start_time' then r->>'start_time' else t.start_time end,
+            end_date = case when r ? 'end_date' then (r->>'end_date')::date else t.end_date end,
+            end_time = case when r ? 'end_time' then r->>'end_time' else t.end_time end,
+            cost = case when r ? 'cost' then (r->>'cost')::numeric else t.cost end,
+            payment_status = case when r ? 'payment_status' then r->>'payment_status' else t.payment_status end,
+            completion_status = case when r ? 'completion_status' then r->>'completion_status' else t.completion_status end,
+            recurring = case when r ? 'recurring' then r->>'recurring' else t.recurring end,
+            recurrence_interval = case when r ? 'recurrence_interval' then r->>'recurrence_interval' else t.recurrence_interval end,
+            notes = case when r ? 'notes' then r->>'notes' else t.notes end
+        from jsonb_array_elements(p_rows) as r
+        where t.id = (r->>'id')::bigint
+          and t.user_id = p_user_id
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
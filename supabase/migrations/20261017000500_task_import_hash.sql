@@ -0,0 +1,8 @@
+-- Content hash written by the streaming importer (airbnb_maintenance/importer.py).
+-- The unique index lets TaskDAO.insert_imported upsert with ignore-duplicates,
+-- so re-importing overlapping files never creates duplicate tasks.
+
+alter table tasks add column if not exists import_hash text;
+
+create unique index if not exists idx_tasks_user_import_hash
+    on tasks (user_id, import_hash);
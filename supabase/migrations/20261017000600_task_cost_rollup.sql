@@ -0,0 +1,149 @@
+-- Per (user, property, month) cost totals maintained by statement-level
+-- triggers on tasks, so report_cost_summary and report_monthly_breakdown read
+-- a handful of pre-aggregated rows instead of scanning every task.
+-- Counterpart of local migration 6. Tasks without a property or start date are
+-- keyed as property_id 0 and month ''; month is 'YYYY-MM'.
+
+create table if not exists task_cost_rollup (
+    user_id uuid not null references auth.users (id) on delete cascade,
+    property_id bigint not null,
+    month text not null,
+    paid_cost numeric not null default 0,
+    unpaid_cost numeric not null default 0,
+    total_cost numeric not null default 0,
+    task_count integer not null default 0,
+    primary key (user_id, property_id, month)
+);
+
+alter table task_cost_rollup enable row level security;
+
+-- Written only by the security definer functions below; users read their own.
+drop policy if exists task_cost_rollup_select_own on task_cost_rollup;
+create policy task_cost_rollup_select_own on task_cost_rollup
+    for select using (user_id = auth.uid());
+
+-- Adds (p_sign 1) or removes (p_sign -1) a set of tasks, one upsert per call.
+create or replace function task_cost_rollup_merge(p_rows tasks[], p_sign integer)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into task_cost_rollup as r
+        (user_id, property_id, month, paid_cost, unpaid_cost, total_cost, task_count)
+    select t.user_id,
+           coalesce(t.property_id, 0),
+           coalesce(to_char(t.start_date, 'YYYY-MM'), ''),
+           p_sign * coalesce(sum(t.cost) filter (where t.payment_status = 'paid'), 0),
+           p_sign * coalesce(sum(t.cost) filter (where t.payment_status = 'unpaid'), 0),
+           p_sign * coalesce(sum(t.cost), 0),
+           p_sign * count(*)
+    from unnest(p_rows) as t
+    group by 1, 2, 3
+    on conflict (user_id, property_id, month) do update set
+        paid_cost = r.paid_cost + excluded.paid_cost,
+        unpaid_cost = r.unpaid_cost + excluded.unpaid_cost,
+        total_cost = r.total_cost + excluded.total_cost,
+        task_count = r.task_count + excluded.task_count;
+
+    delete from task_cost_rollup
+    where task_count <= 0
+      and user_id in (select t.user_id from unnest(p_rows) as t);
+$$;
+
+-- Statement-level, so a bulk import or batch update costs one merge per
+-- statement rather than one per task. Each transition table is only read in
+-- the branch whose trigger declares it.
+create or replace function task_cost_rollup_apply()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform task_cost_rollup_merge(array(select o from old_rows o), -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform task_cost_rollup_merge(array(select n from new_rows n), 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists tasks_rollup_insert on tasks;
+create trigger tasks_rollup_insert
+    after insert on tasks
+    referencing new table as new_rows
+    for each statement execute function task_cost_rollup_apply();
+
+drop trigger if exists tasks_rollup_update on tasks;
+create trigger tasks_rollup_update
+    after update on tasks
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function task_cost_rollup_apply();
+
+drop trigger if exists tasks_rollup_delete on tasks;
+create trigger tasks_rollup_delete
+    after delete on tasks
+    referencing old table as old_rows
+    for each statement execute function task_cost_rollup_apply();
+
+-- Backfill / repair for one user; the cloud counterpart of the local
+-- rebuild-rollup command (cloud_db.ReportingService.rebuild_rollup).
+create or replace function rebuild_task_cost_rollup(p_user_id uuid)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    delete from task_cost_rollup where user_id = p_user_id;
+    select task_cost_rollup_merge(array(select t from tasks t where t.user_id = p_user_id), 1);
+$$;
+
+-- Existing data.
+insert into task_cost_rollup
+    (user_id, property_id, month, paid_cost, unpaid_cost, total_cost, task_count)
+select user_id,
+       coalesce(property_id, 0),
+       coalesce(to_char(start_date, 'YYYY-MM'), ''),
+       coalesce(sum(cost) filter (where payment_status = 'paid'), 0),
+       coalesce(sum(cost) filter (where payment_status = 'unpaid'), 0),
+       coalesce(sum(cost), 0),
+       count(*)
+from tasks
+group by 1, 2, 3
+on conflict (user_id, property_id, month) do nothing;
+
+-- Reports now read the rollup.
+create or replace function report_cost_summary(p_user_id uuid)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'paid', coalesce(sum(paid_cost), 0),
+        'unpaid', coalesce(sum(unpaid_cost), 0),
+        'total', coalesce(sum(paid_cost + unpaid_cost), 0)
+    )
+    from task_cost_rollup
+    where user_id = p_user_id;
+$$;
+
+create or replace function report_monthly_breakdown(p_user_id uuid, p_year int, p_month int)
+returns jsonb
+language sql
+stable
+as $$
+    with per_property as (
+        select p.name, coalesce(sum(r.total_cost), 0) as total
+        from task_cost_rollup r
+        join properties p on p.id = r.property_id
+        where r.user_id = p_user_id
+          and r.month = to_char(make_date(p_year, p_month, 1), 'YYYY-MM')
+        group by p.name
+    )
+    select coalesce(jsonb_object_agg(name, total), '{}'::jsonb)
+        || jsonb_build_object('total', coalesce(sum(total), 0))
+    from per_property;
+$$;
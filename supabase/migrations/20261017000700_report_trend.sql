@@ -0,0 +1,37 @@
+-- Multi-month trend for cloud_db.ReportingService.trend: one grouped query
+-- returns (month, name, total) for every month in [p_from, p_to] ('YYYY-MM').
+-- Per-property totals come from task_cost_rollup; contact and service type
+-- groupings take one range scan of the user's tasks.
+
+create or replace function report_trend(
+    p_user_id uuid, p_from text, p_to text, p_group_by text
+)
+returns table (month text, name text, total numeric)
+language plpgsql
+stable
+as $$
+begin
+    if p_group_by = 'property' then
+        return query
+            select r.month, p.name, sum(r.total_cost)
+            from task_cost_rollup r
+            left join properties p on p.id = r.property_id
+            where r.user_id = p_user_id
+              and r.month between p_from and p_to
+            group by r.month, p.name;
+    elsif p_group_by in ('contact', 'service_type') then
+        return query
+            select to_char(t.start_date, 'YYYY-MM'),
+                   case when p_group_by = 'contact' then c.name else c.service_type end,
+                   coalesce(sum(t.cost), 0)
+            from tasks t
+            left join contacts c on c.id = t.contact_id
+            where t.user_id = p_user_id
+              and t.start_date >= to_date(p_from, 'YYYY-MM')
+              and t.start_date < to_date(p_to, 'YYYY-MM') + interval '1 month'
+            group by 1, 2;
+    else
+        raise exception 'group_by must be property, contact or service_type';
+    end if;
+end;
+$$;
@@ -0,0 +1,76 @@
+-- Recurring task scheduler (counterpart of local migration 7 and
+-- services.RecurringService.schedule). Each generated task records the task it
+-- continues in parent_task_id; the unique index allows one child per parent,
+-- so overlapping scheduler runs cannot insert the same occurrence twice.
+
+alter table tasks
+    add column if not exists parent_task_id bigint references tasks (id) on delete set null;
+
+create unique index if not exists idx_tasks_parent on tasks (parent_task_id);
+
+-- Recurring tasks due to roll over, by end date
+create index if not exists idx_tasks_user_recurring_end
+    on tasks (user_id, end_date) where recurring = 'yes';
+
+-- Inserts the successor of every recurring task (of p_user_id, or of every
+-- user when null) that ends within p_lead_days of p_today and has no child yet.
+-- The successor covers the first occurrence after p_today, so overdue series
+-- skip missed occurrences; date + interval 'n month' clamps to short months.
+-- Returns the number of tasks created.
+create or replace function schedule_recurring_tasks(
+    p_user_id uuid, p_today date, p_lead_days integer default 0
+)
+returns integer
+language sql
+as $$
+    with due as (
+        select t.*,
+               case t.recurrence_interval when 'daily' then 1 when 'weekly' then 7 else 0 end
+                   as step_days,
+               case t.recurrence_interval when 'monthly' then 1 when 'yearly' then 12 else 0 end
+                   as step_months
+        from tasks t
+        where (p_user_id is null or t.user_id = p_user_id)
+          and t.recurring = 'yes'
+          and t.recurrence_interval in ('daily', 'weekly', 'monthly', 'yearly')
+          and t.end_date <= p_today + p_lead_days
+          and not exists (select 1 from tasks c where c.parent_task_id = t.id)
+    ),
+    -- k = steps from end_date to the first occurrence after p_today: exact
+    -- for day steps; for month steps floor(months / step) is at most one short.
+    estimate as (
+        select d.*,
+               greatest(1, case when step_days > 0
+                   then (p_today - end_date) / step_days + 1
+                   else ((extract(year from p_today) - extract(year from end_date)) * 12
+                         + extract(month from p_today) - extract(month from end_date))::int
+                        / step_months
+               end) as k0
+        from due d
+    ),
+    next_occurrence as (
+        select e.*,
+               k0 + case when (end_date + make_interval(
+                   days => step_days * k0, months => step_months * k0))::date <= p_today
+                   then 1 else 0 end as k
+        from estimate e
+    ),
+    inserted as (
+        insert into tasks (
+            user_id, property_id, contact_id, description, start_date, start_time,
+            end_date, end_time, cost, payment_status, completion_status, recurring,
+            recurrence_interval, notes, parent_task_id
+        )
+        select user_id, property_id, contact_id, description,
+               (end_date + make_interval(
+                   days => step_days * (k - 1), months => step_months * (k - 1)))::date,
+               start_time,
+               (end_date + make_interval(days => step_days * k, months => step_months * k))::date,
+               end_time, cost, 'unpaid', 'incomplete', recurring, recurrence_interval,
+               notes, id
+        from next_occurrence
+        on conflict (parent_task_id) do nothing
+        returning 1
+    )
+    select count(*)::integer from inserted;
+$$;
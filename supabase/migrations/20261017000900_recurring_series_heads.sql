@@ -0,0 +1,21 @@
+-- Latest task of each recurring series (no generated child yet) ending on or
+-- before p_until, optionally for one property. cloud_db.RecurringService.calendar
+-- expands these into virtual occurrences; counterpart of
+-- dao.TaskDAO.get_due_recurring. Uses idx_tasks_user_recurring_end.
+
+create or replace function recurring_series_heads(
+    p_user_id uuid, p_until date, p_property_id bigint default null
+)
+returns setof tasks
+language sql
+stable
+as $$
+    select t.*
+    from tasks t
+    where t.user_id = p_user_id
+      and t.recurring = 'yes'
+      and t.end_date <= p_until
+      and (p_property_id is null or t.property_id = p_property_id)
+      and not exists (select 1 from tasks c where c.parent_task_id = t.id)
+    order by t.id;
+$$;
@@ -0,0 +1,68 @@
+-- Per-user change counter behind the ETag on every GET /api/... response
+-- (counterpart of local migration 8). Statement-level triggers on properties,
+-- contacts and tasks bump the counter of each user a statement touched, so a
+-- bulk write costs one bump per user rather than one per row.
+
+create table if not exists data_versions (
+    user_id uuid primary key references auth.users (id) on delete cascade,
+    version bigint not null default 0
+);
+
+alter table data_versions enable row level security;
+
+drop policy if exists data_versions_select_own on data_versions;
+create policy data_versions_select_own on data_versions
+    for select using (user_id = auth.uid());
+
+create or replace function data_versions_bump_users(p_user_ids uuid[])
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into data_versions as v (user_id, version)
+    select distinct u, 1 from unnest(p_user_ids) as u where u is not null
+    on conflict (user_id) do update set version = v.version + 1;
+$$;
+
+-- Each transition table is only read in the branch whose trigger declares it.
+create or replace function data_versions_bump()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform data_versions_bump_users(array(select o.user_id from old_rows o));
+    end if;
+    if tg_op = 'INSERT' then
+        perform data_versions_bump_users(array(select n.user_id from new_rows n));
+    end if;
+    return null;
+end;
+$$;
+
+do $$
+declare
+    tbl text;
+begin
+    foreach tbl in array array['properties', 'contacts', 'tasks'] loop
+        execute format('drop trigger if exists %I on %I', tbl || '_version_insert', tbl);
+        execute format(
+            'create trigger %I after insert on %I referencing new table as new_rows '
+            'for each statement execute function data_versions_bump()',
+            tbl || '_version_insert', tbl);
+        execute format('drop trigger if exists %I on %I', tbl || '_version_update', tbl);
+        execute format(
+            'create trigger %I after update on %I referencing old table as old_rows '
+            'for each statement execute function data_versions_bump()',
+            tbl || '_version_update', tbl);
+        execute format('drop trigger if exists %I on %I', tbl || '_version_delete', tbl);
+        execute format(
+            'create trigger %I after delete on %I referencing old table as old_rows '
+            'for each statement execute function data_versions_bump()',
+            tbl || '_version_delete', tbl);
+    end loop;
+end;
+$$;
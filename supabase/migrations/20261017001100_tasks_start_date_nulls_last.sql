@@ -0,0 +1,7 @@
+-- TaskDAO.get_page and the default query sort order by start_date desc with
+-- undated tasks last, as the local app does. A plain "desc" index sorts nulls
+-- first, so rebuild it to match and keep keyset pages on an index scan.
+
+drop index if exists idx_tasks_user_start_date;
+create index if not exists idx_tasks_user_start_date
+    on tasks (user_id, start_date desc nulls last, id desc);
@@ -0,0 +1,35 @@
+-- Follow-up to 20261017000600_task_cost_rollup.
+
+-- The rollup helpers are security definer functions in public, so PostgREST
+-- would expose them to every role: anyone could merge made-up rows into
+-- another user's rollup or rebuild it. Only the server (service role) calls
+-- rebuild_task_cost_rollup; the merge runs from the tasks triggers, whose
+-- function runs as its owner.
+revoke execute on function task_cost_rollup_merge(tasks[], integer)
+    from public, anon, authenticated;
+revoke execute on function task_cost_rollup_apply()
+    from public, anon, authenticated;
+revoke execute on function rebuild_task_cost_rollup(uuid)
+    from public, anon, authenticated;
+grant execute on function rebuild_task_cost_rollup(uuid) to service_role;
+
+-- Rows without a property (property_id 0) form the null-name group: counted
+-- in the total but not listed by name, as in the local
+-- ReportingService.monthly_breakdown. The inner join dropped them.
+create or replace function report_monthly_breakdown(p_user_id uuid, p_year int, p_month int)
+returns jsonb
+language sql
+stable
+as $$
+    with per_property as (
+        select p.name, coalesce(sum(r.total_cost), 0) as total
+        from task_cost_rollup r
+        left join properties p on p.id = r.property_id
+        where r.user_id = p_user_id
+          and r.month = to_char(make_date(p_year, p_month, 1), 'YYYY-MM')
+        group by p.name
+    )
+    select coalesce(jsonb_object_agg(name, total) filter (where name is not null), '{}'::jsonb)
+        || jsonb_build_object('total', coalesce(sum(total), 0))
+    from per_property;
+$$;
@@ -0,0 +1,15 @@
+-- Follow-up to 20261017001000_data_versions.
+
+-- data_versions_bump_users is a security definer function in public, so
+-- PostgREST would let any caller bump any user's version and invalidate
+-- their ETags and caches. Only the triggers call it, through
+-- data_versions_bump, which runs as its owner.
+revoke execute on function data_versions_bump_users(uuid[])
+    from public, anon, authenticated;
+revoke execute on function data_versions_bump()
+    from public, anon, authenticated;
+
+-- The server reads versions with the service-role client, which bypasses
+-- RLS, so the per-user select policy never applied. With RLS on and no
+-- policies, only the service role can read the table.
+drop policy if exists data_versions_select_own on data_versions;
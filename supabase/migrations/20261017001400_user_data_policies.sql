@@ -0,0 +1,18 @@
+-- Follow-up to 20261017000200_schema_alignment, which enabled RLS on the
+-- user data tables without any policies, so only the service role could
+-- reach them. Each signed-in user may read and write their own rows; the
+-- server's service-role client bypasses RLS as before.
+
+do $$
+declare
+    tbl text;
+begin
+    foreach tbl in array array['properties', 'contacts', 'tasks'] loop
+        execute format('drop policy if exists %I on %I', tbl || '_own_rows', tbl);
+        execute format(
+            'create policy %I on %I for all to authenticated '
+            'using (user_id = auth.uid()) with check (user_id = auth.uid())',
+            tbl || '_own_rows', tbl);
+    end loop;
+end;
+$$;